@@ -0,0 +1,209 @@
+"""
+Validators and compressed copies for static web assets.
+
+AssetIndex hashes each file once per (mtime, size) so conditional GETs cost a
+stat, not a read. fingerprint_html() rewrites local asset references in
+index.html to "name?v=<hash>" for the optional immutable-asset mode, where a
+fingerprinted URL can be cached for a year because its content never changes.
+gzip_file() keeps an in-memory gzip sidecar per file, rebuilt when the file's
+mtime or size changes and bounded by total compressed size.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+# Local references in index.html: src="..", href="..", `from '..'` and `.src = '..'`
+_ASSET_REF = re.compile(
+    r"""((?:src|href)=|\bfrom\s+|\.src\s*=\s*)(["'])(\./)?([\w./-]+\.(?:js|css|png|ico|svg|json))(\?[^"']*)?\2"""
+)
+
+
+# Content types worth compressing; images and fonts are already compressed
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/manifest+json", "image/svg+xml")
+GZIP_LEVEL = 6
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """True if Accept-Encoding allows gzip (q > 0, directly or via *)."""
+    if not accept_encoding:
+        return False
+    wildcard = None
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding in ("gzip", "x-gzip"):
+            return q > 0
+        if coding == "*":
+            wildcard = q > 0
+    return bool(wildcard)
+
+
+def gzip_bytes(data: bytes, level: int = GZIP_LEVEL) -> bytes:
+    # mtime=0 keeps output deterministic so equal content gives equal bytes
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+@dataclass(frozen=True)
+class AssetInfo:
+    etag: str
+    fingerprint: str
+    size: int
+    mtime: float
+
+    @property
+    def last_modified(self) -> str:
+        return formatdate(self.mtime, usegmt=True)
+
+    @property
+    def gzip_etag(self) -> str:
+        """Validator of the gzip representation (must differ from the identity one)."""
+        return self.etag[:-1] + '-gz"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison (RFC 9110 13.1.2)."""
+    if header.strip() == "*":
+        return True
+    strong = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == strong:
+            return True
+    return False
+
+
+def is_not_modified(etag: str, mtime: float, if_none_match: str | None, if_modified_since: str | None) -> bool:
+    """True if the request's validators still match the representation (answer 304)."""
+    if if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since when present
+        return _etag_matches(if_none_match, etag)
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+        return int(mtime) <= since
+    return False
+
+
+class AssetIndex:
+    """Thread-safe cache of AssetInfo keyed by path and invalidated by mtime/size."""
+
+    def __init__(self, max_entries: int = 512, max_gzip_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max(1, max_entries)
+        self.max_gzip_bytes = max(0, max_gzip_bytes)
+        self._entries: dict[str, tuple[int, int, AssetInfo]] = {}
+        self._html: dict[str, tuple[tuple, bytes]] = {}
+        self._gzip: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+        self._gzip_size = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, path: Path, stat: os.stat_result | None = None) -> AssetInfo:
+        stat = stat or path.stat()
+        key = str(path)
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+        hex_digest = digest.hexdigest()
+        info = AssetInfo(f'"{hex_digest}"', hex_digest[:12], stat.st_size, stat.st_mtime)
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[key] = (stat.st_mtime_ns, stat.st_size, info)
+        return info
+
+    def fingerprint_html(self, html_path: Path, web_dir: Path, skip: tuple = ()) -> bytes:
+        """
+        index.html with each existing local asset reference rewritten to
+        "path?v=<fingerprint>" (any old query is dropped). Cached until
+        index.html or one of the referenced files changes.
+        """
+        text = html_path.read_text(encoding="utf-8")
+        refs = {}
+        for match in _ASSET_REF.finditer(text):
+            name = match.group(4)
+            target = web_dir / name
+            if name in skip or name in refs or not target.is_file():
+                continue
+            refs[name] = self.lookup(target).fingerprint
+
+        key = (text, tuple(sorted(refs.items())))
+        with self._lock:
+            cached = self._html.get(str(html_path))
+        if cached and cached[0] == key:
+            return cached[1]
+
+        def replace(match):
+            name = match.group(4)
+            if name not in refs:
+                return match.group(0)
+            prefix, quote, dot = match.group(1), match.group(2), match.group(3) or ""
+            return f"{prefix}{quote}{dot}{name}?v={refs[name]}{quote}"
+
+        body = _ASSET_REF.sub(replace, text).encode("utf-8")
+        with self._lock:
+            self._html[str(html_path)] = (key, body)
+        return body
+
+    def gzip_cached(self, key: str, etag: str, produce) -> bytes:
+        """
+        gzip of produce() for (key, etag), kept in a size-bounded LRU.
+        produce is only called on a miss.
+        """
+        with self._lock:
+            cached = self._gzip.get(key)
+            if cached and cached[0] == etag:
+                self._gzip.move_to_end(key)
+                return cached[1]
+
+        compressed = gzip_bytes(produce())
+        if len(compressed) > self.max_gzip_bytes:
+            return compressed
+        with self._lock:
+            previous = self._gzip.pop(key, None)
+            if previous:
+                self._gzip_size -= len(previous[1])
+            self._gzip[key] = (etag, compressed)
+            self._gzip_size += len(compressed)
+            while self._gzip_size > self.max_gzip_bytes and self._gzip:
+                _, (_, evicted) = self._gzip.popitem(last=False)
+                self._gzip_size -= len(evicted)
+        return compressed
+
+    def gzip_file(self, path: Path, info: AssetInfo, f=None) -> bytes:
+        """Compressed sidecar for path; f (an open binary handle) avoids reopening it."""
+        def produce():
+            if f is not None:
+                f.seek(0)
+                return f.read()
+            return path.read_bytes()
+
+        return self.gzip_cached(str(path), info.etag, produce)
@@ -0,0 +1,123 @@
+"""
+Offline stand-in for the parts of google.generativeai this package uses.
+
+Enabled with STUDYHELPER_FAKE_LLM=1 (see llm_client.load_genai). The fake
+model answers drill prompts with a well-formed response for the requested
+mode (blanked question block, answer block and JSON key; or a 5-question set
+for mode 4) and anything else with a short canned reply, so the AI paths,
+streaming and fallbacks can be exercised without a key or network.
+
+Latency is simulated: the first chunk arrives after FIRST_TOKEN_DELAY seconds
+and each further chunk after CHUNK_DELAY, in both streaming and blocking
+calls (a blocking call sleeps for the whole stream before returning).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+
+FIRST_TOKEN_DELAY = float(os.getenv("STUDYHELPER_FAKE_LLM_FIRST_TOKEN", "0.8"))
+CHUNK_DELAY = float(os.getenv("STUDYHELPER_FAKE_LLM_CHUNK_DELAY", "0.05"))
+CHUNK_CHARS = 96
+
+_MODE = re.compile(r"\[MODE (\d)\]")
+_SOURCE = re.compile(r"=== Source content ===\n(.*?)\n=== End source ===", re.DOTALL)
+# Last "= value" or "return value" on a line is what gets blanked
+_BLANKABLE = re.compile(r"(\breturn\s+|[^=!<>]=\s*)([^\s#][^#]*?)\s*$")
+
+
+def configure(api_key: str | None = None, **kwargs):
+    pass
+
+
+class types:
+    class GenerationConfig:
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+
+class _Chunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _prompt_text(contents) -> str:
+    """Last user text of a str or a [{role, parts: [{text}]}] history."""
+    if isinstance(contents, str):
+        return contents
+    for message in reversed(contents or []):
+        if isinstance(message, dict) and message.get("role", "user") == "user":
+            return "".join(part.get("text", "") for part in message.get("parts", []) if isinstance(part, dict))
+    return ""
+
+
+def _blank_code(source: str, limit: int = 40) -> tuple[str, dict]:
+    lines = source.splitlines()
+    answers: dict[str, str] = {}
+    for index, line in enumerate(lines):
+        if len(answers) >= limit or line.lstrip().startswith("#") or line.rstrip().endswith(":"):
+            continue
+        match = _BLANKABLE.search(line)
+        if not match or not match.group(2).strip():
+            continue
+        number = str(len(answers) + 1)
+        answers[number] = match.group(2).strip()
+        lines[index] = f"{line[: match.start(2)]}_____  # ({number})"
+    return "\n".join(lines), answers
+
+
+def _drill_reply(mode: int, source: str) -> str:
+    if mode == 4:
+        words = [w for w in re.findall(r"[A-Za-z_]\w{3,}", source)][:5] or ["topic"] * 5
+        questions = "\n\n---\n".join(
+            f"**Q{n}.** What is the role of `{word}` in the source?" for n, word in enumerate(words, 1)
+        )
+        key = {f"Q{n}": word for n, word in enumerate(words, 1)}
+        table = "\n".join(f"| Q{n} | **{word}** |" for n, word in enumerate(words, 1))
+        return (
+            f"### Quiz - Set 1\n\n---\n{questions}\n\n### 🔓 정답 확인\n| Q | Answer |\n| :-: | :-: |\n{table}\n\n"
+            f"```json\n{json.dumps(key, ensure_ascii=False)}\n```\n"
+        )
+    question, answers = _blank_code(source)
+    if mode == 3:
+        return f"```python\n{question}\n```\n"
+    return (
+        f"```python\n# Question Block\n{question}\n```\n"
+        f"```python\n# Answer Block\n{source}\n```\n"
+        f"```json\n{json.dumps(answers, ensure_ascii=False)}\n```\n"
+    )
+
+
+def reply_text(contents) -> str:
+    prompt = _prompt_text(contents)
+    mode = _MODE.search(prompt)
+    source = _SOURCE.search(prompt)
+    if mode and source:
+        return _drill_reply(int(mode.group(1)), source.group(1))
+    preview = " ".join(prompt.split())[:160]
+    return (
+        "This is an offline reply from the fake model (STUDYHELPER_FAKE_LLM=1). "
+        f"You asked: \"{preview}\". A real model would explain the concept step by step here."
+    )
+
+
+class GenerativeModel:
+    def __init__(self, model_name: str = "fake", system_instruction: str | None = None, **kwargs):
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+
+    def _chunks(self, text: str):
+        time.sleep(FIRST_TOKEN_DELAY)
+        for start in range(0, len(text), CHUNK_CHARS):
+            if start:
+                time.sleep(CHUNK_DELAY)
+            yield _Chunk(text[start : start + CHUNK_CHARS])
+
+    def generate_content(self, contents=None, generation_config=None, stream: bool = False, **kwargs):
+        chunks = self._chunks(reply_text(contents))
+        if stream:
+            return chunks
+        return _Chunk("".join(chunk.text for chunk in chunks))
@@ -0,0 +1,296 @@
+"""
+Background generation jobs with polling, cancellation and coalescing.
+
+JobManager runs submitted callables on a small pool of daemon threads (started
+lazily, at most max_workers) and keeps each job's state for /api/jobs/<id>.
+Submitting a key that is already queued or running attaches the caller to that
+job instead of starting a second one; the job is only cancelled once every
+attached client has cancelled it.
+
+Queued jobs are cancelled immediately. Running jobs are cancelled
+cooperatively: the job function calls checkpoint("stage") between steps,
+which records the stage for status reports and raises JobCancelled once a
+cancel was requested. Outside a job thread checkpoint() is a no-op.
+
+Job functions may also emit() output as it is produced (LLM stream chunks);
+follow() replays a job's stages and chunks and then waits for new ones, which
+is what the /api/jobs/<id>/events Server-Sent Events stream is built on.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Iterator, Optional
+
+LogFn = Callable[[str], None]
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+_current = threading.local()
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function at a checkpoint after cancellation."""
+
+
+class JobQueueFull(Exception):
+    """Raised by submit() when max_pending jobs are already waiting."""
+
+
+def checkpoint(stage: str):
+    """Record the running job's stage; raise JobCancelled if it was cancelled."""
+    job = getattr(_current, "job", None)
+    if job is None:
+        return
+    if job.stage != stage:
+        with job.changed:
+            job.stage = stage
+            job.changed.notify_all()
+    if job.cancel_requested.is_set():
+        raise JobCancelled(stage)
+
+
+def emit(text: str):
+    """Publish a piece of the running job's output; raise JobCancelled if it was cancelled."""
+    job = getattr(_current, "job", None)
+    if job is None:
+        return
+    with job.changed:
+        job.chunks.append(text)
+        job.changed.notify_all()
+    if job.cancel_requested.is_set():
+        raise JobCancelled(job.stage)
+
+
+def follow(job: "Job", heartbeat: float = 15.0) -> Iterator[tuple[str, object]]:
+    """
+    Yield ("stage", name) and ("chunk", text) events from the start of the
+    job, then ("end", status) once it finishes. ("ping", None) is yielded
+    after heartbeat seconds without news so callers can keep a stream alive.
+    """
+    sent_chunks, sent_stage = 0, ""
+    while True:
+        with job.changed:
+            if sent_chunks == len(job.chunks) and sent_stage == job.stage and not job.done.is_set():
+                job.changed.wait(heartbeat)
+            chunks = job.chunks[sent_chunks:]
+            stage = job.stage
+            finished = job.done.is_set()
+        sent_chunks += len(chunks)
+        news = bool(chunks) or stage != sent_stage
+        if stage != sent_stage:
+            sent_stage = stage
+            yield "stage", stage
+        for text in chunks:
+            yield "chunk", text
+        if finished:
+            yield "end", job.to_dict()
+            return
+        if not news:
+            yield "ping", None
+
+
+class Job:
+    def __init__(self, job_id: str, key: str, fn: Callable[[], object], label: str = ""):
+        self.id = job_id
+        self.key = key
+        self.fn = fn
+        self.label = label
+        self.state = QUEUED
+        self.stage = ""
+        self.clients = 1
+        self.result = None
+        self.error: str | None = None
+        self.created = time.time()
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.chunks: list[str] = []
+        self.cancel_requested = threading.Event()
+        self.done = threading.Event()
+        # Guards stage/chunks and wakes follow() on every change
+        self.changed = threading.Condition()
+
+    def to_dict(self) -> dict:
+        now = time.time()
+        status = {
+            "id": self.id,
+            "state": self.state,
+            "stage": self.stage,
+            "label": self.label,
+            "clients": self.clients,
+            "cancel_requested": self.cancel_requested.is_set(),
+            "queued_sec": round((self.started or self.finished or now) - self.created, 3),
+            "elapsed_sec": round((self.finished or now) - self.started, 3) if self.started else 0.0,
+        }
+        if self.state == DONE:
+            status["result"] = self.result
+        elif self.error:
+            status["error"] = self.error
+        return status
+
+
+class JobManager:
+    """
+    Thread-safe job queue with a bounded worker pool.
+
+    - max_workers: jobs running at once
+    - max_pending: queued jobs accepted before submit() raises JobQueueFull
+    - keep_finished: finished jobs kept for status queries (oldest dropped first)
+    A dict result with an "error" key (generate_session's failure shape)
+    marks the job failed; an exception does too.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 16,
+        keep_finished: int = 64,
+        log_fn: Optional[LogFn] = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.keep_finished = max(1, keep_finished)
+        self.log_fn = log_fn
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._queue: deque[Job] = deque()
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._active: dict[str, Job] = {}
+        self._workers: list[threading.Thread] = []
+        self._idle = 0
+        self.coalesced = 0
+
+    def _log(self, message: str):
+        if self.log_fn:
+            try:
+                self.log_fn(message)
+            except Exception:
+                pass
+
+    def submit(self, key: str, fn: Callable[[], object], label: str = "") -> tuple[Job, bool]:
+        """Queue fn under key. Returns (job, coalesced); coalesced jobs were already active."""
+        with self._lock:
+            job = self._active.get(key)
+            if job is not None and not job.cancel_requested.is_set():
+                job.clients += 1
+                self.coalesced += 1
+                return job, True
+            if len(self._queue) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._queue)} jobs already queued")
+            job = Job(os.urandom(8).hex(), key, fn, label)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            self._queue.append(job)
+            if len(self._queue) > self._idle and len(self._workers) < self.max_workers:
+                worker = threading.Thread(
+                    target=self._worker, name=f"job-worker-{len(self._workers)}", daemon=True
+                )
+                self._workers.append(worker)
+                worker.start()
+            self._work.notify()
+        self._log(f"job {job.id} queued: {label}")
+        return job, False
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: float) -> Job | None:
+        """Block up to timeout seconds for the job to finish; returns it either way."""
+        job = self.get(job_id)
+        if job is not None and timeout > 0:
+            job.done.wait(timeout)
+        return job
+
+    def cancel(self, job_id: str) -> Job | None:
+        """
+        Detach one client. The last client's cancel removes a queued job at
+        once or flags a running job to stop at its next checkpoint.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state in FINISHED_STATES:
+                return job
+            if job.clients > 1:
+                job.clients -= 1
+                return job
+            job.cancel_requested.set()
+            if job.state == QUEUED:
+                self._queue.remove(job)
+                self._finish(job, CANCELLED)
+        self._log(f"job {job.id} cancel requested ({job.state})")
+        return job
+
+    def jobs(self) -> list[dict]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.to_dict() for job in reversed(jobs)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            states: dict[str, int] = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+            return {
+                "workers": len(self._workers),
+                "max_workers": self.max_workers,
+                "queued": len(self._queue),
+                "max_pending": self.max_pending,
+                "coalesced": self.coalesced,
+                "states": states,
+            }
+
+    def _finish(self, job: Job, state: str):
+        """Mark job finished and trim history; caller holds the lock."""
+        job.state = state
+        job.finished = time.time()
+        job.fn = None
+        if self._active.get(job.key) is job:
+            del self._active[job.key]
+        with job.changed:
+            job.done.set()
+            job.changed.notify_all()
+        finished = [j for j in self._jobs.values() if j.state in FINISHED_STATES]
+        for old in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[old.id]
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+                while not self._queue:
+                    self._work.wait()
+                self._idle -= 1
+                job = self._queue.popleft()
+                job.state = RUNNING
+                job.started = time.time()
+                fn = job.fn
+            self._run(job, fn)
+
+    def _run(self, job: Job, fn: Callable[[], object]):
+        _current.job = job
+        state, result, error = DONE, None, None
+        try:
+            result = fn()
+            if isinstance(result, dict) and result.get("error"):
+                state, error = FAILED, str(result["error"])
+        except JobCancelled as exc:
+            state, error = CANCELLED, f"cancelled at {exc}"
+        except Exception as exc:
+            state, error = FAILED, str(exc)
+            self._log(f"job {job.id} failed: {exc}")
+        finally:
+            _current.job = None
+        with self._lock:
+            job.result = result
+            job.error = error
+            self._finish(job, state)
+        self._log(f"job {job.id} {state} in {job.finished - job.started:.2f}s")
@@ -0,0 +1,97 @@
+"""
+Compact UTF-8 JSON and atomic file replacement for session files.
+
+dumps() returns compact UTF-8 bytes: no indentation and non-ASCII text kept
+as is, so a Korean syllable costs 3 bytes instead of a 6-byte \\uXXXX escape.
+orjson is used when it is importable (set STUDYHELPER_JSON_BACKEND=json to
+force the standard library); both backends produce the same documents and
+loads() accepts either backend's output.
+
+atomic_write() writes to a temp file in the target's directory and renames
+it over the target, so a reader sees the old file or the new one, never a
+partial write.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    if os.getenv("STUDYHELPER_JSON_BACKEND", "auto") == "json":
+        raise ImportError("stdlib json requested")
+    import orjson as _orjson  # type: ignore
+except ImportError:
+    _orjson = None
+
+BACKEND = "orjson" if _orjson else "json"
+
+# Windows refuses to replace a file another handle has open; readers close quickly
+REPLACE_RETRIES = 5
+REPLACE_RETRY_DELAY = 0.02
+
+
+def _dumps_stdlib(obj) -> bytes:
+    try:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    except UnicodeEncodeError:
+        # Lone surrogates cannot be UTF-8; the escaped form is still valid JSON
+        return json.dumps(obj, ensure_ascii=True, separators=(",", ":")).encode("ascii")
+
+
+def dumps(obj) -> bytes:
+    """obj as compact UTF-8 JSON bytes."""
+    if _orjson is not None:
+        try:
+            # Non-string keys are stringified like json.dumps does
+            return _orjson.dumps(obj, option=_orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. lone surrogates or integers beyond 64 bits
+    return _dumps_stdlib(obj)
+
+
+def loads(data: bytes | str):
+    if _orjson is not None:
+        try:
+            return _orjson.loads(data)
+        except _orjson.JSONDecodeError:
+            pass  # fall through for the standard library's error message
+    return json.loads(data)
+
+
+def atomic_write(path: Path, data: bytes, fsync: bool = True):
+    """
+    Replace path with data via a temp file and os.replace. fsync=True also
+    flushes the data to disk before the rename, so a crash cannot leave an
+    empty file behind; caches that can be rebuilt may skip it.
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            # mkstemp creates 0600; keep the permissions of the file being replaced
+            os.chmod(tmp_name, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+        except OSError:
+            pass
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(tmp_name, path)
+                break
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(REPLACE_RETRY_DELAY)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
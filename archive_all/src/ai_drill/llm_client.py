@@ -3,12 +3,13 @@
 Lightweight Gemini client with lazy SDK loading so offline/local-only
 features can run without google-generativeai installed.
 All prompts are English-only to avoid encoding issues.
+Set STUDYHELPER_FAKE_LLM=1 to use the offline fake model (fake_genai).
 """
 
 from __future__ import annotations
 
 import os
-from typing import Any
+from typing import Any, Iterator
 from pathlib import Path
 
 from .prompt_templates import (
@@ -20,6 +21,42 @@ from .prompt_templates import (
 )
 
 DEFAULT_MODEL = "gemini-2.5-flash"
+FAKE_LLM_ENV = "STUDYHELPER_FAKE_LLM"
+
+
+def fake_llm_enabled() -> bool:
+    return os.getenv(FAKE_LLM_ENV, "0") == "1"
+
+
+def load_genai():
+    """
+    google.generativeai, or the offline fake when STUDYHELPER_FAKE_LLM=1.
+    Lazy so offline/local-only features never import the SDK.
+    """
+    if fake_llm_enabled():
+        from . import fake_genai
+
+        return fake_genai
+    try:
+        import google.generativeai as genai  # type: ignore
+
+        return genai
+    except ImportError as exc:
+        raise RuntimeError(
+            "google-generativeai package is missing. Install it with "
+            "`pip install google-generativeai` before using LLM features."
+        ) from exc
+
+
+def iter_stream_text(response) -> Iterator[str]:
+    """Text of each streamed chunk; chunks without text parts (e.g. safety stops) are skipped."""
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            continue
+        if text:
+            yield text
 
 
 def _scrub_system_prompt(raw: str) -> str:
@@ -76,6 +113,8 @@ class LLMClient:
 
         if not api_key:
             api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key and fake_llm_enabled():
+            api_key = "fake"
         if not api_key:
             raise ValueError(
                 "API Key not found. Set GEMINI_API_KEY or pass --api_key before using LLM mode."
@@ -98,6 +137,26 @@ class LLMClient:
         """
         Build prompt text for the requested mode and fetch completion text.
         """
+        response = self.model.generate_content(
+            contents=self._drill_message(content, mode, difficulty),
+            generation_config=self._genai.types.GenerationConfig(temperature=0.2),
+        )
+        return response.text
+
+    def stream_drill(self, content: str, mode: int, difficulty: int = 2) -> Iterator[str]:
+        """
+        Same request as generate_drill in streaming mode: yields text chunks
+        as the model produces them; "".join() of them is the full response.
+        """
+        response = self.model.generate_content(
+            contents=self._drill_message(content, mode, difficulty),
+            generation_config=self._genai.types.GenerationConfig(temperature=0.2),
+            stream=True,
+        )
+        return iter_stream_text(response)
+
+    @staticmethod
+    def _drill_message(content: str, mode: int, difficulty: int) -> str:
         prompt_map = {
             1: MODE_1_PROMPT,
             2: MODE_2_PROMPT,
@@ -117,24 +176,11 @@ class LLMClient:
 Follow the [MODE {mode}] conversion rules.
 Difficulty: {difficulty} (1=Easy, 2=Normal, 3=Hard, 4=Extreme).
 Higher difficulty should focus on harder blanks and concepts."""
-
-        response = self.model.generate_content(
-            contents=user_message,
-            generation_config=self._genai.types.GenerationConfig(temperature=0.2),
-        )
-        return response.text
+        return user_message
 
     @staticmethod
     def _load_genai_sdk():
         """
         Lazy-import google-generativeai to avoid import errors in pure offline mode.
         """
-        try:
-            import google.generativeai as genai  # type: ignore
-
-            return genai
-        except ImportError as exc:
-            raise RuntimeError(
-                "google-generativeai package is missing. Install it with "
-                "`pip install google-generativeai` before using LLM features."
-            ) from exc
+        return load_genai()
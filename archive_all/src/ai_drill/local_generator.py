@@ -1,9 +1,22 @@
 # 로컬(LLM 없는) 변환용 단순 제너레이터
+import ast
+import hashlib
+import heapq
+import io
 import re
 import random
 import math
 import os
+import sys
+import threading
+import tokenize
+from collections import OrderedDict, deque
+from itertools import accumulate
+from .json_io import atomic_write, dumps, loads
+from .log_writer import log as log_message
+from .metrics import phase
 from .quiz_parser import DrillSession
+from .version import GENERATOR_VERSION
 from .answer_key import MC_ANSWERS as QUIZ_ANSWERS  # 정답표는 answer_key.py에서 import
 
 # 고정 파일 경로
@@ -24,7 +37,26 @@ def get_fixed_file_for_mode(mode: int) -> str | None:
     return None
 
 
-def build_local_session(content: str, mode: int, difficulty: int = 2) -> DrillSession:
+def fixed_file_stamp(mode: int) -> str:
+    """
+    "path:mtime_ns:size" of the fixed file a mode reads instead of the given
+    content ("" for other modes), so cache keys change when that file does.
+    """
+    fixed_file = get_fixed_file_for_mode(mode)
+    if not fixed_file:
+        return ""
+    try:
+        stat = os.stat(fixed_file)
+    except OSError:
+        return ""
+    return f"{fixed_file}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+# 난이도별 빈칸 개수 (모드 1, 2): 1(Easy)=30, 2(Normal)=50, 3(Hard)=60, 4(Extreme)=80
+BLANK_COUNTS_BY_DIFFICULTY = {1: 30, 2: 50, 3: 60, 4: 80}
+
+
+def build_local_session(content: str, mode: int, difficulty: int = 2, split_methods: bool = False) -> DrillSession:
     """
     ================================================================================
     LLM 없이 로컬에서 학습 세션을 생성하는 함수
@@ -37,24 +69,16 @@ def build_local_session(content: str, mode: int, difficulty: int = 2) -> DrillSe
         content: 입력 텍스트 (파일 내용)
         mode: 학습 모드 번호
         difficulty: 난이도 (1=Easy, 2=Normal, 3=Hard, 4=Extreme)
+        split_methods: 모드 3에서 클래스를 메서드별 챌린지로 분리 (기본: 클래스 하나가 챌린지 하나)
     
     Returns:
         DrillSession: 생성된 학습 세션
     """
     import traceback
-    from pathlib import Path
     
-    # 로깅용 (서버에서 log_error 함수 사용)
-    log_file = Path(__file__).parent.parent / "logs" / "server_error.log"
-    def log(msg):
-        try:
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(f"[{timestamp}] [local_generator] {msg}\n")
-                f.flush()
-        except:
-            pass
+    # 로깅용 (서버와 같은 큐 기반 writer 사용; 호출 스레드는 파일을 열지 않음)
+    def log(msg, level="INFO"):
+        log_message(msg, level, source="local_generator")
     
     try:
         log(f"build_local_session 시작: mode={mode}, diff={difficulty}, content_len={len(content)}")
@@ -67,7 +91,9 @@ def build_local_session(content: str, mode: int, difficulty: int = 2) -> DrillSe
                 content = f.read()
         
         # 2. 이미 객관식 문제 형식인지 감지
-        if is_existing_quiz(content):
+        with phase("is_existing_quiz"):
+            existing_quiz = is_existing_quiz(content)
+        if existing_quiz:
             log(f"기존 문제 형식 감지됨 → parse_existing_quiz 호출")
             result = parse_existing_quiz(content, mode)
             log(f"parse_existing_quiz 완료: {type(result)}")
@@ -79,8 +105,7 @@ def build_local_session(content: str, mode: int, difficulty: int = 2) -> DrillSe
         if mode in (1, 2):
             # 난이도별 고정 빈칸 개수 설정
             # 1(Easy): 30개, 2(Normal): 50개, 3(Hard): 60개, 4(Extreme): 80개
-            fixed_counts = {1: 30, 2: 50, 3: 60, 4: 80}
-            target = fixed_counts.get(difficulty, 50)
+            target = BLANK_COUNTS_BY_DIFFICULTY.get(difficulty, 50)
             log(f"빈칸 생성 목표: {target}개 (난이도 {difficulty})")
             log(f"난이도별 빈칸 개수: 쉬움=30, 보통=50, 어려움=60, 극한=80")
             
@@ -90,20 +115,24 @@ def build_local_session(content: str, mode: int, difficulty: int = 2) -> DrillSe
             return DrillSession(mode, question, content, answer_key)
             
         if mode == 3:
-            question, answer_key = make_implementation_challenge(content)
+            with phase("generate"):
+                question, answer_key = make_implementation_challenge(content, split_methods=split_methods)
             return DrillSession(mode, question, content, answer_key)
 
             
         if mode == 4:
-            question, answer_key = make_multiple_choice(content)
+            with phase("generate"):
+                question, answer_key = make_multiple_choice(content)
             return DrillSession(mode, question, content, answer_key)
             
         if mode == 5:
-            question, answer_key = make_definition_quiz(content)
+            with phase("generate"):
+                question, answer_key = make_definition_quiz(content)
             return DrillSession(mode, question, content, answer_key)
             
         if mode == 7:
-            question, answer_key = make_vocabulary_cards(content)
+            with phase("generate"):
+                question, answer_key = make_vocabulary_cards(content)
             return DrillSession(mode, question, content, answer_key)
         
         # 기본 반환
@@ -111,11 +140,39 @@ def build_local_session(content: str, mode: int, difficulty: int = 2) -> DrillSe
         return DrillSession(mode, content, content, {})
         
     except Exception as e:
-        log(f"build_local_session 오류: {e}\n{traceback.format_exc()}")
+        log(f"build_local_session 오류: {e}\n{traceback.format_exc()}", level="ERROR")
         # 에러 발생 시에도 빈 세션 반환 (서버 크래시 방지)
         return DrillSession(mode, "세션 생성 중 오류 발생", str(e), {"_error": str(e)})
 
 
+def build_local_session_variants(content: str, mode: int, difficulties=(1, 2, 3, 4)) -> dict:
+    """
+    난이도별 세션을 한 번에 생성 {difficulty: DrillSession}
+
+    Modes 1/2 extract blank candidates once and render every difficulty from
+    them; other modes simply call build_local_session per difficulty.
+    """
+    if mode not in (1, 2):
+        return {d: build_local_session(content, mode, d) for d in difficulties}
+
+    fixed_file = get_fixed_file_for_mode(mode)
+    if fixed_file and os.path.exists(fixed_file):
+        with open(fixed_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+    with phase("is_existing_quiz"):
+        existing_quiz = is_existing_quiz(content)
+    if existing_quiz:
+        return {d: parse_existing_quiz(content, mode) for d in difficulties}
+
+    targets = {d: BLANK_COUNTS_BY_DIFFICULTY.get(d, 50) for d in difficulties}
+    sessions = {}
+    for d, (question, answer_key) in make_blank_variants(content, targets).items():
+        if mode == 2:
+            answer_key["_type"] = "fill_in_blank_inline"
+        sessions[d] = DrillSession(mode, question, content, answer_key)
+    return sessions
+
+
 def is_existing_quiz(content: str) -> bool:
     """이미 객관식 문제 형식인지 감지"""
     quiz_patterns = [
@@ -310,208 +367,215 @@ def clean_answer(ans: str) -> str:
 
 
 
-def build_inline_blank_code(code: str, blanks: list) -> str:
+def _line_offsets(code: str) -> list:
+    """offsets[i] = start of line i+1; the last entry is len(code) so slices can end there."""
+    # split/accumulate stay in C; a Python find() loop is several times slower on big files
+    offsets = list(accumulate(map((1).__add__, map(len, code.split("\n"))), initial=0))
+    offsets[-1] = len(code)
+    return offsets
+
+
+def _blank_render_order(blank: dict) -> int:
+    col_offset = blank.get("col_offset", -1)
+    return -(col_offset if col_offset != -1 else blank.get("blank_num", 0))
+
+
+def _render_blank_line(line: str, line_blanks: list) -> str:
     """
-    Render inline __[N]__ markers using recorded positions, with fallbacks if text search fails.
-    blanks: [{"line_num": 4, "answer": "None", "col_offset": 10}, ...]
+    Render one line's markers from (start, end) slices of the original line.
+
+    Blanks are resolved right to left like the old in-place rewrite: the
+    recorded column wins if the answer is still there, otherwise the first
+    unclaimed occurrence, otherwise the marker is appended to the line.
     """
-    lines = code.split("\n")
+    claimed = []   # (start, end, marker) in original line coordinates
+    appended = []
+    for blank in sorted(line_blanks, key=_blank_render_order):
+        answer = str(blank.get("answer", "")).strip()
+        col_offset = blank.get("col_offset", -1)
+        marker = f"__[{blank.get('blank_num')}]__"
+        size = len(answer)
+
+        def is_free(start):
+            return all(start + size <= c_start or start >= c_end for c_start, c_end, _ in claimed)
+
+        insert_at = -1
+        if col_offset is not None and col_offset >= 0 and line[col_offset:col_offset + size] == answer \
+                and col_offset + size <= len(line) and is_free(col_offset):
+            insert_at = col_offset
+        if insert_at == -1 and answer:
+            pos = line.find(answer)
+            while pos != -1 and not is_free(pos):
+                pos = line.find(answer, pos + 1)
+            insert_at = pos
+
+        if insert_at != -1:
+            claimed.append((insert_at, insert_at + size, marker))
+        else:
+            appended.append(marker)
+
+    claimed.sort()
+    pieces = []
+    cursor = 0
+    for start, end, marker in claimed:
+        pieces.append(line[cursor:start])
+        pieces.append(marker)
+        cursor = end
+    pieces.append(line[cursor:])
+    rendered = "".join(pieces)
+    if appended:
+        rendered = " ".join([rendered.rstrip()] + appended).strip()
+    return rendered
+
+
+def _render_inline_blanks(code: str, offsets: list, blanks: list) -> str:
+    """Piece-table render: untouched lines are copied as one slice per gap, joined once."""
     blanks_by_line: dict[int, list[dict]] = {}
     for blank in blanks:
-        line_num = int(blank.get("line_num", 0))
-        blanks_by_line.setdefault(line_num, []).append(blank)
+        blanks_by_line.setdefault(int(blank.get("line_num", 0)), []).append(blank)
 
-    result_lines = []
-    for i, line in enumerate(lines):
-        line_num = i + 1
-        line_blanks = blanks_by_line.get(line_num)
-        if not line_blanks:
-            result_lines.append(line)
+    line_count = len(offsets) - 1
+    pieces = []
+    cursor = 0
+    for line_num in sorted(blanks_by_line):
+        if not 1 <= line_num <= line_count:
             continue
+        start = offsets[line_num - 1]
+        end = offsets[line_num] - 1 if line_num < line_count else offsets[line_num]
+        pieces.append(code[cursor:start])
+        pieces.append(_render_blank_line(code[start:end], blanks_by_line[line_num]))
+        cursor = end
+    pieces.append(code[cursor:])
+    return "".join(pieces)
 
-        modified_line = line
-        sorted_blanks = sorted(
-            line_blanks,
-            key=lambda b: -(b.get("col_offset", -1) if b.get("col_offset", -1) != -1 else b.get("blank_num", 0))
-        )
 
-        for blank in sorted_blanks:
-            answer = str(blank.get("answer", "")).strip()
-            col_offset = blank.get("col_offset", -1)
-            marker = f"__[{blank.get('blank_num')}]__"
-            insert_at = -1
+def build_inline_blank_code(code: str, blanks: list) -> str:
+    """
+    Render inline __[N]__ markers using recorded positions, with fallbacks if text search fails.
+    blanks: [{"line_num": 4, "answer": "None", "col_offset": 10}, ...]
+    """
+    return _render_inline_blanks(code, _line_offsets(code), blanks)
 
-            if col_offset is not None and col_offset >= 0 and col_offset + len(answer) <= len(modified_line):
-                segment = modified_line[col_offset:col_offset + len(answer)]
-                if segment == answer:
-                    insert_at = col_offset
 
-            if insert_at == -1 and answer:
-                insert_at = modified_line.find(answer)
+# ========== BLANK CANDIDATE EXTRACTION (Python AST) ==========
 
-            if insert_at != -1:
-                modified_line = modified_line[:insert_at] + marker + modified_line[insert_at + len(answer):]
-            else:
-                modified_line = f"{modified_line.rstrip()} {marker}".strip()
+# Weights for scoring
+WEIGHT_POINTER = 3      # head, current, pre, node, .link assignments
+WEIGHT_CONDITION = 3    # if/while/for conditions
+WEIGHT_BOUNDARY = 2     # index < 0, head is None boundary checks
+WEIGHT_RETURN = 1       # return statements
+WEIGHT_EXCLUDED = 0     # print, menu, file I/O
 
-        result_lines.append(modified_line)
+# Pointer-related identifiers to detect
+POINTER_IDENTIFIERS = {'head', 'current', 'pre', 'node', 'newNode', 'temp'}
+_POINTER_RE = re.compile(r'\b(?:' + '|'.join(sorted(POINTER_IDENTIFIERS)) + r')\b')
 
-    return "\n".join(result_lines)
+BOUNDARY_KEYWORDS = ['is None', '< 0', '> len', '>= len', 'is not None', '== 0', 'index']
+
+# Excluded patterns (don't create blanks for these)
+EXCLUDED_LINE_PATTERNS = [
+    r'^\s*print\s*\(["\']',      # Print with string literal
+    r'^\s*#',                     # Comments
+    r'^\s*"""',                   # Docstrings
+    r"^\s*'''",                   # Docstrings
+    r'^\s*def\s+\w+\s*\(',       # Function definitions (name only)
+    r'^\s*class\s+\w+',          # Class definitions
+]
+_EXCLUDED_LINE_RE = re.compile('|'.join(f'(?:{p})' for p in EXCLUDED_LINE_PATTERNS))
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _get_source_segment(code_lines: list, start_line: int, start_col: int,
+                        end_line: int, end_col: int) -> str:
+    """Extract source code segment from line/column positions."""
+    if start_line == end_line:
+        return code_lines[start_line - 1][start_col:end_col]
+    result = [code_lines[start_line - 1][start_col:]]
+    for line_idx in range(start_line, end_line - 1):
+        result.append(code_lines[line_idx])
+    result.append(code_lines[end_line - 1][:end_col])
+    return '\n'.join(result)
+
+
+def _get_text_from_node(node, code_lines: list) -> str:
+    """Get source text for an AST node."""
+    if not hasattr(node, 'lineno') or not hasattr(node, 'end_lineno'):
+        return ""
+    try:
+        return _get_source_segment(
+            code_lines, node.lineno, node.col_offset,
+            node.end_lineno, node.end_col_offset
+        )
+    except (IndexError, AttributeError):
+        return ""
 
 
-def make_blanks_with_context(code: str, target_count: int):
+def _is_pointer_text(text: str) -> bool:
+    """Check if source text involves pointer/structure manipulation."""
+    return '.link' in text or _POINTER_RE.search(text) is not None
+
+
+def _iter_nodes_with_owner(tree):
     """
-    AST-based blank generation with CONCEPT-UNIT extraction.
-    
-    Key Principles:
-    1. Extract CONCEPT UNITS, not individual tokens
-       - Full conditions: "current.link is not None" as one blank
-       - Full pointer assignments: "current.link = node" as one blank
-    2. Weighted Priority:
-       - Pointer/Structure manipulation (weight 3): head=, current.link=, pre.link=
-       - Control conditions (weight 3): if/while conditions
-       - Boundary checks (weight 2): index < 0, head is None
-       - Return values (weight 1): return result
-    3. Distribute evenly across FUNCTIONS
-    4. Maintain minimum LINE DISTANCE between blanks
-    5. Avoid duplicates of same concept pattern
+    Yield (node, function_name) in the same breadth-first order as ast.walk.
+
+    The owning function is resolved while the tree is expanded, so each node is
+    visited once instead of scanning every function's line range per node.
+    Methods defined directly in a class are reported as "Class.method".
+    """
+    queue = deque([(tree, '__global__')])
+    while queue:
+        node, owner = queue.popleft()
+        yield node, owner
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, _FUNCTION_NODES):
+                if isinstance(node, ast.ClassDef):
+                    queue.append((child, f"{node.name}.{child.name}"))
+                else:
+                    queue.append((child, child.name))
+            else:
+                queue.append((child, owner))
+
+
+def _extract_python_candidates(tree, lines: list) -> list:
+    """
+    Collect weighted blank candidates from a parsed Python module in one pass.
+
+    Returns candidate dicts with type/text/line_num/col_offset/score/function/full_line.
     """
-    import ast
-    
-    # ========== CONFIGURATION ==========
-    MIN_LINE_DISTANCE = 2  # Minimum lines between blanks
-    
-    # Weights for scoring
-    WEIGHT_POINTER = 3      # head, current, pre, node, .link assignments
-    WEIGHT_CONDITION = 3    # if/while/for conditions
-    WEIGHT_BOUNDARY = 2     # index < 0, head is None boundary checks
-    WEIGHT_RETURN = 1       # return statements
-    WEIGHT_EXCLUDED = 0     # print, menu, file I/O
-    
-    # Function importance weights for distribution
-    FUNCTION_WEIGHTS = {
-        'appendNode': 3, 'insertNode': 3, 'insertAt': 3, 'deleteNode': 3,
-        'searchNode': 2, 'printNodes': 1, 'get_list_data': 1,
-        'Node': 1, '__init__': 1,
-        'saveToFile': 0.5, 'loadFromFile': 0.5, 'clearList': 0.5,
-        '__main__': 0.3, 'main': 0.3,
-    }
-    DEFAULT_FUNC_WEIGHT = 1.0
-    
-    # Pointer-related identifiers to detect
-    POINTER_IDENTIFIERS = {'head', 'current', 'pre', 'node', 'newNode', 'temp'}
-    
-    # Excluded patterns (don't create blanks for these)
-    EXCLUDED_LINE_PATTERNS = [
-        r'^\s*print\s*\(["\']',      # Print with string literal
-        r'^\s*#',                     # Comments
-        r'^\s*"""',                   # Docstrings
-        r"^\s*'''",                   # Docstrings
-        r'^\s*def\s+\w+\s*\(',       # Function definitions (name only)
-        r'^\s*class\s+\w+',          # Class definitions
-    ]
-    
-    lines = code.splitlines()
     candidates = []
-    
-    # ========== HELPER FUNCTIONS ==========
-    
-    def get_source_segment(code_lines: list, start_line: int, start_col: int, 
-                           end_line: int, end_col: int) -> str:
-        """Extract source code segment from line/column positions."""
-        if start_line == end_line:
-            return code_lines[start_line - 1][start_col:end_col]
-        result = [code_lines[start_line - 1][start_col:]]
-        for line_idx in range(start_line, end_line - 1):
-            result.append(code_lines[line_idx])
-        result.append(code_lines[end_line - 1][:end_col])
-        return '\n'.join(result)
-    
-    def get_text_from_node(node, code_lines: list) -> str:
-        """Get source text for an AST node."""
-        if not hasattr(node, 'lineno') or not hasattr(node, 'end_lineno'):
-            return ""
-        try:
-            return get_source_segment(
-                code_lines, node.lineno, node.col_offset,
-                node.end_lineno, node.end_col_offset
-            )
-        except (IndexError, AttributeError):
-            return ""
-    
-    def is_pointer_related(node) -> bool:
-        """Check if node involves pointer/structure manipulation."""
-        text = get_text_from_node(node, lines)
-        # Check for pointer identifiers or .link attribute
-        if '.link' in text:
-            return True
-        for ident in POINTER_IDENTIFIERS:
-            if re.search(rf'\b{ident}\b', text):
-                return True
-        return False
-    
-    def is_excluded_line(line: str) -> bool:
-        """Check if line should be excluded from blank generation."""
-        for pattern in EXCLUDED_LINE_PATTERNS:
-            if re.match(pattern, line):
-                return True
-        return False
-    
-    def detect_current_function(node, func_map: dict) -> str:
-        """Find which function contains this node based on line number."""
-        line = getattr(node, 'lineno', 0)
-        containing_func = '__global__'
-        for func_name, (start, end) in func_map.items():
-            if start <= line <= end:
-                containing_func = func_name
-        return containing_func
-    
-    # ========== AST PARSING ==========
-    
-    try:
-        tree = ast.parse(code)
-    except SyntaxError:
-        # Fallback to simple token-based extraction if AST fails
-        return _fallback_token_blanks(code, target_count)
-    
-    # Build function map: function_name -> (start_line, end_line)
-    func_map = {}
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            end_line = node.end_lineno if hasattr(node, 'end_lineno') else node.lineno + 20
-            func_map[node.name] = (node.lineno, end_line)
-        elif isinstance(node, ast.ClassDef):
-            for item in node.body:
-                if isinstance(item, ast.FunctionDef):
-                    end_line = item.end_lineno if hasattr(item, 'end_lineno') else item.lineno + 10
-                    func_map[f"{node.name}.{item.name}"] = (item.lineno, end_line)
-    
-    # ========== CANDIDATE EXTRACTION ==========
-    
-    for node in ast.walk(tree):
+    excluded_cache: dict[int, bool] = {}
+    line_count = len(lines)
+
+    for node, func_name in _iter_nodes_with_owner(tree):
+        if not isinstance(node, (ast.If, ast.While, ast.For, ast.Assign, ast.Return)):
+            continue
+
         line_num = getattr(node, 'lineno', 0)
-        if line_num == 0 or line_num > len(lines):
+        if line_num == 0 or line_num > line_count:
             continue
-        
+
         line_text = lines[line_num - 1]
-        if is_excluded_line(line_text):
+        excluded = excluded_cache.get(line_num)
+        if excluded is None:
+            excluded = _EXCLUDED_LINE_RE.match(line_text) is not None
+            excluded_cache[line_num] = excluded
+        if excluded:
             continue
-        
-        func_name = detect_current_function(node, func_map)
-        
-        # --- 1. If/While/For CONDITIONS (Priority: WEIGHT_CONDITION or WEIGHT_BOUNDARY) ---
+
+        # --- 1. If/While CONDITIONS (Priority: WEIGHT_CONDITION or WEIGHT_BOUNDARY) ---
         if isinstance(node, (ast.If, ast.While)):
-            condition_text = get_text_from_node(node.test, lines)
+            condition_text = _get_text_from_node(node.test, lines)
             if condition_text and len(condition_text) > 2:
                 # Determine if this is a boundary check
-                is_boundary = any(kw in condition_text for kw in 
-                    ['is None', '< 0', '> len', '>= len', 'is not None', '== 0', 'index'])
+                is_boundary = any(kw in condition_text for kw in BOUNDARY_KEYWORDS)
                 score = WEIGHT_BOUNDARY if is_boundary else WEIGHT_CONDITION
-                
+
                 # Extra boost for pointer-related conditions
-                if is_pointer_related(node.test):
+                if _is_pointer_text(condition_text):
                     score = WEIGHT_CONDITION
-                
+
                 candidates.append({
                     'type': 'condition',
                     'text': condition_text,
@@ -521,10 +585,10 @@ def make_blanks_with_context(code: str, target_count: int):
                     'function': func_name,
                     'full_line': line_text,
                 })
-        
+
         # --- 2. For loop iterables ---
         elif isinstance(node, ast.For):
-            iter_text = get_text_from_node(node.iter, lines)
+            iter_text = _get_text_from_node(node.iter, lines)
             if iter_text and len(iter_text) > 2:
                 candidates.append({
                     'type': 'for_iter',
@@ -535,45 +599,37 @@ def make_blanks_with_context(code: str, target_count: int):
                     'function': func_name,
                     'full_line': line_text,
                 })
-        
+
         # --- 3. POINTER/STRUCTURE ASSIGNMENTS (Priority: WEIGHT_POINTER) ---
         elif isinstance(node, ast.Assign):
-            # Check if this is a pointer-related assignment
-            assign_text = get_text_from_node(node, lines)
-            
             # Look for patterns like: head = node, current.link = node, etc.
-            target_text = ""
-            for target in node.targets:
-                target_text = get_text_from_node(target, lines)
-                break
-            
-            value_text = get_text_from_node(node.value, lines)
-            
+            target_text = _get_text_from_node(node.targets[0], lines) if node.targets else ""
+
             is_pointer_assign = False
             # Check if LHS has pointer identifiers or .link
             if target_text:
                 if '.link' in target_text:
                     is_pointer_assign = True
-                for ident in POINTER_IDENTIFIERS:
-                    if target_text == ident or target_text.startswith(f"{ident}."):
-                        is_pointer_assign = True
-                        break
-            
-            if is_pointer_assign and assign_text and len(assign_text) > 3:
-                candidates.append({
-                    'type': 'pointer_assign',
-                    'text': assign_text.strip(),
-                    'line_num': line_num,
-                    'col_offset': node.col_offset,
-                    'score': WEIGHT_POINTER,
-                    'function': func_name,
-                    'full_line': line_text,
-                })
-        
+                elif target_text.split('.', 1)[0] in POINTER_IDENTIFIERS:
+                    is_pointer_assign = True
+
+            if is_pointer_assign:
+                assign_text = _get_text_from_node(node, lines)
+                if assign_text and len(assign_text) > 3:
+                    candidates.append({
+                        'type': 'pointer_assign',
+                        'text': assign_text.strip(),
+                        'line_num': line_num,
+                        'col_offset': node.col_offset,
+                        'score': WEIGHT_POINTER,
+                        'function': func_name,
+                        'full_line': line_text,
+                    })
+
         # --- 4. RETURN STATEMENTS (Priority: WEIGHT_RETURN) ---
         elif isinstance(node, ast.Return):
             if node.value:
-                return_val = get_text_from_node(node.value, lines)
+                return_val = _get_text_from_node(node.value, lines)
                 if return_val and len(return_val) > 1:
                     candidates.append({
                         'type': 'return',
@@ -584,149 +640,840 @@ def make_blanks_with_context(code: str, target_count: int):
                         'function': func_name,
                         'full_line': line_text,
                     })
-    
-    # ========== DISTRIBUTION ALGORITHM ==========
-    
-    # Group candidates by function
-    by_function = {}
-    for cand in candidates:
-        func = cand['function']
-        by_function.setdefault(func, []).append(cand)
-    
-    # Sort candidates within each function by score (descending)
-    for func in by_function:
-        by_function[func].sort(key=lambda c: -c['score'])
-    
+
+    return candidates
+
+
+# ========== BLANK CANDIDATE EXTRACTION (brace languages: C#, Java, C, C++) ==========
+
+_BRACE_TOKEN_RE = re.compile(r"""
+    (?P<skip>
+        //[^\n]*                                  # line comment
+      | /\*[\s\S]*?\*/                            # block comment
+      | ^[ \t]*\#[^\n]*                           # preprocessor / #region
+      | ^[ \t]*={3,}[^\n]*                        # ===== section banners in exam files
+      | ^[ \t]*\d+[ \t]*=[^\n]*                   # "1=answer" answer-key lines
+      | ^[ \t]*[^\x00-\x7F][^\n]*                 # prose lines (e.g. Korean notes)
+      | \s+
+    )
+  | (?P<string>
+        @"(?:[^"]|"")*"                           # C# verbatim string
+      | \$?"(?:\\.|[^"\\\n])*"                    # string / interpolated string
+      | '(?:\\.|[^'\\\n])*'                       # char literal
+    )
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<number>\d[\w.]*)
+  | (?P<op>=>|\?\?=|<<=|>>=|->|::|\+\+|--|&&|\|\||\?\?|[-+*/%&|^!=<>]=|[^\s\w])
+""", re.VERBOSE | re.MULTILINE)
+
+_BRACE_ASSIGN_OPS = {'=', '+=', '-=', '*=', '/=', '%=', '&=', '|=', '^=', '<<=', '>>=', '??='}
+_BRACE_TYPE_KEYWORDS = {'class', 'struct', 'interface', 'enum', 'record', 'namespace'}
+_BRACE_PAREN_KEYWORDS = {'catch', 'using', 'lock', 'fixed', 'synchronized', 'switch'}
+_BRACE_BARE_KEYWORDS = {'else', 'do', 'try', 'finally', 'unsafe', 'checked', 'unchecked'}
+_BRACE_CONTROL_KEYWORDS = (
+    {'if', 'while', 'for', 'foreach', 'return', 'new', 'get', 'set', 'init', 'add', 'remove'}
+    | _BRACE_PAREN_KEYWORDS | _BRACE_BARE_KEYWORDS
+)
+# Receivers whose member calls are just output, like print() in the Python path
+_BRACE_EXCLUDED_RECEIVERS = {'Console', 'System', 'Debug', 'std', 'printf', 'puts', 'cout'}
+BRACE_BOUNDARY_KEYWORDS = [
+    '== null', '!= null', 'is null', 'is not null', 'NULL', 'nullptr',
+    '< 0', '>= 0', '== 0', '.Length', '.Count', '.length', '.size()', 'index',
+]
+
+
+def _tokenize_brace_source(code: str) -> list:
+    """
+    Tokenize C-family source in one regex pass.
+
+    Returns (kind, text, start, end, line_num, col_offset) tuples; comments,
+    whitespace and prose lines are dropped.
+    """
+    tokens = []
+    line_num = 1
+    line_start = 0
+    scanned = 0
+    for match in _BRACE_TOKEN_RE.finditer(code):
+        kind = match.lastgroup
+        if kind == 'skip':
+            continue
+        start = match.start()
+        # Advance the line counter incrementally (amortized linear over the file)
+        newline = code.find('\n', scanned, start)
+        while newline != -1:
+            line_num += 1
+            line_start = newline + 1
+            newline = code.find('\n', line_start, start)
+        scanned = start
+        tokens.append((kind, match.group(), start, match.end(), line_num, start - line_start))
+    return tokens
+
+
+def _matching_paren(tokens: list, open_idx: int) -> int:
+    """Index of the ')' closing tokens[open_idx] == '(' (or len(tokens) if unbalanced)."""
+    depth = 0
+    for idx in range(open_idx, len(tokens)):
+        text = tokens[idx][1]
+        if text == '(':
+            depth += 1
+        elif text == ')':
+            depth -= 1
+            if depth == 0:
+                return idx
+    return len(tokens)
+
+
+def _split_top_level(tokens: list, separator: str) -> list:
+    """Split a token run on separator outside (), [] and {}."""
+    parts = [[]]
+    depth = 0
+    for tok in tokens:
+        text = tok[1]
+        if text in '([{':
+            depth += 1
+        elif text in ')]}':
+            depth -= 1
+        if text == separator and depth == 0:
+            parts.append([])
+        else:
+            parts[-1].append(tok)
+    return parts
+
+
+def _brace_block_owner(header: list, scopes: list):
+    """
+    Classify the block opened after header tokens.
+
+    Returns (kind, name): ('type', Name), ('function', Name/Type.Name) or ('block', None).
+    """
+    # Drop leading attributes such as [Serializable] or [Obsolete("x")]
+    start = 0
+    while start < len(header) and header[start][1] == '[':
+        depth = 0
+        for idx in range(start, len(header)):
+            if header[idx][1] == '[':
+                depth += 1
+            elif header[idx][1] == ']':
+                depth -= 1
+                if depth == 0:
+                    start = idx + 1
+                    break
+        else:
+            break
+    header = header[start:]
+    if not header:
+        return 'block', None
+
+    texts = [tok[1] for tok in header]
+    if '(' not in texts:
+        for idx, text in enumerate(texts[:-1]):
+            if text in _BRACE_TYPE_KEYWORDS and header[idx + 1][0] == 'ident' and header[idx + 1][1].strip('_'):
+                return 'type', header[idx + 1][1]
+        return 'block', None
+
+    if texts[0] in _BRACE_CONTROL_KEYWORDS or '=>' in texts or any(t in _BRACE_ASSIGN_OPS for t in texts):
+        return 'block', None
+
+    # Name is the identifier before the first '(' (skipping generic <T> arguments)
+    idx = texts.index('(') - 1
+    if idx >= 0 and texts[idx] == '>':
+        depth = 0
+        while idx >= 0:
+            if texts[idx] == '>':
+                depth += 1
+            elif texts[idx] == '<':
+                depth -= 1
+                if depth == 0:
+                    idx -= 1
+                    break
+            idx -= 1
+    # All-underscore names are _____ placeholders in exercise sources, not real methods
+    if idx < 0 or header[idx][0] != 'ident' or not header[idx][1].strip('_'):
+        return 'block', None
+
+    name = header[idx][1]
+    if scopes and scopes[-1][0] == 'type':
+        return 'function', f"{scopes[-1][1]}.{name}"
+    return 'function', name
+
+
+def _extract_brace_candidates(code: str) -> list:
+    """
+    Collect weighted blank candidates from C#/Java/C/C++ source in one pass.
+
+    Produces the same records as _extract_python_candidates: conditions,
+    for/foreach iterables, pointer/member assignments, assignment values,
+    constructor calls (new ...), member-access calls and return values.
+    """
+    tokens = _tokenize_brace_source(code)
+    if not tokens:
+        return []
+
+    lines = code.split('\n')
+    candidates = []
+
+    def emit(kind: str, run: list, score: int, func_name: str, min_len: int = 2):
+        if not run:
+            return
+        first, last = run[0], run[-1]
+        text = code[first[2]:last[3]]
+        if len(text) <= min_len or '\n' in text or '_____' in text:
+            return
+        candidates.append({
+            'type': kind,
+            'text': text,
+            'line_num': first[4],
+            'col_offset': first[5],
+            'score': score,
+            'function': func_name,
+            'full_line': lines[first[4] - 1],
+        })
+
+    def condition_score(run: list) -> int:
+        text = code[run[0][2]:run[-1][3]] if run else ''
+        if _is_pointer_text(text) or '->next' in text or '.next' in text:
+            return WEIGHT_CONDITION
+        if any(kw in text for kw in BRACE_BOUNDARY_KEYWORDS):
+            return WEIGHT_BOUNDARY
+        return WEIGHT_CONDITION
+
+    def scan_control(run: list, func_name: str) -> int:
+        """Emit candidates for leading control clauses; return index of the remaining statement."""
+        i = 0
+        while i < len(run):
+            text = run[i][1]
+            has_paren = i + 1 < len(run) and run[i + 1][1] == '('
+            if text in _BRACE_BARE_KEYWORDS:
+                i += 1
+                continue
+            if text in ('if', 'while') and has_paren:
+                close = _matching_paren(run, i + 1)
+                inner = run[i + 2:close]
+                emit('condition', inner, condition_score(inner), func_name)
+                i = close + 1
+                continue
+            if text in ('for', 'foreach') and has_paren:
+                close = _matching_paren(run, i + 1)
+                inner = run[i + 2:close]
+                clauses = _split_top_level(inner, ';')
+                if len(clauses) == 3:
+                    emit('condition', clauses[1], condition_score(clauses[1]), func_name)
+                else:
+                    # foreach (var x in items) / Java for (T x : items)
+                    inner_texts = [tok[1] for tok in inner]
+                    for sep in ('in', ':'):
+                        if sep in inner_texts:
+                            iterable = inner[inner_texts.index(sep) + 1:]
+                            emit('for_iter', iterable, WEIGHT_CONDITION, func_name)
+                            break
+                i = close + 1
+                continue
+            if text in _BRACE_PAREN_KEYWORDS and has_paren:
+                i = _matching_paren(run, i + 1) + 1
+                continue
+            break
+        return i
+
+    def scan_statement(run: list, func_name: str):
+        rest = run[scan_control(run, func_name):]
+        if not rest:
+            return
+        head = rest[0][1]
+        if head == 'return':
+            emit('return', rest[1:], WEIGHT_RETURN, func_name, min_len=1)
+            return
+        if head in ('throw', 'break', 'continue', 'goto', 'case', 'default', 'using', 'import', 'package'):
+            return
+
+        assign_at = -1
+        depth = 0
+        for idx, tok in enumerate(rest):
+            text = tok[1]
+            if text in '([{':
+                depth += 1
+            elif text in ')]}':
+                depth -= 1
+            elif depth == 0 and text in _BRACE_ASSIGN_OPS:
+                assign_at = idx
+                break
+
+        if assign_at > 0:
+            target = rest[:assign_at]
+            value = rest[assign_at + 1:]
+            target_text = code[target[0][2]:target[-1][3]]
+            target_name = target[-1][1]
+            if ('.' in target_text or '->' in target_text or target_name in POINTER_IDENTIFIERS) \
+                    and len(target) <= 5:
+                emit('pointer_assign', rest, WEIGHT_POINTER, func_name, min_len=3)
+            elif value and value[0][1] == 'new':
+                emit('constructor', value, WEIGHT_BOUNDARY, func_name)
+            else:
+                emit('assign', value, WEIGHT_BOUNDARY, func_name)
+            return
+
+        if head == 'new':
+            emit('constructor', rest, WEIGHT_BOUNDARY, func_name)
+            return
+
+        # receiver.Member(...) call statements
+        if rest[0][0] == 'ident' and rest[0][1] not in _BRACE_EXCLUDED_RECEIVERS:
+            idx = 1
+            while idx + 1 < len(rest) and rest[idx][1] in ('.', '->') and rest[idx + 1][0] == 'ident':
+                idx += 2
+            if idx > 1 and idx < len(rest) and rest[idx][1] == '(':
+                emit('member_access', rest[:idx], WEIGHT_RETURN, func_name)
+
+    scopes: list = []       # (kind, name) per open brace
+    func_stack: list = []   # enclosing function names
+    statement: list = []
+    paren_depth = 0         # ';' inside for(...) or lambda bodies in calls do not end a statement
+    for tok in tokens:
+        text = tok[1]
+        if text == '(':
+            paren_depth += 1
+        elif text == ')':
+            paren_depth = max(0, paren_depth - 1)
+        elif paren_depth > 0 and text in ('{', '}', ';'):
+            if not (text == '{' and statement and statement[-1][1] != '=>'):
+                statement.append(tok)
+                continue
+            # A block opening inside unbalanced parens: recover at the block
+            paren_depth = 0
+
+        if text == ';':
+            if statement:
+                scan_statement(statement, func_stack[-1] if func_stack else '__global__')
+            statement = []
+        elif text == '{':
+            kind, name = _brace_block_owner(statement, scopes)
+            if statement and kind == 'block':
+                scan_control(statement, func_stack[-1] if func_stack else '__global__')
+            scopes.append((kind, name))
+            if kind == 'function':
+                func_stack.append(name)
+            statement = []
+        elif text == '}':
+            if scopes:
+                kind, _ = scopes.pop()
+                if kind == 'function' and func_stack:
+                    func_stack.pop()
+            statement = []
+        else:
+            statement.append(tok)
+
+    return candidates
+
+
+# ========== CANDIDATE INDEX (per source hash) ==========
+
+# Extracted candidates are cached by content hash so difficulty changes only re-run
+# selection/rendering. Memory holds a few recent sources; disk keeps one sidecar per
+# source, trimmed to the newest _CANDIDATE_INDEX_DISK_SIZE files.
+_CANDIDATE_INDEX_MEMORY: "OrderedDict[str, list | None]" = OrderedDict()
+_CANDIDATE_INDEX_MEMORY_SIZE = 16
+try:
+    _CANDIDATE_INDEX_DISK_SIZE = max(0, int(os.getenv("STUDYHELPER_CANDIDATE_INDEX_SIZE", "200")))
+except ValueError:
+    _CANDIDATE_INDEX_DISK_SIZE = 200
+_CANDIDATE_INDEX_LOCK = threading.Lock()
+# Bumped when the sidecar layout changes (2: full_line stored with each candidate,
+# 3: keyed by line split + source instead of the source alone)
+_CANDIDATE_INDEX_FORMAT = 3
+
+
+def _candidate_index_dir() -> str:
+    """cache/candidates under the runtime dir when set (bundled exe), else beside src."""
+    root = os.getenv("STUDYHELPER_RUNTIME_DIR") or os.path.dirname(BASE_DIR)
+    return os.path.join(root, "cache", "candidates")
+
+
+def _read_candidate_index(path: str, digest: str):
+    """Return (found, candidates) from a sidecar index file; anything malformed is a miss."""
+    try:
+        with open(path, 'rb') as f:
+            data = loads(f.read())
+    except (OSError, ValueError):
+        return False, None
+    if not isinstance(data, dict):
+        return False, None
+    if (
+        data.get("format") != _CANDIDATE_INDEX_FORMAT
+        or data.get("generator_version") != GENERATOR_VERSION
+        or data.get("key") != digest
+    ):
+        return False, None
+    if not data.get("has_candidates"):
+        return True, None
+    candidates = data.get("candidates")
+    if not isinstance(candidates, list) or not all(
+        isinstance(c, dict) and isinstance(c.get("full_line"), str) for c in candidates
+    ):
+        return False, None
+    return True, candidates
+
+
+def _write_candidate_index(path: str, digest: str, candidates: list | None):
+    data = {
+        "format": _CANDIDATE_INDEX_FORMAT,
+        "generator_version": GENERATOR_VERSION,
+        "key": digest,
+        "has_candidates": candidates is not None,
+        # full_line is stored as extracted: callers split lines differently
+        # (split vs splitlines), so rebuilding it from their lines can misalign
+        "candidates": candidates or [],
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Atomic so a concurrent reader never parses a truncated index
+        atomic_write(path, dumps(data), fsync=False)
+        _trim_candidate_index(os.path.dirname(path))
+    except OSError:
+        pass
+
+
+def _trim_candidate_index(directory: str):
+    """Keep the newest _CANDIDATE_INDEX_DISK_SIZE sidecars (every pasted text adds one)."""
+    try:
+        with os.scandir(directory) as entries:
+            files = [
+                (entry.stat().st_mtime, entry.path)
+                for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            ]
+    except OSError:
+        return
+    files.sort()
+    for _, stale in files[: max(0, len(files) - _CANDIDATE_INDEX_DISK_SIZE)]:
+        try:
+            os.unlink(stale)
+        except OSError:
+            pass
+
+
+def clear_candidate_index():
+    """Drop the in-memory candidate index and every sidecar file."""
+    with _CANDIDATE_INDEX_LOCK:
+        _CANDIDATE_INDEX_MEMORY.clear()
+    directory = _candidate_index_dir()
+    try:
+        with os.scandir(directory) as entries:
+            stale = [entry.path for entry in entries if entry.name.endswith(".json") and entry.is_file()]
+    except OSError:
+        return
+    for path in stale:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _get_blank_candidates(code: str, lines: list, split: str):
+    """
+    Return extracted blank candidates for code, or None if no structural engine applies.
+
+    Python sources go through the AST extractor; sources that fail to parse are tried
+    with the brace-language scanner (C#, Java, C, C++). None means "use the token fallback".
+
+    split names how the caller built lines ("splitlines" or "newline"): full_line
+    comes from lines, and the two splits disagree on CRLF and other separators,
+    so it is part of the index key.
+
+    Lookup order: memory -> sidecar index (cache/candidates/<key>.json) -> extraction.
+    Returned records are shared; callers must copy before mutating.
+    """
+    digest = hashlib.sha256(f"{split}\0{code}".encode('utf-8')).hexdigest()
+
+    with _CANDIDATE_INDEX_LOCK:
+        if digest in _CANDIDATE_INDEX_MEMORY:
+            _CANDIDATE_INDEX_MEMORY.move_to_end(digest)
+            return _CANDIDATE_INDEX_MEMORY[digest]
+
+    path = os.path.join(_candidate_index_dir(), f"{digest}.json")
+    found, candidates = _read_candidate_index(path, digest)
+    if not found:
+        try:
+            with phase("ast_parse"):
+                tree = ast.parse(code)
+        except SyntaxError:
+            with phase("extract_candidates"):
+                candidates = _extract_brace_candidates(code) or None
+        else:
+            with phase("extract_candidates"):
+                candidates = _extract_python_candidates(tree, lines)
+        _write_candidate_index(path, digest, candidates)
+
+    with _CANDIDATE_INDEX_LOCK:
+        _CANDIDATE_INDEX_MEMORY[digest] = candidates
+        while len(_CANDIDATE_INDEX_MEMORY) > _CANDIDATE_INDEX_MEMORY_SIZE:
+            _CANDIDATE_INDEX_MEMORY.popitem(last=False)
+    return candidates
+
+
+# ========== BLANK SELECTION ==========
+
+MIN_LINE_DISTANCE = 2  # Minimum lines between blanks
+
+# Function importance weights for distribution
+FUNCTION_WEIGHTS = {
+    'appendNode': 3, 'insertNode': 3, 'insertAt': 3, 'deleteNode': 3,
+    'searchNode': 2, 'printNodes': 1, 'get_list_data': 1,
+    'Node': 1, '__init__': 1,
+    'saveToFile': 0.5, 'loadFromFile': 0.5, 'clearList': 0.5,
+    '__main__': 0.3, 'main': 0.3,
+}
+DEFAULT_FUNC_WEIGHT = 1.0
+
+
+def _function_weight(func_name: str) -> float:
+    # Handle Class.method names
+    return FUNCTION_WEIGHTS.get(func_name.split('.')[-1], DEFAULT_FUNC_WEIGHT)
+
+
+def _select_blanks(candidates: list, target_count: int) -> list:
+    """
+    Pick up to target_count candidates and return them in selection order.
+
+    1. Per-function quotas by FUNCTION_WEIGHTS, highest score first, keeping
+       MIN_LINE_DISTANCE between blanks and skipping repeated concept patterns.
+    2. Fill the remainder from the best leftovers, still keeping line distance.
+    3. If still short, take the best leftovers with no constraints.
+
+    Line occupancy is tracked in a bitmap and leftovers are drawn from heaps,
+    so selection is O(n log n) in the number of candidates.
+    """
+    if target_count <= 0 or not candidates:
+        return []
+
+    # Group candidate indexes by function, preserving first-seen order
+    by_function: dict[str, list[int]] = {}
+    for idx, cand in enumerate(candidates):
+        by_function.setdefault(cand['function'], []).append(idx)
+
+    # Sort candidates within each function by score (descending, stable)
+    for indexes in by_function.values():
+        indexes.sort(key=lambda i: -candidates[i]['score'])
+
     # Calculate target allocation per function
-    total_weight = sum(FUNCTION_WEIGHTS.get(f.split('.')[-1], DEFAULT_FUNC_WEIGHT) 
-                       for f in by_function.keys())
+    total_weight = sum(_function_weight(f) for f in by_function)
     if total_weight == 0:
         total_weight = len(by_function)
-    
-    allocations = {}
-    for func in by_function:
-        func_base = func.split('.')[-1]  # Handle Class.method names
-        weight = FUNCTION_WEIGHTS.get(func_base, DEFAULT_FUNC_WEIGHT)
-        alloc = max(1, round(target_count * weight / total_weight))
-        allocations[func] = alloc
-    
-    # Select candidates with line distance constraint
-    selected = []
-    used_lines = set()
+
+    max_line = max(c['line_num'] for c in candidates)
+    occupied = bytearray(max_line + MIN_LINE_DISTANCE + 1)
+    reach = MIN_LINE_DISTANCE - 1
+
+    def line_is_free(line: int) -> bool:
+        lo = max(0, line - reach)
+        return not any(occupied[lo:line + reach + 1])
+
+    selected_idx: list[int] = []
+    taken = bytearray(len(candidates))
+
+    def take(idx: int):
+        selected_idx.append(idx)
+        taken[idx] = 1
+        occupied[candidates[idx]['line_num']] = 1
+
+    # 1. Per-function quotas
     used_patterns = set()  # Track concept patterns to avoid duplicates
-    
-    for func_name in sorted(by_function.keys(), 
-                           key=lambda f: -FUNCTION_WEIGHTS.get(f.split('.')[-1], DEFAULT_FUNC_WEIGHT)):
-        func_candidates = by_function[func_name]
-        func_quota = allocations.get(func_name, 1)
+    for func_name in sorted(by_function, key=lambda f: -_function_weight(f)):
+        func_quota = max(1, round(target_count * _function_weight(func_name) / total_weight))
         func_selected = 0
-        
-        for cand in func_candidates:
+
+        for idx in by_function[func_name]:
             if func_selected >= func_quota:
                 break
-            
-            line = cand['line_num']
-            
-            # Check minimum line distance
-            if any(abs(line - used) < MIN_LINE_DISTANCE for used in used_lines):
+
+            cand = candidates[idx]
+            if not line_is_free(cand['line_num']):
                 continue
-            
+
             # Check for duplicate pattern (same text in same function)
             pattern_key = (func_name, cand['text'][:20])
             if pattern_key in used_patterns:
                 continue
-            
-            selected.append(cand)
-            used_lines.add(line)
+
+            take(idx)
             used_patterns.add(pattern_key)
             func_selected += 1
+
+    # 2. Fill remaining quota from high-score leftovers
+    if len(selected_idx) < target_count:
+        heap = [(-c['score'], i) for i, c in enumerate(candidates) if not taken[i]]
+        heapq.heapify(heap)
+        while heap and len(selected_idx) < target_count:
+            _, idx = heapq.heappop(heap)
+            if line_is_free(candidates[idx]['line_num']):
+                take(idx)
+
+    # 3. If still not enough, add more with relaxed constraints
+    if len(selected_idx) < target_count:
+        heap = [(-c['score'], c['line_num'], i) for i, c in enumerate(candidates) if not taken[i]]
+        heapq.heapify(heap)
+        while heap and len(selected_idx) < target_count:
+            take(heapq.heappop(heap)[2])
+
+    return [candidates[i] for i in selected_idx[:target_count]]
+
+
+def make_blanks_with_context(code: str, target_count: int, seed: int | None = None):
+    """
+    AST-based blank generation with CONCEPT-UNIT extraction.
+    Python uses the ast module; C#/Java/C/C++ use the single-pass brace scanner.
     
-    # Fill remaining quota from high-score leftovers
-    remaining = target_count - len(selected)
-    if remaining > 0:
-        leftover = [c for c in candidates if c not in selected]
-        leftover.sort(key=lambda c: -c['score'])
-        
-        for cand in leftover:
-            if len(selected) >= target_count:
-                break
-            
-            line = cand['line_num']
-            if any(abs(line - used) < MIN_LINE_DISTANCE for used in used_lines):
-                continue
-            
-            selected.append(cand)
-            used_lines.add(line)
-    
-    # If still not enough, add more with relaxed constraints
-    if len(selected) < target_count:
-        leftover = [c for c in candidates if c not in selected]
-        leftover.sort(key=lambda c: (-c['score'], c['line_num']))
-        for cand in leftover:
-            if len(selected) >= target_count:
-                break
-            selected.append(cand)
-    
-    selected = selected[:target_count]
-    
-    # ========== BUILD OUTPUT ==========
-    
-    # Sort by line/column and assign blank numbers
-    selected.sort(key=lambda b: (b['line_num'], b.get('col_offset', 0)))
-    for idx, blank in enumerate(selected, 1):
-        blank['blank_num'] = idx
-        blank['answer'] = blank['text']  # For compatibility with build_inline_blank_code
-    
-    answer_key = {
-        "_type": "fill_in_blank_inline",
-        "_blanks": selected,
-        "_original_code": code,
-    }
-    for blank in selected:
-        answer_key[str(blank["blank_num"])] = blank["text"]
-    
-    question_text = build_inline_blank_code(code, selected)
-    return question_text, answer_key
+    Key Principles:
+    1. Extract CONCEPT UNITS, not individual tokens
+       - Full conditions: "current.link is not None" as one blank
+       - Full pointer assignments: "current.link = node" as one blank
+    2. Weighted Priority:
+       - Pointer/Structure manipulation (weight 3): head=, current.link=, pre.link=
+       - Control conditions (weight 3): if/while conditions
+       - Boundary checks (weight 2): index < 0, head is None
+       - Return values (weight 1): return result
+    3. Distribute evenly across FUNCTIONS
+    4. Maintain minimum LINE DISTANCE between blanks
+    5. Avoid duplicates of same concept pattern
+
+    seed only affects the random token fallback used for non-Python sources.
+    """
+    return make_blank_variants(code, {target_count: target_count}, seed)[target_count]
 
 
-def _fallback_token_blanks(code: str, target_count: int):
+def make_blank_variants(code: str, target_counts: dict, seed: int | None = None) -> dict:
     """
-    Fallback to simple token-based blank generation if AST parsing fails.
+    Several blank sets from one candidate extraction, e.g. all four difficulties.
+
+    target_counts: {key: blank count} -> {key: (question_text, answer_key)}.
+    Candidates and line offsets are computed once; each variant only runs the
+    selector and the single-pass renderer.
     """
-    lines = code.splitlines()
-    token_re = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\b\d+\b")
+    # ========== CANDIDATE EXTRACTION (cached per source) ==========
     
-    EXCLUDED_KEYWORDS = {
-        'print', 'def', 'class', 'import', 'from', 'as', 'pass',
-        'True', 'False', 'None', 'self', 'cls',
-        '__init__', '__main__', '__name__',
+    candidates = _get_blank_candidates(code, code.splitlines(), "splitlines")
+    if candidates is None:
+        # Fallback to simple token-based extraction if no structural engine applies
+        with phase("fallback_tokens"):
+            return {key: _fallback_token_blanks(code, count, seed) for key, count in target_counts.items()}
+
+    offsets = _line_offsets(code)
+    variants = {}
+    for key, target_count in target_counts.items():
+        # ========== DISTRIBUTION ALGORITHM ==========
+
+        # Copy so numbering below does not leak into the shared candidate index
+        with phase("select"):
+            selected = [dict(c) for c in _select_blanks(candidates, target_count)]
+        if len(selected) < target_count:
+            # Too few structural candidates (short C#/Java exercises): top up with
+            # plain tokens so the difficulty still sets the blank count
+            with phase("fallback_tokens"):
+                selected += _token_fill_blanks(code, selected, target_count - len(selected), seed)
+
+        # ========== BUILD OUTPUT ==========
+
+        # Sort by line/column and assign blank numbers
+        selected.sort(key=lambda b: (b['line_num'], b.get('col_offset', 0)))
+        for idx, blank in enumerate(selected, 1):
+            blank['blank_num'] = idx
+            blank['answer'] = blank['text']  # For compatibility with build_inline_blank_code
+
+        answer_key = {
+            "_type": "fill_in_blank_inline",
+            "_blanks": selected,
+            "_original_code": code,
+        }
+        for blank in selected:
+            answer_key[str(blank["blank_num"])] = blank["text"]
+
+        with phase("render"):
+            variants[key] = (_render_inline_blanks(code, offsets, selected), answer_key)
+    return variants
+
+
+# Share of extracted candidates to blank per Mode 1 difficulty (web UI difficulty names)
+MODE1_DIFFICULTY_RATIOS = {'easy': 0.3, 'normal': 0.5, 'hard': 0.7, 'extreme': 1.0}
+BLANK_MARKER = "_____"
+
+
+def make_marked_blank_question(code: str, difficulty: str = "normal") -> dict | None:
+    """
+    Build a Mode 1 style question locally: code with _____ markers plus answers.
+
+    Returns {"codeWithBlanks", "description", "blanks": [{"num", "answer", "hint"}]}
+    in the same shape the web UI expects from its AI generator, or None when no
+    structural candidates exist (the caller should fall back to AI). Markers that
+    already exist in the source are numbered too, with answer None.
+    """
+    lines = code.split("\n")
+    candidates = _get_blank_candidates(code, lines, "newline")
+    if not candidates:
+        return None
+
+    ratio = MODE1_DIFFICULTY_RATIOS.get(str(difficulty).lower(), MODE1_DIFFICULTY_RATIOS['normal'])
+    target = max(1, round(len(candidates) * ratio))
+    selected = _select_blanks(candidates, target)
+
+    by_line: dict[int, list] = {}
+    for cand in selected:
+        by_line.setdefault(cand['line_num'], []).append(cand)
+
+    blanks = []
+    for line_idx, line in enumerate(lines):
+        line_blanks = sorted(by_line.get(line_idx + 1, []), key=lambda c: c['col_offset'])
+        pieces = []
+        ours = {}  # new column -> candidate
+        cursor = 0
+        for cand in line_blanks:
+            start = cand['col_offset']
+            end = start + len(cand['text'])
+            if start < cursor or line[start:end] != cand['text']:
+                continue
+            pieces.append(line[cursor:start])
+            ours[sum(len(p) for p in pieces)] = cand
+            pieces.append(BLANK_MARKER)
+            cursor = end
+        pieces.append(line[cursor:])
+        new_line = "".join(pieces)
+        lines[line_idx] = new_line
+
+        for match in re.finditer(BLANK_MARKER, new_line):
+            cand = ours.get(match.start())
+            blanks.append({
+                "num": len(blanks) + 1,
+                "answer": cand['text'] if cand else None,
+                "hint": cand['type'] if cand else "",
+            })
+
+    return {
+        "codeWithBlanks": "\n".join(lines),
+        "description": "",
+        "blanks": blanks,
     }
-    
-    candidates = []
-    for i, line in enumerate(lines):
+
+
+FALLBACK_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\b\d+\b")
+
+FALLBACK_EXCLUDED_KEYWORDS = {
+    'print', 'def', 'class', 'import', 'from', 'as', 'pass',
+    'True', 'False', 'None', 'self', 'cls',
+    '__init__', '__main__', '__name__',
+}
+
+
+def _iter_source_lines(code: str):
+    """Yield source lines lazily, numbered the same way as the renderer's split on newlines."""
+    start = 0
+    while True:
+        end = code.find("\n", start)
+        if end == -1:
+            yield code[start:]
+            return
+        yield code[start:end]
+        start = end + 1
+
+
+def _iter_fallback_tokens(code: str):
+    """Yield (line_num, col_offset, token, line) for every blankable token, one line at a time."""
+    for line_num, raw_line in enumerate(_iter_source_lines(code), 1):
+        line = raw_line.rstrip("\r")
         stripped = line.strip()
         if not stripped or stripped.startswith('#'):
             continue
-        
-        for match in token_re.finditer(line):
-            answer = match.group().strip()
-            if answer in EXCLUDED_KEYWORDS or len(answer) <= 1:
+
+        for match in FALLBACK_TOKEN_RE.finditer(line):
+            answer = match.group()
+            if answer in FALLBACK_EXCLUDED_KEYWORDS or len(answer) <= 1:
                 continue
-            
-            candidates.append({
-                "line_num": i + 1,
-                "answer": answer,
-                "text": answer,
-                "full_line": line.rstrip("\n"),
-                "col_offset": match.start(),
-            })
-    
-    random.shuffle(candidates)
-    blanks = candidates[:target_count]
-    blanks.sort(key=lambda b: (b["line_num"], b.get("col_offset", 0)))
-    
-    for idx, blank in enumerate(blanks, 1):
-        blank["blank_num"] = idx
+            yield line_num, match.start(), answer, line
+
+
+def _reservoir_sample(items, k: int, rng: random.Random) -> list:
+    """
+    Uniformly sample k items from an iterable in one pass with O(k) memory.
+
+    Uses Li's Algorithm L: after the reservoir fills, it jumps ahead by a random
+    gap, so only O(k log(n/k)) random numbers are drawn for n items.
+    """
+    reservoir = []
+    if k <= 0:
+        return reservoir
+
+    weight = 1.0
+    next_index = k
+    for index, item in enumerate(items):
+        if index < k:
+            reservoir.append(item)
+            if index == k - 1:
+                weight = math.exp(math.log(1.0 - rng.random()) / k)
+                next_index = k + _reservoir_gap(rng, weight)
+        elif index == next_index:
+            reservoir[rng.randrange(k)] = item
+            weight *= math.exp(math.log(1.0 - rng.random()) / k)
+            next_index += 1 + _reservoir_gap(rng, weight)
+    return reservoir
+
+
+def _reservoir_gap(rng: random.Random, weight: float) -> int:
+    if weight >= 1.0:
+        return 0
+    if weight <= 0.0:
+        return sys.maxsize
+    return int(math.log(1.0 - rng.random()) / math.log(1.0 - weight))
+
+
+def _token_fill_blanks(code: str, taken: list, count: int, seed: int | None = None) -> list:
+    """
+    Up to count fallback-token blanks that do not overlap the taken blanks,
+    as candidate records (type 'token') so they render like structural ones.
+    """
+    spans_by_line: dict[int, list] = {}
+    for blank in taken:
+        start = blank.get('col_offset', 0)
+        spans_by_line.setdefault(blank['line_num'], []).append((start, start + len(blank['text'])))
+
+    def free(item):
+        line_num, col, token, _ = item
+        if not token.strip('_'):
+            return False  # existing _____ markers
+        end = col + len(token)
+        return all(end <= start or col >= stop for start, stop in spans_by_line.get(line_num, ()))
+
+    sampled = _reservoir_sample(filter(free, _iter_fallback_tokens(code)), count, random.Random(seed))
+    return [
+        {
+            'type': 'token',
+            'text': token,
+            'line_num': line_num,
+            'col_offset': col,
+            'score': 0,
+            'function': '',
+            'full_line': line,
+        }
+        for line_num, col, token, line in sampled
+    ]
+
+
+def _fallback_token_blanks(code: str, target_count: int, seed: int | None = None):
+    """
+    Fallback to simple token-based blank generation if AST parsing fails.
+
+    Tokens are streamed line by line and reservoir-sampled, so only target_count
+    candidates are ever materialized. Pass seed for reproducible blanks.
+    """
+    rng = random.Random(seed)
+    sampled = _reservoir_sample(_iter_fallback_tokens(code), target_count, rng)
+    sampled.sort(key=lambda item: (item[0], item[1]))
+
+    blanks = []
+    for idx, (line_num, col_offset, answer, line) in enumerate(sampled, 1):
+        blanks.append({
+            "line_num": line_num,
+            "answer": answer,
+            "text": answer,
+            "full_line": line,
+            "col_offset": col_offset,
+            "blank_num": idx,
+        })
     
     answer_key = {
         "_type": "fill_in_blank_inline",
@@ -739,139 +1486,304 @@ def _fallback_token_blanks(code: str, target_count: int):
     question_text = build_inline_blank_code(code, blanks)
     return question_text, answer_key
 
-def make_implementation_challenge(code: str):
+# ========== IMPLEMENTATION CHALLENGE SECTIONS ==========
+
+_DEFINITION_LINE_RE = re.compile(r"\s*(?:(class)|(?:async\s+)?def)\s+([A-Za-z_]\w*)")
+
+
+def _is_main_guard(stripped: str) -> bool:
+    return stripped.startswith('if __name__') and '__main__' in stripped
+
+
+def _is_section_header(stripped: str) -> bool:
+    """주석 섹션 헤더 (## ... ##)"""
+    return stripped.startswith("##") and stripped.endswith("##")
+
+
+def _ast_section_spans(tree, lines) -> list:
     """
-    코드 전체를 섹션별로 분리하여 백지복습 챌린지 생성
-    - 함수 (def)
-    - 클래스 (class) 
-    - 전역 변수 선언
-    - if __name__ == "__main__": 블록
-    - 주석으로 구분된 섹션
+    Top-level function/class/main-guard spans from ast line numbers.
+
+    Each span: {type, name, start (first decorator), header_end, end, children};
+    class children are the methods defined directly in the class body.
     """
-    lines = code.splitlines()
-    challenges = []
-    
-    # 1단계: 코드를 섹션으로 분리
-    sections = []
-    current_section = {"type": "code", "header": "", "lines": [], "start_line": 1}
-    
+    def span_of(node, kind):
+        start = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', [])])
+        header_end = max(node.lineno, node.body[0].lineno - 1)
+        # Comments between the signature and the first statement belong to the body
+        while header_end > node.lineno and (
+            not lines[header_end - 1].strip() or lines[header_end - 1].lstrip().startswith('#')
+        ):
+            header_end -= 1
+        return {
+            "type": kind,
+            "name": getattr(node, 'name', ''),
+            "start": start,
+            "header_end": header_end,
+            "end": node.end_lineno,
+            "children": [],
+        }
+
+    spans = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            span = span_of(node, "class")
+            span["children"] = [span_of(child, "method") for child in node.body if isinstance(child, _FUNCTION_NODES)]
+            spans.append(span)
+        elif isinstance(node, _FUNCTION_NODES):
+            spans.append(span_of(node, "function"))
+        elif isinstance(node, ast.If) and _is_main_guard(lines[node.lineno - 1].strip()):
+            spans.append(span_of(node, "main_block"))
+    return spans
+
+
+def _token_section_spans(code: str) -> list | None:
+    """
+    Same spans as _ast_section_spans, from tokenize INDENT/DEDENT structure.
+
+    Used when ast.parse fails (Python 2 prints, a half-written function).
+    Returns None when the source does not tokenize as Python (tokenizer
+    errors, stray ERRORTOKENs, a class header not ending in ':' or a def
+    header without one) so the caller can fall back to _line_section_spans.
+    """
+    spans = []
+    open_spans = []  # (span, depth) still waiting for their body to end
+    depth = 0
+    at_line_start = True
+    last_logical_line = 0
+    decorator_line = None
+    previous = ""
+    brackets = 0
+    header_colon = False  # ':' outside brackets on the current logical line
+
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+            if tok.type in (tokenize.COMMENT, tokenize.NL):
+                continue
+            if tok.type == tokenize.ERRORTOKEN and tok.string.strip():
+                return None
+            if tok.type == tokenize.INDENT:
+                depth += 1
+                continue
+            if tok.type == tokenize.DEDENT:
+                depth -= 1
+                continue
+            if tok.type == tokenize.NEWLINE:
+                last_logical_line = tok.start[0]
+                at_line_start = True
+                if open_spans and open_spans[-1][0]["header_end"] is None:
+                    pending = open_spans[-1][0]
+                    if previous != ':' and not (header_colon and pending["type"] in ("function", "method")):
+                        return None
+                    pending["header_end"] = tok.start[0]
+                header_colon = False
+                continue
+            previous = tok.string
+            if tok.type == tokenize.OP:
+                if tok.string in "([{":
+                    brackets += 1
+                elif tok.string in ")]}":
+                    brackets -= 1
+                elif tok.string == ':' and brackets == 0:
+                    header_colon = True
+            if tok.type == tokenize.ENDMARKER or not at_line_start:
+                continue
+
+            at_line_start = False
+            while open_spans and open_spans[-1][1] >= depth:
+                open_spans.pop()[0]["end"] = last_logical_line
+
+            row = tok.start[0]
+            if tok.string == '@':
+                if decorator_line is None:
+                    decorator_line = row
+                continue
+
+            match = _DEFINITION_LINE_RE.match(tok.line)
+            parent = open_spans[-1][0] if open_spans else None
+            kind = None
+            if depth == 0 and match:
+                kind = "class" if match.group(1) else "function"
+            elif depth == 0 and _is_main_guard(tok.line.strip()):
+                kind = "main_block"
+            elif depth == 1 and match and not match.group(1) and parent and parent["type"] == "class":
+                kind = "method"
+
+            if kind:
+                span = {
+                    "type": kind,
+                    "name": match.group(2) if match else "",
+                    "start": decorator_line or row,
+                    "header_end": None,
+                    "end": row,
+                    "children": [],
+                }
+                (parent["children"] if kind == "method" else spans).append(span)
+                open_spans.append((span, depth))
+            decorator_line = None
+    except (tokenize.TokenError, SyntaxError):
+        return None
+
+    for span, _ in open_spans:
+        span["end"] = max(span["end"], last_logical_line)
+    for span in spans:
+        for item in [span] + span["children"]:
+            if item["header_end"] is None:
+                item["header_end"] = item["start"]
+    return spans
+
+
+def _line_section_spans(lines) -> list:
+    """
+    Last-resort spans from a line/indentation scan (the original splitter).
+
+    "class "/"def " at any indent opens a section whose body is every
+    following blank, comment/docstring or more-indented line; a main guard
+    runs to the end of the file. Methods are not split out.
+    """
+    spans = []
+    line_count = len(lines)
     i = 0
-    while i < len(lines):
+    while i < line_count:
         line = lines[i]
         stripped = line.strip()
-        
-        # 주석 섹션 헤더 감지 (## ... ##)
-        if stripped.startswith("##") and stripped.endswith("##"):
-            if current_section["lines"]:
-                sections.append(current_section)
-            current_section = {"type": "section_header", "header": stripped, "lines": [], "start_line": i + 1}
-            i += 1
-            continue
-        
-        # if __name__ == "__main__": 블록 감지
-        if stripped.startswith('if __name__') and '__main__' in stripped:
-            if current_section["lines"]:
-                sections.append(current_section)
-            current_section = {"type": "main_block", "header": line, "lines": [], "start_line": i + 1}
-            i += 1
-            # 이후 모든 줄을 메인 블록으로 처리
-            while i < len(lines):
-                current_section["lines"].append(lines[i])
-                i += 1
-            sections.append(current_section)
-            current_section = {"type": "code", "header": "", "lines": [], "start_line": i + 1}
-            continue
-        
-        # 클래스 정의 감지
-        if stripped.startswith("class "):
-            if current_section["lines"]:
-                sections.append(current_section)
-            current_section = {"type": "class", "header": line, "lines": [], "start_line": i + 1}
-            indent_match = re.match(r"(\s*)", line)
-            class_indent = indent_match.group(1) + "    "
-            i += 1
-            # 클래스 본체 수집
-            while i < len(lines):
-                curr_line = lines[i]
-                curr_stripped = curr_line.strip()
-                if curr_stripped == "" or curr_line.startswith(class_indent) or curr_stripped.startswith(("#", '"""', "'''")):
-                    current_section["lines"].append(curr_line)
-                    i += 1
-                else:
-                    break
-            sections.append(current_section)
-            current_section = {"type": "code", "header": "", "lines": [], "start_line": i + 1}
-            continue
-        
-        # 함수 정의 감지
-        if stripped.startswith("def "):
-            if current_section["lines"]:
-                sections.append(current_section)
-            current_section = {"type": "function", "header": line, "lines": [], "start_line": i + 1}
-            indent_match = re.match(r"(\s*)", line)
-            func_indent = indent_match.group(1) + "    "
-            i += 1
-            # 함수 본체 수집
-            while i < len(lines):
-                curr_line = lines[i]
-                curr_stripped = curr_line.strip()
-                if curr_stripped == "" or curr_line.startswith(func_indent) or curr_stripped.startswith(("#", '"""', "'''")):
-                    current_section["lines"].append(curr_line)
-                    i += 1
-                else:
-                    break
-            sections.append(current_section)
-            current_section = {"type": "code", "header": "", "lines": [], "start_line": i + 1}
-            continue
-        
-        # 전역 변수 또는 일반 코드
-        current_section["lines"].append(line)
         i += 1
-    
-    # 마지막 섹션 추가
-    if current_section["lines"]:
-        sections.append(current_section)
-    
-    # 2단계: 섹션을 챌린지로 변환
-    for section in sections:
-        body_text = "\n".join(section["lines"]).strip()
-        
-        # 빈 섹션 제외
-        if not body_text:
-            continue
-        
-        # 섹션 헤더만 있는 경우 제외
-        if section["type"] == "section_header":
-            continue
-        
-        # 빈 줄만 있는 경우 제외
-        if not body_text.replace("\n", "").strip():
+        if _is_main_guard(stripped):
+            spans.append({"type": "main_block", "name": "", "start": i, "header_end": i, "end": line_count, "children": []})
+            break
+        if not stripped.startswith(("class ", "def ")):
             continue
-        
-        # 헤더 결정
-        if section["type"] == "function":
-            header = section["header"]
-        elif section["type"] == "class":
-            header = section["header"]
-        elif section["type"] == "main_block":
-            header = section["header"]
-        elif section["type"] == "code":
+        start = i
+        body_indent = line[:len(line) - len(line.lstrip())] + "    "
+        while i < line_count:
+            body_line = lines[i]
+            body_stripped = body_line.strip()
+            if body_stripped and not body_line.startswith(body_indent) and not body_stripped.startswith(("#", '"""', "'''")):
+                break
+            i += 1
+        match = _DEFINITION_LINE_RE.match(line)
+        spans.append({
+            "type": "class" if stripped.startswith("class ") else "function",
+            "name": match.group(2) if match else "",
+            "start": start,
+            "header_end": start,
+            "end": i,
+            "children": [],
+        })
+    return spans
+
+
+def _split_challenge_sections(code: str, split_methods: bool = False) -> list:
+    """
+    코드를 백지복습 챌린지 섹션으로 분리 (함수/클래스/메인 블록/일반 코드)
+
+    Spans come from ast end_lineno (tokenize fallback, then the line scan for
+    sources the tokenizer rejects) and every body is a
+    single slice of the source via precomputed line offsets, so the whole file
+    is handled in one linear pass. With split_methods a class becomes a
+    challenge for its non-method body plus one "method" challenge per method.
+    """
+    code = code.replace("\r\n", "\n")
+    lines = code.split("\n")
+    offsets = _line_offsets(code)
+    line_count = len(lines)
+
+    try:
+        spans = _ast_section_spans(ast.parse(code), lines)
+    except (SyntaxError, ValueError):
+        spans = _token_section_spans(code)
+        if spans is None:
+            spans = _line_section_spans(lines)
+
+    def text(first, last):
+        if first > last:
+            return ""
+        return code[offsets[first - 1]:offsets[last]]
+
+    def absorb(end, limit):
+        # Trailing blank lines and indented comments still belong to the body
+        while end < limit:
+            line = lines[end]
+            if line.strip() and not (line[:1].isspace() and line.lstrip().startswith('#')):
+                break
+            end += 1
+        return end
+
+    challenges = []
+
+    def add(signature, body, line_num, section_type, **extra):
+        body = body.strip()
+        if body:
+            challenges.append({"signature": signature, "body": body, "line_num": line_num, "type": section_type, **extra})
+
+    def add_code_run(first, last, header):
+        body = text(first, last).strip()
+        has_code = any(
+            line.strip() and not line.lstrip().startswith('#') for line in lines[first - 1:last]
+        )
+        if not has_code:
+            return
+        if not header:
             # 전역 변수나 일반 코드 블록
-            first_line = body_text.split("\n")[0].strip()
-            if "=" in first_line:
-                header = "# 전역 변수 선언"
-            else:
-                header = "# 코드 블록"
+            header = "# 전역 변수 선언" if "=" in body.split("\n", 1)[0] else "# 코드 블록"
+        add(header, body, first, "code")
+
+    def add_gap(first, last):
+        run_start, header = first, ""
+        for line_num in range(first, last + 1):
+            stripped = lines[line_num - 1].strip()
+            if _is_section_header(stripped):
+                add_code_run(run_start, line_num - 1, header)
+                run_start, header = line_num + 1, stripped
+        add_code_run(run_start, last, header)
+
+    gap_start = 1
+    for index, span in enumerate(spans):
+        limit = spans[index + 1]["start"] - 1 if index + 1 < len(spans) else line_count
+        end = absorb(span["end"], limit)
+        add_gap(gap_start, span["start"] - 1)
+        signature = text(span["start"], span["header_end"]).rstrip()
+
+        if split_methods and span["type"] == "class" and span["children"]:
+            pieces = []
+            cursor = span["header_end"] + 1
+            # One-line methods have no separate body, so they stay in the class challenge
+            methods = [m for m in span["children"] if m["end"] > m["header_end"]]
+            for m_index, method in enumerate(methods):
+                m_limit = methods[m_index + 1]["start"] - 1 if m_index + 1 < len(methods) else end
+                m_end = absorb(method["end"], m_limit)
+                pieces.append(text(cursor, method["start"] - 1))
+                cursor = m_end + 1
+                method["end"] = m_end
+            pieces.append(text(cursor, end))
+            add(signature, "".join(pieces), span["start"], "class")
+            for method in methods:
+                add(
+                    text(method["start"], method["header_end"]).rstrip(),
+                    text(method["header_end"] + 1, method["end"]),
+                    method["start"],
+                    "method",
+                    owner=span["name"],
+                )
         else:
-            header = "# 코드"
-        
-        challenges.append({
-            "signature": header,
-            "body": body_text,
-            "line_num": section["start_line"],
-            "type": section["type"]
-        })
-    
+            add(signature, text(span["header_end"] + 1, end), span["start"], span["type"])
+        gap_start = end + 1
+    add_gap(gap_start, line_count)
+
+    return challenges
+
+
+def make_implementation_challenge(code: str, split_methods: bool = False):
+    """
+    코드 전체를 섹션별로 분리하여 백지복습 챌린지 생성
+    - 함수 (def)
+    - 클래스 (class), split_methods=True이면 메서드별로 분리
+    - 전역 변수 선언
+    - if __name__ == "__main__": 블록
+    - 주석으로 구분된 섹션
+    """
+    challenges = _split_challenge_sections(code, split_methods)
+
     answer_key = {
         "_type": "implementation_challenge",
         "_challenges": challenges,
@@ -884,6 +1796,97 @@ def make_implementation_challenge(code: str):
     return question_text, answer_key
 
 
+# ========== DISTRACTOR INDEX ==========
+
+# Answers from the same syntactic class are the most plausible wrong choices
+_ANSWER_LITERAL_RE = re.compile(r"""^(?:[-+]?\d[\d_]*(?:\.\d+)?|None|True|False|null|true|false|[rbfu]?(["']).*\1)$""", re.I)
+_ANSWER_COMPARISON_RE = re.compile(r"==|!=|<=|>=|<|>|\bin\b|\bis\b|\band\b|\bor\b|\bnot\b|&&|\|\|")
+_ANSWER_ATTRIBUTE_RE = re.compile(r"^[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)+$")
+_ANSWER_HEAD_RE = re.compile(r"[A-Za-z_]\w*")
+DISTRACTOR_LENGTH_BANDS = (4, 8, 16, 32)
+DISTRACTOR_PADDING = ("None", "True", "False", "self", "0", "1", "[]", "{}")
+_DISTRACTOR_MAX_TRIES = 12
+
+
+def _answer_class(answer: str) -> str:
+    """Syntactic class of an answer: literal/comparison/call/attribute/collection/name/expression."""
+    if _ANSWER_LITERAL_RE.match(answer):
+        return 'literal'
+    if _ANSWER_COMPARISON_RE.search(answer):
+        return 'comparison'
+    if answer.endswith(')') and '(' in answer:
+        return 'call'
+    if _ANSWER_ATTRIBUTE_RE.match(answer):
+        return 'attribute'
+    if answer[:1] in '[{(':
+        return 'collection'
+    if answer.isidentifier():
+        return 'name'
+    return 'expression'
+
+
+def _length_band(answer: str) -> int:
+    """Index of the first length band the answer fits in."""
+    size = len(answer)
+    for band, limit in enumerate(DISTRACTOR_LENGTH_BANDS):
+        if size <= limit:
+            return band
+    return len(DISTRACTOR_LENGTH_BANDS)
+
+
+def _answer_head(answer: str) -> str:
+    """Leading identifier ("self" for self.x, "len" for len(x)), used as the similarity key."""
+    match = _ANSWER_HEAD_RE.search(answer)
+    return match.group() if match else ""
+
+
+def _build_distractor_index(answers) -> dict:
+    """
+    Bucket unique answers once so each question picks distractors in O(1).
+
+    Buckets go from most to least plausible: same class and leading token,
+    same class and length band, same class, then everything.
+    """
+    index = {'all': []}
+    for answer in dict.fromkeys(answers):
+        cls = _answer_class(answer)
+        keys = (('head', cls, _answer_head(answer)), ('band', cls, _length_band(answer)), ('class', cls), 'all')
+        for key in keys:
+            index.setdefault(key, []).append(answer)
+    return index
+
+
+def _pick_distractors(index: dict, correct: str, count: int = 3, rng=random) -> list:
+    """
+    Draw distinct wrong choices, most specific bucket first.
+
+    Each bucket is sampled with a bounded number of random probes instead of
+    copying it minus the correct answer, so cost does not grow with pool size.
+    """
+    cls = _answer_class(correct)
+    keys = (('head', cls, _answer_head(correct)), ('band', cls, _length_band(correct)), ('class', cls), 'all')
+    chosen = []
+    for key in keys:
+        bucket = index.get(key)
+        if not bucket:
+            continue
+        if len(bucket) <= count + 1:
+            candidates = rng.sample(bucket, len(bucket))
+        else:
+            candidates = (rng.choice(bucket) for _ in range(_DISTRACTOR_MAX_TRIES))
+        for answer in candidates:
+            if answer != correct and answer not in chosen:
+                chosen.append(answer)
+                if len(chosen) == count:
+                    return chosen
+    for answer in DISTRACTOR_PADDING:
+        if answer != correct and answer not in chosen:
+            chosen.append(answer)
+            if len(chosen) == count:
+                break
+    return chosen
+
+
 def make_multiple_choice(code: str, num_questions: int = 10):
     """코드에서 객관식 문제 생성"""
     lines = code.splitlines()
@@ -934,19 +1937,14 @@ def make_multiple_choice(code: str, num_questions: int = 10):
     
     random.shuffle(candidates)
     selected = candidates[:num_questions]
-    all_answers = list(set(c["answer"] for c in candidates))
+    distractor_index = _build_distractor_index(c["answer"] for c in candidates)
     
     questions = []
     answer_key = {}
     
     for idx, item in enumerate(selected, 1):
         correct = item["answer"]
-        wrong_pool = [a for a in all_answers if a != correct]
-        if len(wrong_pool) < 3:
-            wrong_pool.extend(["None", "True", "False", "self", "0", "1", "[]", "{}"])
-            wrong_pool = list(set(wrong_pool) - {correct})
-        
-        wrong_choices = random.sample(wrong_pool, min(3, len(wrong_pool)))
+        wrong_choices = _pick_distractors(distractor_index, correct)
         choices = [correct] + wrong_choices
         random.shuffle(choices)
         correct_index = choices.index(correct) + 1
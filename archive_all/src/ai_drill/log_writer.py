@@ -0,0 +1,245 @@
+"""
+Queue-backed log writer for server_error.log.
+
+Callers only enqueue (timestamp, level, source, message); a daemon thread
+drains the queue in batches, writes each batch with one write() call on a
+handle it keeps open, and rotates the file by size. Safe to call from the
+ThreadingTCPServer request threads. The writer thread starts lazily on the
+first message, so importing this module costs nothing.
+
+A writer used from another process than the one that created it (its
+thread does not exist there) appends messages synchronously instead.
+Spawned prewarm workers configure their own writer on the same file with
+rotation disabled, so only the server process rotates it.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+DEFAULT_LOG_FILE = Path(__file__).resolve().parent.parent / "logs" / "server_error.log"
+
+
+def _level_value(level) -> int:
+    if isinstance(level, int):
+        return level
+    return LEVELS.get(str(level).upper(), LEVELS["INFO"])
+
+
+def _format_line(created: float, level: str, source: str | None, message: str) -> str:
+    timestamp = datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
+    prefix = f"[{timestamp}] [{level}]"
+    if source:
+        prefix += f" [{source}]"
+    return f"{prefix} {message}\n"
+
+
+class AsyncLogWriter:
+    """
+    Batched, size-rotated log file writer.
+
+    - level: minimum level written (DEBUG/INFO/WARNING/ERROR)
+    - max_bytes/backup_count: rotate to .1 ... .N once the file reaches max_bytes
+      (max_bytes=0 disables rotation)
+    - flush_interval: longest time a message waits in the queue
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        level: str = "INFO",
+        max_bytes: int = 1024 * 1024,
+        backup_count: int = 3,
+        flush_interval: float = 0.5,
+        batch_size: int = 512,
+    ):
+        self.path = Path(path)
+        self.level = _level_value(level)
+        self.max_bytes = max(0, max_bytes)
+        self.backup_count = max(0, backup_count)
+        self.flush_interval = max(0.01, flush_interval)
+        self.batch_size = max(1, batch_size)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._start_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._pid = os.getpid()
+        self._handle = None
+        self._size = 0
+        self._closed = False
+        self._pending = 0
+        self._drained = threading.Condition()
+        self.dropped = 0
+
+    # ---------- caller side ----------
+
+    def log(self, message: str, level: str = "INFO", source: str | None = None):
+        level_name = str(level).upper()
+        if _level_value(level_name) < self.level or self._closed:
+            return
+        record = (time.time(), level_name, source, str(message))
+        if os.getpid() != self._pid:
+            self._write_direct(record)
+            return
+        if self._thread is None:
+            self._start()
+        with self._drained:
+            self._pending += 1
+        self._queue.put(record)
+
+    def debug(self, message: str, source: str | None = None):
+        self.log(message, "DEBUG", source)
+
+    def info(self, message: str, source: str | None = None):
+        self.log(message, "INFO", source)
+
+    def warning(self, message: str, source: str | None = None):
+        self.log(message, "WARNING", source)
+
+    def error(self, message: str, source: str | None = None):
+        self.log(message, "ERROR", source)
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Block until everything queued so far is on disk (or timeout)."""
+        deadline = time.monotonic() + timeout
+        with self._drained:
+            while self._pending > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._drained.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 2.0):
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    # ---------- writer side ----------
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            if first is None:
+                break
+            batch = [first]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+            self._write_batch(batch)
+            with self._drained:
+                self._pending -= len(batch)
+                self._drained.notify_all()
+            if stop:
+                break
+        self._close_handle()
+
+    def _open(self):
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = open(self.path, "a", encoding="utf-8")
+            self._size = self._handle.tell()
+        return self._handle
+
+    def _close_handle(self):
+        if self._handle is not None:
+            try:
+                self._handle.close()
+            except OSError:
+                pass
+            self._handle = None
+
+    def _write_batch(self, batch: list):
+        text = "".join(_format_line(*record) for record in batch)
+        try:
+            handle = self._open()
+            handle.write(text)
+            handle.flush()
+            self._size += len(text.encode("utf-8"))
+            if self.max_bytes and self._size >= self.max_bytes:
+                self._rotate()
+        except Exception:
+            self.dropped += len(batch)
+            self._close_handle()
+
+    def _rotate(self):
+        self._close_handle()
+        if self.backup_count == 0:
+            self.path.unlink(missing_ok=True)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{index}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+
+    def _write_direct(self, record):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(_format_line(*record))
+        except Exception:
+            self.dropped += 1
+
+
+_writer: AsyncLogWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_log_writer() -> AsyncLogWriter:
+    """Process-wide writer; defaults to src/logs/server_error.log until configured."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AsyncLogWriter(DEFAULT_LOG_FILE, level=os.getenv("STUDYHELPER_LOG_LEVEL", "INFO"))
+    return _writer
+
+
+def configure_logging(path: Path | str, **options) -> AsyncLogWriter:
+    """Point the process-wide writer at path (closing the previous one)."""
+    global _writer
+    options.setdefault("level", os.getenv("STUDYHELPER_LOG_LEVEL", "INFO"))
+    with _writer_lock:
+        previous = _writer
+        _writer = AsyncLogWriter(path, **options)
+    if previous is not None:
+        previous.close()
+    return _writer
+
+
+def log(message: str, level: str = "INFO", source: str | None = None):
+    get_log_writer().log(message, level, source)
+
+
+@atexit.register
+def _flush_on_exit():
+    if _writer is not None:
+        _writer.close()
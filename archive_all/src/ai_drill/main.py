@@ -1,11 +1,8 @@
 # ai_drill/main.py
 import argparse
-import json
 import os
-import re
 import sys
 import threading
-import time
 import webbrowser
 import http.server
 import socketserver
@@ -23,42 +20,20 @@ PORT = 3000
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from ai_drill.json_io import atomic_write, dumps
 from ai_drill.llm_client import LLMClient
 from ai_drill.local_generator import build_local_session
 from ai_drill.quiz_parser import parse_response
+from ai_drill.session_payload import (
+    build_session_payload,
+    detect_language_from_path,
+    normalize_answer_key,
+    strip_code_block,
+)
 
 console = Console()
 
 
-def detect_language_from_path(path: str) -> str:
-    """Infer language from file extension for UI display."""
-    ext = os.path.splitext(path)[1].lower()
-    mapping = {
-        ".py": "python",
-        ".js": "javascript",
-        ".ts": "typescript",
-        ".java": "java",
-        ".c": "c",
-        ".cpp": "cpp",
-        ".txt": "text",
-        ".md": "markdown",
-    }
-    return mapping.get(ext, "text")
-
-
-def strip_code_block(text: str) -> str:
-    """
-    Remove markdown fences and return the first code block if present.
-    Also trims stray ```json blocks from LLM responses.
-    """
-    if not text:
-        return ""
-    code_match = re.search(r"```(?:\w+)?\s*([\s\S]*?)```", text)
-    if code_match:
-        return code_match.group(1).strip()
-    return text.strip()
-
-
 def load_api_key_from_file() -> str | None:
     """
     Optional helper to read a locally stored Gemini key so we do not hard-code
@@ -73,45 +48,6 @@ def load_api_key_from_file() -> str | None:
     return None
 
 
-def normalize_answer_key(answer_key) -> dict:
-    """
-    Flatten various answer_key shapes that the LLM/local generator may emit.
-    Accepts {"answer_key": {...}} or {"1": "..."} etc.
-    Preserves special keys starting with _ (like _type, _questions, _blanks)
-    """
-    if not isinstance(answer_key, dict):
-        return {}
-    if "answer_key" in answer_key and isinstance(answer_key["answer_key"], dict):
-        answer_key = answer_key["answer_key"]
-    result = {}
-    for k, v in answer_key.items():
-        # Keep metadata keys that start with "_" untouched
-        if str(k).startswith("_"):
-            result[k] = v
-        else:
-            result[str(k)] = v
-    return result
-
-
-def build_session_payload(session, input_file: str) -> dict:
-    """Standardize the payload consumed by the web UI."""
-    question_clean = strip_code_block(session.question_text)
-    answer_clean = strip_code_block(session.answer_text)
-    answer_key = normalize_answer_key(session.answer_key)
-    return {
-        "title": os.path.basename(input_file),
-        "mode": session.mode,
-        "language": detect_language_from_path(input_file),
-        "question": question_clean,
-        "question_text": session.question_text,
-        "answer": answer_clean,
-        "answer_text": session.answer_text,
-        "answer_key": answer_key,
-        "answer_count": len(answer_key),
-        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-    }
-
-
 def start_server():
     """Starts a simple HTTP server serving the web_app directory with NO CACHE."""
 
@@ -352,8 +288,7 @@ def run_generation_and_launch(input_file, mode, offline: bool = False):
         session_data["llm_error"] = str(llm_error)
 
     WEB_APP_DIR.mkdir(parents=True, exist_ok=True)
-    with SESSION_FILE.open("w", encoding="utf-8") as f:
-        json.dump(session_data, f, ensure_ascii=False, indent=2)
+    atomic_write(SESSION_FILE, dumps(session_data))
 
     splash.destroy()
 
@@ -0,0 +1,138 @@
+"""
+Per-phase generation timings exposed in Prometheus text format.
+
+generate_session opens a PhaseTimer for the calling thread (track()); code
+anywhere below it, including local_generator, wraps work in phase("name").
+When no timer is active on the thread (prewarm, CLI, benchmarks) phase() is a
+no-op apart from one thread-local lookup. Phases may nest: web_server's
+local_build contains local_generator's ast_parse/extract_candidates/select/
+render, and "total" covers the whole request.
+
+Each (phase, mode, method) series keeps a lifetime count/sum and a sliding
+window of recent samples for p50/p95/p99, rendered as a Prometheus summary.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_active = threading.local()
+
+
+class PhaseTimer:
+    """Phase durations (seconds) collected for one generation request."""
+
+    def __init__(self, **labels):
+        self.labels = {key: str(value) for key, value in labels.items()}
+        self.phases: dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    def add(self, name: str, seconds: float):
+        # Phases that run more than once (e.g. render per variant) accumulate
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+@contextmanager
+def phase(name: str):
+    """Time the enclosed block into the thread's active PhaseTimer, if any."""
+    timer = getattr(_active, "timer", None)
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - start)
+
+
+def _quantile(ordered: list, q: float) -> float:
+    """Nearest-rank quantile of an already sorted list."""
+    index = max(0, min(len(ordered) - 1, int(q * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class PhaseMetrics:
+    """
+    Thread-safe aggregation of PhaseTimer results.
+
+    - window: recent samples kept per series for quantiles
+    - label_names: labels every series carries besides "phase"
+    """
+
+    def __init__(self, name: str = "studyhelper_generate_phase_seconds", window: int = 1024,
+                 label_names: tuple = ("mode", "method")):
+        self.name = name
+        self.window = max(1, window)
+        self.label_names = tuple(label_names)
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, **labels):
+        """
+        Activate a PhaseTimer on this thread; on exit its phases plus "total" are
+        recorded. Labels may be filled in later through timer.labels.
+        """
+        timer = PhaseTimer(**labels)
+        previous = getattr(_active, "timer", None)
+        _active.timer = timer
+        try:
+            yield timer
+        finally:
+            _active.timer = previous
+            timer.add("total", time.perf_counter() - timer.started)
+            self.record(timer)
+
+    def record(self, timer: PhaseTimer):
+        label_values = tuple(timer.labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            for phase_name, seconds in timer.phases.items():
+                key = (phase_name,) + label_values
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = [0, 0.0, deque(maxlen=self.window)]
+                series[0] += 1
+                series[1] += seconds
+                series[2].append(seconds)
+
+    def snapshot(self) -> dict:
+        """{(phase, *labels): {"count", "sum", "p50", "p95", "p99"}}"""
+        with self._lock:
+            copied = {key: (count, total, list(samples)) for key, (count, total, samples) in self._series.items()}
+        result = {}
+        for key, (count, total, samples) in copied.items():
+            samples.sort()
+            stats = {"count": count, "sum": total}
+            for q in QUANTILES:
+                stats[f"p{round(q * 100)}"] = _quantile(samples, q)
+            result[key] = stats
+        return result
+
+    def render_prometheus(self) -> str:
+        lines = [
+            f"# HELP {self.name} Session generation time per phase (seconds).",
+            f"# TYPE {self.name} summary",
+        ]
+        for key, stats in sorted(self.snapshot().items()):
+            pairs = zip(("phase",) + self.label_names, key)
+            labels = ",".join(f'{label}="{_escape(value)}"' for label, value in pairs)
+            for q in QUANTILES:
+                value = stats[f"p{round(q * 100)}"]
+                lines.append(f'{self.name}{{{labels},quantile="{q}"}} {value:.6f}')
+            lines.append(f"{self.name}_sum{{{labels}}} {stats['sum']:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {stats['count']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
@@ -0,0 +1,364 @@
+"""
+Local IPv4 discovery without waiting on the network, and a cached server-info document.
+
+list_ipv4_addresses() enumerates interface addresses with their names and
+interface indexes: SIOCGIFADDR per interface on Linux, GetAdaptersAddresses
+on Windows, and the host name's address list as the fallback everywhere
+(including Termux, where interface enumeration is often blocked).
+pick_lan_ip() ranks them, breaking ties by interface index; the old
+UDP-connect probe, which only consults the routing table and sends nothing,
+is used only when no usable address was enumerated.
+
+ServerInfoCache holds the /api/info document as ready-to-send JSON bytes.
+A daemon thread waits for the OS to report an interface or address change
+(rtnetlink on Linux, NotifyAddrChange on Windows) and only then
+re-enumerates; where no notification exists it polls, backing off while
+nothing changes. The document is rebuilt only when the address set changes,
+so requests never stat, open or enumerate anything.
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import json
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+LogFn = Callable[[str], None]
+
+SIOCGIFADDR = 0x8915
+# Bridges, container/VM links and VPN tunnels are rarely what a phone on the same Wi-Fi can reach
+VIRTUAL_PREFIXES = ("lo", "docker", "br-", "veth", "virbr", "vmnet", "vboxnet", "tun", "tap", "ifb")
+# Windows adapter names/descriptions (matched case-insensitively anywhere in the name)
+VIRTUAL_KEYWORDS = (
+    "vethernet", "hyper-v", "virtualbox", "vmware", "vpn", "tap-", "wireguard",
+    "tailscale", "zerotier", "loopback", "bluetooth",
+)
+# Windows IfType values for loopback, proprietary virtual and tunnel adapters
+_WINDOWS_VIRTUAL_IFTYPES = (24, 53, 131)
+# Any routable address works: connect() on a UDP socket picks a route and sends nothing
+PROBE_TARGET = ("8.8.8.8", 80)
+# rtnetlink multicast groups: link up/down and IPv4 address add/remove
+_RTMGRP_LINK = 0x1
+_RTMGRP_IPV4_IFADDR = 0x10
+# A Wi-Fi switch arrives as a burst of notifications; re-enumerate once it settles
+CHANGE_SETTLE = 0.5
+# Polling fallback backs off up to this many intervals while nothing changes
+POLL_BACKOFF_MAX = 12
+
+
+def _linux_addresses() -> list[tuple[str, str, int]]:
+    import fcntl
+
+    try:
+        interfaces = socket.if_nameindex()
+    except OSError:
+        return []  # e.g. blocked by SELinux on Android/Termux
+    found = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        for index, name in interfaces:
+            request = struct.pack("256s", name.encode("utf-8")[:15])
+            try:
+                reply = fcntl.ioctl(s.fileno(), SIOCGIFADDR, request)
+            except OSError:
+                continue  # interface down, without IPv4, or not permitted
+            found.append((name, socket.inet_ntoa(reply[20:24]), index))
+    return found
+
+
+def _windows_addresses() -> list[tuple[str, str, int]]:
+    """[("FriendlyName (Description)", address, IfIndex)] for every adapter that is up."""
+    import ctypes
+    from ctypes import wintypes
+
+    class SOCKET_ADDRESS(ctypes.Structure):
+        _fields_ = [("lpSockaddr", ctypes.c_void_p), ("iSockaddrLength", ctypes.c_int)]
+
+    class IP_ADAPTER_UNICAST_ADDRESS(ctypes.Structure):
+        pass
+
+    IP_ADAPTER_UNICAST_ADDRESS._fields_ = [
+        ("Length", wintypes.ULONG),
+        ("Flags", wintypes.DWORD),
+        ("Next", ctypes.POINTER(IP_ADAPTER_UNICAST_ADDRESS)),
+        ("Address", SOCKET_ADDRESS),
+    ]
+
+    class IP_ADAPTER_ADDRESSES(ctypes.Structure):
+        pass
+
+    # Leading fields of IP_ADAPTER_ADDRESSES_LH, up to OperStatus
+    IP_ADAPTER_ADDRESSES._fields_ = [
+        ("Length", wintypes.ULONG),
+        ("IfIndex", wintypes.DWORD),
+        ("Next", ctypes.POINTER(IP_ADAPTER_ADDRESSES)),
+        ("AdapterName", ctypes.c_char_p),
+        ("FirstUnicastAddress", ctypes.POINTER(IP_ADAPTER_UNICAST_ADDRESS)),
+        ("FirstAnycastAddress", ctypes.c_void_p),
+        ("FirstMulticastAddress", ctypes.c_void_p),
+        ("FirstDnsServerAddress", ctypes.c_void_p),
+        ("DnsSuffix", ctypes.c_wchar_p),
+        ("Description", ctypes.c_wchar_p),
+        ("FriendlyName", ctypes.c_wchar_p),
+        ("PhysicalAddress", ctypes.c_ubyte * 8),
+        ("PhysicalAddressLength", wintypes.ULONG),
+        ("Flags", wintypes.ULONG),
+        ("Mtu", wintypes.ULONG),
+        ("IfType", wintypes.DWORD),
+        ("OperStatus", ctypes.c_int),
+    ]
+
+    get_adapters = ctypes.windll.iphlpapi.GetAdaptersAddresses
+    flags = 0x2 | 0x4 | 0x8  # GAA_FLAG_SKIP_ANYCAST | SKIP_MULTICAST | SKIP_DNS_SERVER
+    size = wintypes.ULONG(16 * 1024)
+    for _ in range(3):
+        buffer = ctypes.create_string_buffer(size.value)
+        result = get_adapters(socket.AF_INET, flags, None, buffer, ctypes.byref(size))
+        if result != 111:  # ERROR_BUFFER_OVERFLOW: size now holds what is needed
+            break
+    if result != 0:
+        raise OSError(f"GetAdaptersAddresses failed: {result}")
+
+    found = []
+    adapter = ctypes.cast(buffer, ctypes.POINTER(IP_ADAPTER_ADDRESSES))
+    while adapter:
+        entry = adapter.contents
+        if entry.OperStatus == 1:  # IfOperStatusUp
+            name = f"{entry.FriendlyName or ''} ({entry.Description or ''})"
+            if entry.IfType in _WINDOWS_VIRTUAL_IFTYPES:
+                name = f"loopback/virtual {name}"
+            unicast = entry.FirstUnicastAddress
+            while unicast:
+                address = unicast.contents.Address
+                if address.lpSockaddr and address.iSockaddrLength >= 8:
+                    # sockaddr_in: family (2), port (2), in_addr (4)
+                    raw = ctypes.string_at(address.lpSockaddr + 4, 4)
+                    found.append((name, socket.inet_ntoa(raw), entry.IfIndex))
+                unicast = unicast.contents.Next
+        adapter = entry.Next
+    return found
+
+
+def _hostname_addresses() -> list[tuple[str, str, int]]:
+    """Resolver addresses of this host; no interface name, index 0 (unknown)."""
+    try:
+        infos = socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET)
+    except OSError:
+        return []
+    return [("", info[4][0], 0) for info in infos]
+
+
+def route_address() -> str | None:
+    """Source address of the default route (UDP connect, no packet is sent); None when offline."""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.settimeout(0.5)
+            s.connect(PROBE_TARGET)
+            return s.getsockname()[0]
+    except OSError:
+        return None
+
+
+def list_ipv4_addresses() -> list[tuple[str, str, int]]:
+    """[(interface name or "", address, interface index)] for every IPv4 address, deduplicated and sorted."""
+    found: list[tuple[str, str, int]] = []
+    try:
+        if sys.platform.startswith("linux"):
+            found = _linux_addresses()
+        elif sys.platform == "win32":
+            found = _windows_addresses()
+    except (OSError, ImportError, AttributeError, ValueError):
+        found = []
+    if not any(not ipaddress.ip_address(address).is_loopback for _, address, _ in found):
+        # Enumeration blocked or only loopback visible: add what the resolver knows
+        found += _hostname_addresses()
+    return sorted(set(found))
+
+
+def _is_virtual(name: str) -> bool:
+    lowered = name.lower()
+    if any(word in lowered for word in VIRTUAL_KEYWORDS):
+        return True
+    # Linux interface names never contain spaces; Windows names do ("Local Area Connection")
+    return " " not in name and lowered.startswith(VIRTUAL_PREFIXES)
+
+
+def _rank(name: str, address: str, index: int) -> tuple:
+    ip = ipaddress.ip_address(address)
+    if address.startswith("192.168."):
+        network = 0
+    elif address.startswith("10."):
+        network = 1
+    elif ip.is_private:
+        network = 2
+    else:
+        network = 3
+    # Equal ranks: the lower interface index (usually the physical adapter
+    # brought up first), then the address, so the pick never flips between runs
+    return (ip.is_loopback, ip.is_link_local, _is_virtual(name), network, index, address)
+
+
+def pick_lan_ip(
+    addresses: list[tuple[str, str, int]],
+    probe: Callable[[], str | None] = route_address,
+) -> str:
+    """
+    Most likely LAN address (home/classroom Wi-Fi ranges first, virtual
+    adapters last, ties by interface index). Only when no usable address was
+    enumerated does the default route's address (probe) get asked, as the
+    last resort before 127.0.0.1.
+    """
+    usable = [item for item in addresses if not ipaddress.ip_address(item[1]).is_loopback]
+    if not usable:
+        fallback = probe()
+        if fallback and not ipaddress.ip_address(fallback).is_loopback:
+            return fallback
+        return "127.0.0.1"
+    return min(usable, key=lambda item: _rank(*item))[1]
+
+
+def _linux_change_waiter() -> Callable[[], None]:
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    sock.bind((0, _RTMGRP_LINK | _RTMGRP_IPV4_IFADDR))
+
+    def wait():
+        sock.recv(65536)
+        time.sleep(CHANGE_SETTLE)
+        sock.setblocking(False)
+        try:
+            while True:
+                sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            pass
+        finally:
+            sock.setblocking(True)
+
+    return wait
+
+
+def _windows_change_waiter() -> Callable[[], None]:
+    import ctypes
+
+    notify_addr_change = ctypes.windll.iphlpapi.NotifyAddrChange
+
+    def wait():
+        # NULL handle/overlapped: blocks (GIL released) until an IPv4 address changes
+        result = notify_addr_change(None, None)
+        if result != 0:
+            raise OSError(f"NotifyAddrChange failed: {result}")
+        time.sleep(CHANGE_SETTLE)
+
+    return wait
+
+
+def change_waiter() -> Callable[[], None] | None:
+    """Blocking wait for the next interface/address change, or None where the OS offers none."""
+    try:
+        if sys.platform.startswith("linux"):
+            return _linux_change_waiter()
+        if sys.platform == "win32":
+            return _windows_change_waiter()
+    except (OSError, ImportError, AttributeError):
+        pass  # e.g. netlink blocked on Android/Termux
+    return None
+
+
+class ServerInfoCache:
+    """
+    /api/info document computed once and refreshed on interface changes.
+
+    - build_fn(local_ip) -> dict: the document for an address
+    - on_change(info): called after every rebuild (e.g. rewrite server_info.json)
+    - interval: polling period where the OS gives no change notifications
+    """
+
+    def __init__(
+        self,
+        build_fn: Callable[[str], dict],
+        on_change: Optional[Callable[[dict], None]] = None,
+        interval: float = 5.0,
+        log_fn: Optional[LogFn] = None,
+    ):
+        self.build_fn = build_fn
+        self.on_change = on_change
+        self.interval = max(0.5, interval)
+        self.log_fn = log_fn
+        self._lock = threading.Lock()
+        self._addresses: list | None = None
+        self._info: dict | None = None
+        self._body: bytes = b""
+        self._watcher: threading.Thread | None = None
+        self.rebuilds = 0
+
+    def _log(self, message: str):
+        if self.log_fn:
+            try:
+                self.log_fn(message)
+            except Exception:
+                pass
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-enumerate interfaces; rebuild if they changed (or force). Returns True on rebuild."""
+        addresses = list_ipv4_addresses()
+        with self._lock:
+            if not force and self._info is not None and addresses == self._addresses:
+                return False
+        local_ip = pick_lan_ip(addresses)
+        info = self.build_fn(local_ip)
+        body = json.dumps(info, ensure_ascii=True).encode("utf-8")
+        with self._lock:
+            changed = self._addresses is not None and addresses != self._addresses
+            self._addresses = addresses
+            self._info = info
+            self._body = body
+            self.rebuilds += 1
+        if changed:
+            self._log(f"network interfaces changed; local_ip={local_ip}")
+        if self.on_change:
+            try:
+                self.on_change(info)
+            except Exception as exc:
+                self._log(f"server info callback failed: {exc}")
+        return True
+
+    def _ensure(self):
+        if self._info is None:
+            self.refresh()
+        if self._watcher is None:
+            with self._lock:
+                if self._watcher is None:
+                    self._watcher = threading.Thread(target=self._watch, name="netinfo-watch", daemon=True)
+                    self._watcher.start()
+
+    def _watch(self):
+        wait = change_waiter()
+        delay = self.interval
+        while True:
+            if wait is not None:
+                try:
+                    wait()
+                except Exception as exc:
+                    self._log(f"interface notifications failed, polling instead: {exc}")
+                    wait = None
+                    continue
+            else:
+                time.sleep(delay)
+            try:
+                changed = self.refresh()
+            except Exception as exc:
+                self._log(f"interface refresh failed: {exc}")
+                changed = False
+            delay = self.interval if changed else min(delay * 2, self.interval * POLL_BACKOFF_MAX)
+
+    def info(self) -> dict:
+        self._ensure()
+        return self._info
+
+    def body(self) -> bytes:
+        """Current document as compact JSON bytes."""
+        self._ensure()
+        return self._body
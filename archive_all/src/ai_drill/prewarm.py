@@ -0,0 +1,231 @@
+"""
+Background warm-up of the session cache.
+
+Fans (preset, mode) tasks out over a ProcessPoolExecutor; each task builds
+every difficulty of one preset/mode with the local generator and returns the
+payloads, which the collector thread stores in the SessionCache. The server
+keeps serving requests while this runs. Platforms without working process
+pools (Termux/Android) fall back to building tasks one by one in the thread.
+
+Workers are spawned, never forked: the server already runs threads (log
+writer, job workers, interface watcher) and a fork taken while one of them
+holds a lock leaves that lock held forever in the child. Spawned workers
+start from a clean interpreter, so init_worker points them at the server's
+runtime dir and log file.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from .local_generator import build_local_session_variants
+from .log_writer import configure_logging
+from .session_payload import build_session_payload
+from .session_cache import SessionCache
+
+LogFn = Callable[[str], None]
+KeyFn = Callable[[str, int, int, str], str]
+
+
+def init_worker(runtime_dir: str | None, log_path: str | None):
+    """
+    Pool initializer: use the parent's runtime dir (cache/candidates) and log file.
+
+    Workers append to the same file but never rotate it (max_bytes=0): only
+    the parent's writer renames server_error.log, so two processes never race
+    on the .1 ... .N shuffle.
+    """
+    if runtime_dir:
+        os.environ["STUDYHELPER_RUNTIME_DIR"] = runtime_dir
+    if log_path:
+        configure_logging(log_path, max_bytes=0)
+
+
+def build_preset_payloads(content: str, mode: int, difficulties: tuple, file_path: str) -> dict:
+    """Worker entry point: {difficulty: payload} for one preset/mode (local generator)."""
+    payloads = {}
+    for difficulty, session in build_local_session_variants(content, mode, difficulties).items():
+        if session.answer_key.get("_error"):
+            continue
+        payload = build_session_payload(session, file_path)
+        payload["generation_method"] = "local"
+        payloads[difficulty] = payload
+    return payloads
+
+
+class SessionPrewarmer:
+    """
+    One-shot warm-up job with thread-safe progress for /api/prewarm.
+
+    tasks: [(label, content, mode, file_path)]; key_fn(content, mode,
+    difficulty, file_path) must match the key generate_session looks up.
+    runtime_dir/log_path are handed to the pool workers (see init_worker).
+    """
+
+    def __init__(
+        self,
+        cache: SessionCache,
+        key_fn: KeyFn,
+        difficulties: tuple = (1, 2, 3, 4),
+        max_workers: int = 2,
+        runtime_dir: str | None = None,
+        log_path: str | None = None,
+        log_fn: Optional[LogFn] = None,
+    ):
+        self.cache = cache
+        self.key_fn = key_fn
+        self.difficulties = tuple(difficulties)
+        self.max_workers = max(1, max_workers)
+        self.runtime_dir = runtime_dir
+        self.log_path = log_path
+        self.log_fn = log_fn
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._status = {
+            "state": "idle",
+            "total": 0,
+            "completed": 0,
+            "already_cached": 0,
+            "failed": 0,
+            "workers": self.max_workers,
+            "executor": None,
+            "pending": [],
+            "errors": [],
+            "elapsed_sec": 0.0,
+        }
+        self._started = 0.0
+
+    def _log(self, message: str):
+        if self.log_fn:
+            try:
+                self.log_fn(message)
+            except Exception:
+                pass
+
+    def _update(self, **changes):
+        with self._lock:
+            self._status.update(changes)
+
+    def _bump(self, field: str, amount: int = 1):
+        with self._lock:
+            self._status[field] += amount
+
+    def status(self) -> dict:
+        with self._lock:
+            status = dict(self._status)
+            status["pending"] = list(status["pending"])
+            status["errors"] = list(status["errors"])
+        if status["state"] == "running":
+            status["elapsed_sec"] = round(time.perf_counter() - self._started, 3)
+        return status
+
+    def disable(self, reason: str):
+        self._update(state="disabled", errors=[reason])
+
+    def start(self, tasks: list) -> bool:
+        """Start the warm-up thread; returns False if it already ran."""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._thread = threading.Thread(target=self._run, args=(list(tasks),), name="session-prewarm", daemon=True)
+        self._thread.start()
+        return True
+
+    def _pending(self, tasks: list) -> list:
+        """Drop combinations that are already cached (e.g. on disk from a previous run)."""
+        pending = []
+        for label, content, mode, file_path in tasks:
+            missing = tuple(
+                d for d in self.difficulties
+                if not self.cache.contains(self.key_fn(content, mode, d, file_path))
+            )
+            self._bump("already_cached", len(self.difficulties) - len(missing))
+            if missing:
+                pending.append((label, content, mode, file_path, missing))
+        return pending
+
+    def _store(self, content: str, mode: int, file_path: str, payloads: dict, expected: tuple):
+        for difficulty, payload in payloads.items():
+            self.cache.put(self.key_fn(content, mode, difficulty, file_path), payload)
+        self._bump("completed", len(payloads))
+        self._bump("failed", len(expected) - len(payloads))
+
+    def _fail(self, label: str, count: int, exc: Exception):
+        self._bump("failed", count)
+        with self._lock:
+            self._status["errors"].append(f"{label}: {exc}")
+        self._log(f"prewarm failed for {label}: {exc}")
+
+    def _run(self, tasks: list):
+        self._started = time.perf_counter()
+        self._update(state="running", total=len(tasks) * len(self.difficulties))
+        pending = self._pending(tasks)
+        try:
+            # Imported here: concurrent.futures/multiprocessing add noticeably to server import time
+            from concurrent.futures.process import BrokenProcessPool
+        except ImportError:
+            BrokenProcessPool = OSError
+        try:
+            self._run_pool(pending)
+        except (BrokenProcessPool, ImportError, NotImplementedError, OSError) as exc:
+            # No usable process pool here; finish whatever is left in this thread
+            self._log(f"prewarm process pool unavailable ({exc}); building in-thread")
+            self._run_inline([task for task in pending if not self._is_done(task)])
+        elapsed = round(time.perf_counter() - self._started, 3)
+        self._update(state="done", pending=[], elapsed_sec=elapsed)
+        status = self.status()
+        self._log(
+            f"prewarm done in {elapsed}s: completed={status['completed']}, "
+            f"cached={status['already_cached']}, failed={status['failed']}"
+        )
+
+    def _is_done(self, task) -> bool:
+        _, content, mode, file_path, difficulties = task
+        return all(self.cache.contains(self.key_fn(content, mode, d, file_path)) for d in difficulties)
+
+    def _run_pool(self, pending: list):
+        if not pending:
+            return
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        from concurrent.futures.process import BrokenProcessPool
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(self.runtime_dir, self.log_path),
+        ) as pool:
+            self._update(executor="process")
+            futures = {}
+            for task in pending:
+                label, content, mode, file_path, difficulties = task
+                futures[pool.submit(build_preset_payloads, content, mode, difficulties, file_path)] = task
+            self._update(pending=[task[0] for task in pending])
+            for future in as_completed(futures):
+                label, content, mode, file_path, difficulties = futures[future]
+                try:
+                    self._store(content, mode, file_path, future.result(), difficulties)
+                except BrokenProcessPool:
+                    raise  # workers died (e.g. could not start); _run finishes in-thread
+                except Exception as exc:
+                    self._fail(label, len(difficulties), exc)
+                with self._lock:
+                    if label in self._status["pending"]:
+                        self._status["pending"].remove(label)
+
+    def _run_inline(self, pending: list):
+        self._update(executor="thread")
+        labels = [task[0] for task in pending]
+        self._update(pending=list(labels))
+        for label, content, mode, file_path, difficulties in pending:
+            try:
+                payloads = build_preset_payloads(content, mode, difficulties, file_path)
+                self._store(content, mode, file_path, payloads, difficulties)
+            except Exception as exc:
+                self._fail(label, len(difficulties), exc)
+            labels.remove(label)
+            self._update(pending=list(labels))
@@ -0,0 +1,158 @@
+"""
+On-demand profiling of a single call (used by /api/generate "profile").
+
+profile_call() runs a function under cProfile ("cpu"), tracemalloc ("memory")
+or both, writes the raw .pstats and text reports to out_dir and returns a
+JSON-friendly summary of the top functions / allocation sites. Only one
+profiled call runs at a time: tracemalloc is process-wide, so overlapping
+runs would report each other's allocations.
+
+The server only honours the flag when started with STUDYHELPER_PROFILING=1;
+otherwise /api/generate answers a "profile" request with 403.
+"""
+
+from __future__ import annotations
+
+import io
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+PROFILE_KINDS = ("cpu", "memory", "both")
+
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Another profiled call is still running."""
+
+
+def normalize_kind(flag) -> str | None:
+    """Map the request flag (True/"cpu"/"memory"/"both"/falsy) to a kind or None."""
+    if flag is True:
+        return "cpu"
+    if isinstance(flag, str) and flag.lower() in PROFILE_KINDS:
+        return flag.lower()
+    if isinstance(flag, str) and flag.lower() in ("1", "true", "yes"):
+        return "cpu"
+    return None
+
+
+def _safe_label(label: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_")[:60] or "call"
+
+
+def _trim_profiles(out_dir: Path, max_files: int):
+    files = sorted(out_dir.glob("*"), key=lambda p: p.stat().st_mtime)
+    for stale in files[: max(0, len(files) - max_files)]:
+        try:
+            stale.unlink()
+        except OSError:
+            pass
+
+
+def _cpu_summary(profiler, top: int) -> tuple[list, str]:
+    import pstats
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("tottime").print_stats(top * 2)
+    stats.sort_stats("cumulative").print_stats(top * 2)
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{Path(filename).name}:{line}({name})",
+            "calls": calls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        })
+    # Self time points at the hot function; the text report also has cumulative order
+    rows.sort(key=lambda row: row["tottime_ms"], reverse=True)
+    return rows[:top], stream.getvalue()
+
+
+def _memory_summary(snapshot, top: int) -> tuple[list, str]:
+    import tracemalloc
+
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    stats = snapshot.statistics("lineno")
+    rows = []
+    lines = []
+    for stat in stats[: top * 2]:
+        frame = stat.traceback[0]
+        location = f"{Path(frame.filename).name}:{frame.lineno}"
+        lines.append(f"{location:<50} {stat.size / 1024:10.1f} KiB {stat.count:8d} blocks")
+        if len(rows) < top:
+            rows.append({"location": location, "size_kib": round(stat.size / 1024, 1), "blocks": stat.count})
+    return rows, "\n".join(lines) + "\n"
+
+
+def profile_call(
+    fn: Callable[[], object],
+    kind: str,
+    out_dir: Path,
+    label: str = "call",
+    top: int = 15,
+    max_files: int = 60,
+) -> tuple[object, dict]:
+    """
+    Run fn() under the requested profiler(s); returns (fn result, summary).
+    Raises ProfilerBusy if another profiled call is in progress.
+    """
+    if kind not in PROFILE_KINDS:
+        raise ValueError(f"Unknown profile kind: {kind}")
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("another profiled request is running")
+    try:
+        import cProfile
+        import tracemalloc
+
+        profiler = cProfile.Profile() if kind in ("cpu", "both") else None
+        trace_memory = kind in ("memory", "both") and not tracemalloc.is_tracing()
+        if trace_memory:
+            tracemalloc.start(10)
+        start = time.perf_counter()
+        snapshot = None
+        peak = 0
+        try:
+            if profiler:
+                profiler.enable()
+            try:
+                result = fn()
+            finally:
+                if profiler:
+                    profiler.disable()
+            elapsed = time.perf_counter() - start
+            if trace_memory:
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{time.strftime('%Y%m%d_%H%M%S')}_{int(time.time() * 1000) % 1000:03d}_{_safe_label(label)}"
+        summary = {"kind": kind, "elapsed_ms": round(elapsed * 1000, 3), "files": []}
+        if profiler:
+            pstats_path = out_dir / f"{stem}.pstats"
+            profiler.dump_stats(str(pstats_path))
+            summary["top_functions"], report = _cpu_summary(profiler, top)
+            (out_dir / f"{stem}_cpu.txt").write_text(report, encoding="utf-8")
+            summary["files"] += [pstats_path.name, f"{stem}_cpu.txt"]
+        if snapshot is not None:
+            summary["memory_top"], report = _memory_summary(snapshot, top)
+            summary["peak_kib"] = round(peak / 1024, 1)
+            memory_path = out_dir / f"{stem}_memory.txt"
+            memory_path.write_text(f"peak: {peak / 1024:.1f} KiB\n\n{report}", encoding="utf-8")
+            summary["files"].append(memory_path.name)
+        elif kind in ("memory", "both"):
+            summary["memory_error"] = "tracemalloc already active; memory report skipped"
+        _trim_profiles(out_dir, max_files)
+        return result, summary
+    finally:
+        _profile_lock.release()
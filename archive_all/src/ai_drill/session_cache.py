@@ -0,0 +1,187 @@
+"""
+Content-addressed cache for generated session payloads.
+
+Sessions are keyed by a hash of (content, mode, difficulty, method, title,
+generator version). A bounded in-memory LRU sits in front of an on-disk
+store so repeat requests skip generation entirely, even across restarts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+from .json_io import atomic_write, dumps, loads
+from .version import GENERATOR_VERSION
+
+LogFn = Callable[[str], None]
+
+
+def make_session_key(
+    content: str,
+    mode: int,
+    difficulty: int,
+    method: str,
+    source_name: str = "",
+    generator_version: str = GENERATOR_VERSION,
+    source_stamp: str = "",
+) -> str:
+    """
+    Return a stable hex digest identifying one generation request.
+
+    source_stamp identifies input the generator reads besides content
+    (local_generator.fixed_file_stamp for modes 2/4).
+    """
+    digest = hashlib.sha256()
+    header = f"{generator_version}\0{mode}\0{difficulty}\0{method}\0{source_name}\0"
+    if source_stamp:
+        header += f"{source_stamp}\0"
+    digest.update(header.encode("utf-8"))
+    digest.update(content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SessionCache:
+    """
+    Thread-safe two-level session cache.
+
+    - Memory: OrderedDict LRU holding up to max_entries payloads.
+    - Disk: one JSON file per key under cache_dir, trimmed to max_disk_entries
+      (oldest files are removed first). Pass cache_dir=None for memory only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        cache_dir: Path | None = None,
+        max_disk_entries: int = 200,
+        log_fn: Optional[LogFn] = None,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_disk_entries = max(0, max_disk_entries)
+        self.log_fn = log_fn
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _log(self, message: str):
+        if self.log_fn:
+            try:
+                self.log_fn(message)
+            except Exception:
+                pass
+
+    def _disk_path(self, key: str) -> Path | None:
+        if not self.cache_dir or self.max_disk_entries == 0:
+            return None
+        return self.cache_dir / f"{key}.json"
+
+    def _remember(self, key: str, payload: dict):
+        """Insert into the memory LRU; caller holds the lock."""
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def ensure_capacity(self, entries: int):
+        """Raise the memory limit to at least entries (e.g. to hold a prewarmed set)."""
+        with self._lock:
+            self.max_entries = max(self.max_entries, entries)
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return payload
+
+        path = self._disk_path(key)
+        if path and path.exists():
+            try:
+                payload = loads(path.read_bytes())
+            except Exception as exc:
+                self._log(f"session cache read failed ({path.name}): {exc}")
+                payload = None
+            if isinstance(payload, dict):
+                with self._lock:
+                    self._remember(key, payload)
+                    self.disk_hits += 1
+                return payload
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def contains(self, key: str) -> bool:
+        """Membership test that does not touch LRU order or hit/miss counters."""
+        with self._lock:
+            if key in self._entries:
+                return True
+        path = self._disk_path(key)
+        return bool(path and path.exists())
+
+    def put(self, key: str, payload: dict):
+        with self._lock:
+            self._remember(key, payload)
+
+        path = self._disk_path(key)
+        if not path:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Atomic so a concurrent get() never parses a half-written entry
+            atomic_write(path, dumps(payload), fsync=False)
+            self._trim_disk()
+        except Exception as exc:
+            self._log(f"session cache write failed ({path.name}): {exc}")
+
+    def _trim_disk(self):
+        files = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        removed = 0
+        for stale in files[: max(0, len(files) - self.max_disk_entries)]:
+            try:
+                stale.unlink()
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            with self._lock:
+                self.evictions += removed
+
+    def clear(self, disk: bool = True):
+        with self._lock:
+            self._entries.clear()
+        if disk and self.cache_dir and self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            disk_entries = 0
+            if self.cache_dir and self.cache_dir.exists():
+                disk_entries = sum(1 for _ in self.cache_dir.glob("*.json"))
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_entries": disk_entries,
+                "max_disk_entries": self.max_disk_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "generator_version": GENERATOR_VERSION,
+            }
@@ -0,0 +1,79 @@
+"""
+Session payload helpers shared by the web server, the warm-up workers and
+the desktop CLI.
+
+Kept free of GUI/CLI dependencies (tkinter, rich) so that importing it is
+cheap on headless machines and Termux.
+"""
+
+import os
+import re
+import time
+
+
+def detect_language_from_path(path: str) -> str:
+    """Infer language from file extension for UI display."""
+    ext = os.path.splitext(path)[1].lower()
+    mapping = {
+        ".py": "python",
+        ".js": "javascript",
+        ".ts": "typescript",
+        ".java": "java",
+        ".c": "c",
+        ".cpp": "cpp",
+        ".txt": "text",
+        ".md": "markdown",
+    }
+    return mapping.get(ext, "text")
+
+
+def strip_code_block(text: str) -> str:
+    """
+    Remove markdown fences and return the first code block if present.
+    Also trims stray ```json blocks from LLM responses.
+    """
+    if not text:
+        return ""
+    code_match = re.search(r"```(?:\w+)?\s*([\s\S]*?)```", text)
+    if code_match:
+        return code_match.group(1).strip()
+    return text.strip()
+
+
+def normalize_answer_key(answer_key) -> dict:
+    """
+    Flatten various answer_key shapes that the LLM/local generator may emit.
+    Accepts {"answer_key": {...}} or {"1": "..."} etc.
+    Preserves special keys starting with _ (like _type, _questions, _blanks)
+    """
+    if not isinstance(answer_key, dict):
+        return {}
+    if "answer_key" in answer_key and isinstance(answer_key["answer_key"], dict):
+        answer_key = answer_key["answer_key"]
+    result = {}
+    for k, v in answer_key.items():
+        # Keep metadata keys that start with "_" untouched
+        if str(k).startswith("_"):
+            result[k] = v
+        else:
+            result[str(k)] = v
+    return result
+
+
+def build_session_payload(session, input_file: str) -> dict:
+    """Standardize the payload consumed by the web UI."""
+    question_clean = strip_code_block(session.question_text)
+    answer_clean = strip_code_block(session.answer_text)
+    answer_key = normalize_answer_key(session.answer_key)
+    return {
+        "title": os.path.basename(input_file),
+        "mode": session.mode,
+        "language": detect_language_from_path(input_file),
+        "question": question_clean,
+        "question_text": session.question_text,
+        "answer": answer_clean,
+        "answer_text": session.answer_text,
+        "answer_key": answer_key,
+        "answer_count": len(answer_key),
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
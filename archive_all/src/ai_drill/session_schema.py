@@ -0,0 +1,303 @@
+"""
+Compact (v2) session.json schema.
+
+A v1 payload carries the source up to five times (question, question_text,
+answer, answer_text, _original_code), a full_line per blank and every
+implementation challenge body twice. v2 keeps one "source" string and
+describes blanks and challenge bodies as [line, col, length] spans into it
+(1-based line, 0-based column, both in characters). Per-blank generator
+metadata (type, function, score) rides along as optional columns in
+_blank_columns; full_line is stored there only where it differs from the
+span's source line.
+
+compact_session_payload() only drops a field when expand_session_payload()
+rebuilds it exactly, so any payload it cannot describe stays v1 in that part.
+web_app/app.js (expandCompactSession) mirrors expand_session_payload().
+"""
+
+from __future__ import annotations
+
+SESSION_SCHEMA_VERSION = 2
+
+BLANK_TYPES = ("fill_in_blank_inline", "fill_in_blank_cards")
+# Optional per-blank fields kept column-wise (one list per field, in blank order)
+BLANK_COLUMNS = ("type", "function", "score", "full_line")
+# Answer key types whose _original_code is the session source
+SOURCE_TYPES = BLANK_TYPES + ("implementation_challenge",)
+
+
+def _line_starts(source: str) -> list[int]:
+    starts = [0]
+    pos = source.find("\n")
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = source.find("\n", pos + 1)
+    return starts
+
+
+def _span_text(source: str, starts: list[int], span) -> str:
+    line, col, length = span
+    begin = starts[line - 1] + col
+    return source[begin:begin + length]
+
+
+def _offset_span(starts: list[int], offset: int, length: int) -> list[int]:
+    """Absolute offset -> [line, col, length]."""
+    lo, hi = 0, len(starts) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if starts[mid] <= offset:
+            lo = mid
+        else:
+            hi = mid - 1
+    return [lo + 1, offset - starts[lo], length]
+
+
+def render_blank_question(source: str, spans: list) -> str:
+    """Source with each span replaced by __[N]__ (N = 1-based span index)."""
+    lines = source.split("\n")
+    by_line: dict[int, list] = {}
+    for num, (line, col, length) in enumerate(spans, 1):
+        by_line.setdefault(line, []).append((col, length, num))
+    for line, items in by_line.items():
+        text = lines[line - 1]
+        pieces = []
+        cursor = 0
+        for col, length, num in sorted(items):
+            pieces.append(text[cursor:col])
+            pieces.append(f"__[{num}]__")
+            cursor = col + length
+        pieces.append(text[cursor:])
+        lines[line - 1] = "".join(pieces)
+    return "\n".join(lines).strip()
+
+
+def _compact_blanks(source: str, starts: list[int], blanks) -> list | None:
+    lines_total = len(starts)
+    spans = []
+    for num, blank in enumerate(blanks, 1):
+        if not isinstance(blank, dict) or blank.get("blank_num") != num:
+            return None
+        text = blank.get("text", blank.get("answer"))
+        line = blank.get("line_num")
+        col = blank.get("col_offset")
+        if not isinstance(text, str) or not isinstance(line, int) or not isinstance(col, int):
+            return None
+        if not 1 <= line <= lines_total or col < 0:
+            return None
+        span = [line, col, len(text)]
+        if _span_text(source, starts, span) != text or blank.get("answer", text) != text:
+            return None
+        spans.append(span)
+    ordered = sorted(spans)
+    for prev, cur in zip(ordered, ordered[1:]):
+        if prev[0] == cur[0] and prev[1] + prev[2] > cur[1]:
+            return None  # overlapping blanks cannot be rendered from spans
+    return spans
+
+
+def _compact_blank_columns(source: str, blanks: list, spans: list) -> dict | None:
+    """{field: [value per blank]} for BLANK_COLUMNS; full_line is None where it is the source line."""
+    lines = source.split("\n")
+    columns = {}
+    for field in BLANK_COLUMNS:
+        present = [field in blank for blank in blanks]
+        if not any(present):
+            continue
+        if not all(present):
+            return None
+        values = [blank[field] for blank in blanks]
+        if field == "full_line":
+            values = [None if value == lines[span[0] - 1] else value for value, span in zip(values, spans)]
+            if all(value is None for value in values):
+                continue
+        columns[field] = values
+    return columns
+
+
+def _expand_blanks(source: str, starts: list[int], spans: list, columns: dict | None = None) -> list[dict]:
+    lines = source.split("\n")
+    columns = columns or {}
+    blanks = []
+    for index, span in enumerate(spans):
+        text = _span_text(source, starts, span)
+        blank = {
+            "blank_num": index + 1,
+            "line_num": span[0],
+            "col_offset": span[1],
+            "text": text,
+            "answer": text,
+            "full_line": lines[span[0] - 1],
+        }
+        for field, values in columns.items():
+            if values[index] is not None or field != "full_line":
+                blank[field] = values[index]
+        blanks.append(blank)
+    return blanks
+
+
+def _compact_challenges(source: str, starts: list[int], challenges) -> list | None:
+    entries = []
+    for challenge in challenges:
+        if not isinstance(challenge, dict):
+            return None
+        signature = challenge.get("signature", "")
+        body = challenge.get("body", "")
+        line = challenge.get("line_num", 1)
+        if not isinstance(line, int) or not 1 <= line <= len(starts):
+            return None
+        if set(challenge) - {"signature", "body", "line_num", "type", "owner"}:
+            return None
+
+        line_start = starts[line - 1]
+        sig_offset = source.find(signature, line_start) if signature else -1
+        sig = _offset_span(starts, sig_offset, len(signature)) if sig_offset == line_start else signature
+        body_offset = source.find(body, line_start)
+        if body_offset == -1 or not body:
+            return None
+        entry = [challenge.get("type", "code"), line, sig, _offset_span(starts, body_offset, len(body))]
+        if "owner" in challenge:
+            entry.append(challenge["owner"])
+        entries.append(entry)
+    return entries
+
+
+def _expand_challenges(source: str, starts: list[int], entries: list) -> list[dict]:
+    challenges = []
+    for entry in entries:
+        section_type, line, sig, body_span = entry[:4]
+        challenge = {
+            "signature": sig if isinstance(sig, str) else _span_text(source, starts, sig),
+            "body": _span_text(source, starts, body_span),
+            "line_num": line,
+            "type": section_type,
+        }
+        if len(entry) > 4:
+            challenge["owner"] = entry[4]
+        challenges.append(challenge)
+    return challenges
+
+
+def compact_session_payload(payload: dict) -> dict:
+    """Return the v2 form of a v1 payload (the input is not modified)."""
+    if payload.get("schema") == SESSION_SCHEMA_VERSION:
+        return payload
+    answer_key = payload.get("answer_key")
+    if not isinstance(answer_key, dict):
+        return payload
+    key_type = answer_key.get("_type")
+    source = answer_key.get("_original_code") if key_type in SOURCE_TYPES else None
+    if not isinstance(source, str):
+        source = payload.get("answer_text")
+    if not isinstance(source, str) or not source:
+        return payload
+    # Columns are Python str indexes; JS strings index astral characters as two units
+    if any(ord(ch) > 0xFFFF for ch in source):
+        return payload
+
+    starts = _line_starts(source)
+    compact_key = dict(answer_key)
+    if compact_key.get("_original_code") == source and key_type in SOURCE_TYPES:
+        del compact_key["_original_code"]
+
+    blanks = answer_key.get("_blanks")
+    if key_type in BLANK_TYPES and isinstance(blanks, list):
+        spans = _compact_blanks(source, starts, blanks)
+        columns = _compact_blank_columns(source, blanks, spans) if spans is not None else None
+        if columns is not None:
+            del compact_key["_blanks"]
+            compact_key["_blank_spans"] = spans
+            if columns:
+                compact_key["_blank_columns"] = columns
+            for num, span in enumerate(spans, 1):
+                if compact_key.get(str(num)) == _span_text(source, starts, span):
+                    del compact_key[str(num)]
+
+    challenges = answer_key.get("_challenges")
+    if key_type == "implementation_challenge" and isinstance(challenges, list):
+        entries = _compact_challenges(source, starts, challenges)
+        if entries is not None and _expand_challenges(source, starts, entries) == challenges:
+            del compact_key["_challenges"]
+            compact_key["_challenge_spans"] = entries
+            for num, challenge in enumerate(challenges, 1):
+                if compact_key.get(str(num)) == challenge["body"]:
+                    del compact_key[str(num)]
+
+    compact = {key: value for key, value in payload.items() if key not in ("question_text", "answer_text")}
+    compact["schema"] = SESSION_SCHEMA_VERSION
+    compact["source"] = source
+    compact["answer_key"] = compact_key
+    if payload.get("answer_text", source) != source:
+        compact["answer_text"] = payload["answer_text"]
+    if compact.get("answer") == source.strip():
+        del compact["answer"]
+    if "_blank_spans" in compact_key and compact.get("question") == render_blank_question(
+        source, compact_key["_blank_spans"]
+    ):
+        del compact["question"]
+    question = payload.get("question", "")
+    if "question_text" in payload and payload["question_text"] != question:
+        compact["question_text"] = payload["question_text"]
+
+    if not _same_session(expand_session_payload(compact), payload):
+        return payload
+    return compact
+
+
+_MISSING = object()
+
+
+def _same_session(expanded: dict, payload: dict) -> bool:
+    """True if expanded carries every field of payload with the same value."""
+    for key, value in payload.items():
+        if key == "answer_key":
+            continue
+        if expanded.get(key) != value:
+            return False
+    original = payload["answer_key"]
+    rebuilt = expanded.get("answer_key", {})
+    for key, value in original.items():
+        if key == "_blanks":
+            if len(rebuilt.get(key, [])) != len(value):
+                return False
+            for old, new in zip(value, rebuilt[key]):
+                if any(new.get(field, _MISSING) != old_value for field, old_value in old.items()):
+                    return False
+        elif rebuilt.get(key) != value:
+            return False
+    return True
+
+
+def expand_session_payload(payload: dict) -> dict:
+    """Rebuild the v1 shape from a v2 payload; v1 payloads are returned as-is."""
+    if payload.get("schema") != SESSION_SCHEMA_VERSION:
+        return payload
+    source = payload.get("source", "")
+    starts = _line_starts(source)
+    answer_key = dict(payload.get("answer_key") or {})
+    expanded = {key: value for key, value in payload.items() if key not in ("schema", "source")}
+
+    spans = answer_key.pop("_blank_spans", None)
+    columns = answer_key.pop("_blank_columns", None)
+    if spans is not None:
+        blanks = _expand_blanks(source, starts, spans, columns)
+        answer_key["_blanks"] = blanks
+        for blank in blanks:
+            answer_key.setdefault(str(blank["blank_num"]), blank["text"])
+        expanded.setdefault("question", render_blank_question(source, spans))
+
+    entries = answer_key.pop("_challenge_spans", None)
+    if entries is not None:
+        challenges = _expand_challenges(source, starts, entries)
+        answer_key["_challenges"] = challenges
+        for num, challenge in enumerate(challenges, 1):
+            answer_key.setdefault(str(num), challenge["body"])
+
+    if answer_key.get("_type") in SOURCE_TYPES:
+        answer_key.setdefault("_original_code", source)
+    expanded["answer_key"] = answer_key
+    expanded.setdefault("question", "")
+    expanded.setdefault("question_text", expanded["question"])
+    expanded.setdefault("answer", source.strip())
+    expanded.setdefault("answer_text", source)
+    return expanded
@@ -0,0 +1,156 @@
+"""
+SQLite store of generated sessions, addressed by ID.
+
+Each session is kept as the exact response body the browser receives
+(compact v2 JSON bytes) under an ID derived from those bytes, so a stored
+session never changes and /api/session/<id> can be cached indefinitely.
+Saving the same bytes again only marks that session as the latest one,
+which is what the session.json alias serves.
+
+The database runs in WAL mode with one connection per thread: readers see
+the last committed state without waiting for a writer, and concurrent
+writers queue on SQLite's lock (busy_timeout) instead of failing. Only the
+newest max_sessions rows are kept.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+LogFn = Callable[[str], None]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    mode INTEGER,
+    method TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated ON sessions(updated);
+"""
+
+
+def session_id_for(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+class SessionStore:
+    """
+    Thread-safe session store backed by one SQLite file.
+
+    - path: database file (parent directories are created on first use)
+    - max_sessions: rows kept; older sessions are deleted after each save
+    - busy_timeout: seconds a writer waits for another writer's lock
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_sessions: int = 200,
+        busy_timeout: float = 5.0,
+        log_fn: Optional[LogFn] = None,
+    ):
+        self.path = Path(path)
+        self.max_sessions = max(1, max_sessions)
+        self.busy_timeout = busy_timeout
+        self.log_fn = log_fn
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _log(self, message: str):
+        if self.log_fn:
+            try:
+                self.log_fn(message)
+            except Exception:
+                pass
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        # Imported here: sqlite3 costs ~25 ms of server import time
+        import sqlite3
+
+        with self._init_lock:
+            if not self._initialized:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: a crash can lose the last commits but never corrupts the file
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._init_lock:
+            if not self._initialized:
+                conn.executescript(SCHEMA)
+                self._initialized = True
+                self._log(f"session store ready: {self.path}")
+        self._local.conn = conn
+        return conn
+
+    def put(self, body: bytes, title: str = "", mode: int | None = None, method: str = "") -> str:
+        """Store a session body and make it the latest; returns its ID."""
+        session_id = session_id_for(body)
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO sessions (id, title, mode, method, created, updated, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET updated = excluded.updated",
+                (session_id, title, mode, method, now, now, body),
+            )
+            conn.execute(
+                "DELETE FROM sessions WHERE id NOT IN "
+                "(SELECT id FROM sessions ORDER BY updated DESC LIMIT ?)",
+                (self.max_sessions,),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return session_id
+
+    def touch(self, session_id: str) -> bool:
+        """Make a stored session the latest without resending its body; False if it is gone."""
+        cursor = self._connect().execute(
+            "UPDATE sessions SET updated = ? WHERE id = ?", (time.time(), session_id)
+        )
+        return cursor.rowcount > 0
+
+    def get(self, session_id: str) -> bytes | None:
+        row = self._connect().execute("SELECT body FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return bytes(row[0]) if row else None
+
+    def latest(self) -> tuple[str, bytes] | None:
+        """(id, body) of the most recently saved session."""
+        row = self._connect().execute(
+            "SELECT id, body FROM sessions ORDER BY updated DESC LIMIT 1"
+        ).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def list(self, limit: int = 50) -> list[dict]:
+        rows = self._connect().execute(
+            "SELECT id, title, mode, method, created, updated, length(body) FROM sessions "
+            "ORDER BY updated DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [
+            {
+                "id": row[0],
+                "title": row[1],
+                "mode": row[2],
+                "method": row[3],
+                "created": row[4],
+                "updated": row[5],
+                "bytes": row[6],
+            }
+            for row in rows
+        ]
@@ -5,3 +5,6 @@ Centralized version info for Study Helper builds.
 APP_VERSION = "1.0.2"
 LAUNCHER_VERSION = "1.0.2"
 PATCHER_VERSION = "1.0.2"
+
+# Bump when local generator output changes so cached sessions/indexes are rebuilt.
+GENERATOR_VERSION = "4"
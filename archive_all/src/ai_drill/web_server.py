@@ -7,6 +7,9 @@ English-only strings to avoid encoding issues.
 from __future__ import annotations
 
 import atexit
+import dataclasses
+import hashlib
+import io
 import json
 import os
 import shutil
@@ -18,10 +21,8 @@ import time
 import traceback
 import http.server
 import socketserver
-import webbrowser
 import json as json_lib
 import platform
-from datetime import datetime
 from pathlib import Path
 from urllib.parse import unquote
 
@@ -31,12 +32,28 @@ EXTERNAL_SRC = Path(os.getenv("STUDYHELPER_SRC_DIR", INSTALL_BASE / "src"))
 if EXTERNAL_SRC.exists() and str(EXTERNAL_SRC) not in sys.path:
     sys.path.insert(0, str(EXTERNAL_SRC))
 
-from ai_drill.local_generator import build_local_session
-from ai_drill.main import build_session_payload
-from ai_drill.llm_client import LLMClient
+from ai_drill.local_generator import (
+    build_local_session,
+    build_local_session_variants,
+    clear_candidate_index,
+    fixed_file_stamp,
+    make_marked_blank_question,
+)
+from ai_drill.asset_cache import AssetIndex, accepts_gzip, gzip_bytes, is_compressible, is_not_modified
+from ai_drill.json_io import atomic_write, dumps as json_dumps
+from ai_drill.jobs import JobCancelled, JobManager, JobQueueFull, checkpoint, emit, follow
+from ai_drill.llm_client import LLMClient, fake_llm_enabled, iter_stream_text, load_genai
+from ai_drill.log_writer import configure_logging
+from ai_drill.metrics import PhaseMetrics, phase
+from ai_drill.netinfo import ServerInfoCache, list_ipv4_addresses, pick_lan_ip
+from ai_drill.prewarm import SessionPrewarmer
+from ai_drill.profiling import ProfilerBusy, normalize_kind, profile_call
 from ai_drill.quiz_parser import parse_response
+from ai_drill.session_cache import SessionCache, make_session_key
+from ai_drill.session_payload import build_session_payload
+from ai_drill.session_schema import compact_session_payload
+from ai_drill.session_store import SessionStore
 from ai_drill.version import APP_VERSION
-from ai_drill.tray_icon import TrayController
 
 # Paths & runtime preparation
 RUNTIME_DIR = Path(os.getenv("STUDYHELPER_RUNTIME_DIR", Path(tempfile.gettempdir()) / "studyhelper"))
@@ -107,7 +124,28 @@ def _prepare_runtime_root() -> Path:
     return runtime_root
 
 
-if _is_frozen():
+def _is_pool_worker() -> bool:
+    """
+    Spawned prewarm workers re-run this module: as __mp_main__ when it is the
+    entry script, under its own name when a launcher imported it. Both start
+    with --multiprocessing-fork, which sys.orig_argv keeps after spawn swaps
+    in the parent's sys.argv.
+    """
+    return (
+        __name__ == "__mp_main__"
+        or "--multiprocessing-fork" in sys.argv
+        or "--multiprocessing-fork" in getattr(sys, "orig_argv", ())
+    )
+
+
+# Workers only run prewarm.build_preset_payloads; the server state below
+# (folders, log writer, caches, store, watchers, job pool) is parent-only
+POOL_WORKER = _is_pool_worker()
+
+if _is_frozen() and POOL_WORKER:
+    # The parent already prepared (and may clean up) the runtime dir
+    PROJECT_DIR = RUNTIME_DIR
+elif _is_frozen():
     PROJECT_DIR = _prepare_runtime_root()
 else:
     PROJECT_DIR = Path(__file__).resolve().parents[2]
@@ -136,18 +174,37 @@ WEB_APP_DIR = PROJECT_DIR / "web_app"
 DATA_DIR = PROJECT_DIR / "data"
 CONFIG_DIR = PROJECT_DIR / "config"
 LOG_DIR = PROJECT_DIR / "logs"
+PROFILE_DIR = LOG_DIR / "profiles"
+CACHE_DIR = PROJECT_DIR / "cache"
 SESSION_FILE = WEB_APP_DIR / "session.json"
 LOG_FILE = LOG_DIR / "server_error.log"
 API_KEY_FILE = CONFIG_DIR / "gemini_api_key.txt"
 
 BASE_PORT = 3000
+# /api/generate "profile" runs uncached under cProfile/tracemalloc; any LAN client
+# could trigger it, so it is off unless the server is started with STUDYHELPER_PROFILING=1
+PROFILING_ENABLED = os.getenv("STUDYHELPER_PROFILING", "0") == "1"
+KEEP_ALIVE_TIMEOUT = float(os.getenv("STUDYHELPER_KEEP_ALIVE_TIMEOUT", "30"))
+
+# Static assets revalidate with ETag/Last-Modified; files the server rewrites are never cached.
+# STUDYHELPER_IMMUTABLE_ASSETS=1 serves index.html with "?v=<hash>" asset URLs, cached for a year.
+NO_STORE_FILES = ("session.json", "server_info.json")
+IMMUTABLE_ASSETS = os.getenv("STUDYHELPER_IMMUTABLE_ASSETS", "0") == "1"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ASSET_INDEX = AssetIndex()
+
+# gzip: static files from an in-memory sidecar cache, dynamic bodies on the fly
+GZIP_ENABLED = os.getenv("STUDYHELPER_GZIP", "1") != "0"
+GZIP_MIN_BYTES = int(os.getenv("STUDYHELPER_GZIP_MIN_BYTES", "1024"))
+GZIP_DYNAMIC_LEVEL = 5
 MAX_PORT_RETRIES = 50  # Try ports 3000-3049
 current_port = BASE_PORT
 port_attempts: list[int] = []
 
 # Ensure folders exist
-for folder in (DATA_DIR, CONFIG_DIR, LOG_DIR):
-    folder.mkdir(parents=True, exist_ok=True)
+if not POOL_WORKER:
+    for folder in (DATA_DIR, CONFIG_DIR, LOG_DIR):
+        folder.mkdir(parents=True, exist_ok=True)
 
 # Preset files
 PRESET_FILES = {
@@ -188,31 +245,48 @@ MODE_LABELS = {
 }
 
 
-def log_error(message: str):
-    """Append message to server_error.log with timestamp."""
-    try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] {message}\n")
-            f.flush()
-    except Exception:
-        pass
+# Background writer: request threads only enqueue, one thread appends in batches.
+# Workers get theirs from prewarm.init_worker (same file, no rotation).
+if not POOL_WORKER:
+    LOG_WRITER = configure_logging(
+        LOG_FILE,
+        max_bytes=int(os.getenv("STUDYHELPER_LOG_MAX_BYTES", str(1024 * 1024))),
+        backup_count=int(os.getenv("STUDYHELPER_LOG_BACKUPS", "3")),
+    )
+
+
+def log_error(message: str, level: str = "INFO"):
+    """Queue message for server_error.log (level: DEBUG/INFO/WARNING/ERROR)."""
+    LOG_WRITER.log(message, level, source="server")
+
+
+def _hard_exit(code: int = 0):
+    """os._exit skips atexit, so drain queued log lines first."""
+    LOG_WRITER.close(timeout=1.0)
+    os._exit(code)
+
+
+# Generated sessions keyed by content hash (memory LRU + cache/sessions/*.json)
+SESSION_CACHE_SIZE = int(os.getenv("STUDYHELPER_SESSION_CACHE_SIZE", "32"))
+if not POOL_WORKER:
+    SESSION_CACHE = SessionCache(
+        max_entries=SESSION_CACHE_SIZE,
+        cache_dir=CACHE_DIR / "sessions",
+        max_disk_entries=int(os.getenv("STUDYHELPER_SESSION_CACHE_DISK_SIZE", "200")),
+        log_fn=log_error,
+    )
+    # Every generated session by ID; session.json serves the latest one
+    SESSION_STORE = SessionStore(
+        CACHE_DIR / "sessions.sqlite3",
+        max_sessions=int(os.getenv("STUDYHELPER_SESSION_HISTORY", "200")),
+        log_fn=log_error,
+    )
+SESSION_ID_CACHE_CONTROL = "private, max-age=31536000, immutable"
 
 
 def get_local_ip() -> str:
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.settimeout(0.5)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
-    except Exception:
-        try:
-            hostname = socket.gethostname()
-            return socket.gethostbyname(hostname)
-        except Exception:
-            return "127.0.0.1"
+    """LAN address from interface enumeration (no outbound connect, no timeout)."""
+    return pick_lan_ip(list_ipv4_addresses())
 
 
 def load_api_key_from_file() -> str | None:
@@ -221,19 +295,12 @@ def load_api_key_from_file() -> str | None:
             key = API_KEY_FILE.read_text(encoding="utf-8").strip()
             return key or None
     except Exception as exc:
-        log_error(f"API key read failed: {exc}")
+        log_error(f"API key read failed: {exc}", level="WARNING")
     return None
 
 
-def save_server_info(port: int | None = None, ports_tried: list[int] | None = None):
-    global current_port, port_attempts
-    if port:
-        current_port = port
-    if ports_tried:
-        port_attempts = ports_tried
-
-    local_ip = get_local_ip()
-    info = {
+def build_server_info(local_ip: str) -> dict:
+    return {
         "local_ip": local_ip,
         "port": current_port,
         "mobile_url": f"http://{local_ip}:{current_port}",
@@ -242,14 +309,35 @@ def save_server_info(port: int | None = None, ports_tried: list[int] | None = No
         "version": VERSION_FROM_FILE,
         "app_version": APP_VERSION,
         "runtime_dir": str(PROJECT_DIR),
-        "ports_tried": ports_tried or port_attempts,
+        "ports_tried": port_attempts,
     }
+
+
+def write_server_info_file(info: dict):
+    """server_info.json is read by the launcher and the web UI's connection panel."""
     try:
-        info_path = WEB_APP_DIR / "server_info.json"
-        with open(info_path, "w", encoding="utf-8") as f:
-            json.dump(info, f, ensure_ascii=True, indent=2)
+        atomic_write(WEB_APP_DIR / "server_info.json", json_dumps(info), fsync=False)
     except Exception as e:
-        log_error(f"server_info save failed: {e}")
+        log_error(f"server_info save failed: {e}", level="WARNING")
+
+
+# /api/info answers from memory; the file is rewritten only when port or interfaces change
+if not POOL_WORKER:
+    SERVER_INFO = ServerInfoCache(
+        build_server_info,
+        on_change=write_server_info_file,
+        interval=float(os.getenv("STUDYHELPER_NETINFO_INTERVAL", "5")),
+        log_fn=log_error,
+    )
+
+
+def save_server_info(port: int | None = None, ports_tried: list[int] | None = None):
+    global current_port, port_attempts
+    if port:
+        current_port = port
+    if ports_tried:
+        port_attempts = ports_tried
+    SERVER_INFO.refresh(force=True)
 
 
 def create_fallback_session() -> dict:
@@ -263,14 +351,15 @@ def create_fallback_session() -> dict:
     }
 
 
-def proxy_gemini_text(api_key: str, prompt: str, system_instruction: str, chat_history: list) -> str:
-    """
-    Minimal Gemini proxy to keep API key server-side.
-    chat_history: list of {role, parts:[{text}]} compatible with previous frontend format.
-    """
+def get_api_key() -> str | None:
+    """Gemini key from the environment or config file; a placeholder when the fake model is on."""
+    return os.getenv("GEMINI_API_KEY") or load_api_key_from_file() or ("fake" if fake_llm_enabled() else None)
+
+
+def _proxy_request(api_key: str, prompt: str, system_instruction: str, chat_history: list, stream: bool):
     try:
-        import google.generativeai as genai  # type: ignore
-    except ImportError as exc:
+        genai = load_genai()
+    except RuntimeError as exc:
         raise RuntimeError("google-generativeai not installed on server") from exc
 
     genai.configure(api_key=api_key)
@@ -282,12 +371,34 @@ def proxy_gemini_text(api_key: str, prompt: str, system_instruction: str, chat_h
     contents.append({"role": "user", "parts": [{"text": prompt}]})
 
     try:
-        response = model.generate_content(contents=contents, generation_config=genai.types.GenerationConfig(temperature=0.2))
+        return model.generate_content(
+            contents=contents, generation_config=genai.types.GenerationConfig(temperature=0.2), stream=stream
+        )
+    except Exception as exc:
+        raise RuntimeError(f"Gemini request failed: {exc}") from exc
+
+
+def proxy_gemini_text(api_key: str, prompt: str, system_instruction: str, chat_history: list) -> str:
+    """
+    Minimal Gemini proxy to keep API key server-side.
+    chat_history: list of {role, parts:[{text}]} compatible with previous frontend format.
+    """
+    response = _proxy_request(api_key, prompt, system_instruction, chat_history, stream=False)
+    try:
         return response.text or ""
     except Exception as exc:
         raise RuntimeError(f"Gemini request failed: {exc}") from exc
 
 
+def stream_gemini_text(api_key: str, prompt: str, system_instruction: str, chat_history: list):
+    """proxy_gemini_text in streaming mode: yields text chunks as the model produces them."""
+    response = _proxy_request(api_key, prompt, system_instruction, chat_history, stream=True)
+    try:
+        yield from iter_stream_text(response)
+    except Exception as exc:
+        raise RuntimeError(f"Gemini request failed: {exc}") from exc
+
+
 def read_preset_content(preset_key: str) -> tuple[str, str]:
     if preset_key not in PRESET_FILES:
         raise ValueError(f"Unknown preset: {preset_key}")
@@ -298,6 +409,242 @@ def read_preset_content(preset_key: str) -> tuple[str, str]:
     raise FileNotFoundError(f"Preset file not found: {candidate.name}")
 
 
+def save_session(payload: dict) -> tuple[str | None, str | None]:
+    """
+    Store payload (compact v2 schema) in SESSION_STORE and return
+    (session_id, error). If the store cannot be written, session.json is
+    written instead so the page still has something to load (session_id None).
+    """
+    try:
+        with phase("compact"):
+            compact = compact_session_payload(payload)
+        with phase("json_dump"):
+            body = json_dumps(compact)
+    except Exception as e:
+        log_error(f"session save failed: {e}", level="ERROR")
+        return None, f"Session save failed: {str(e)}"
+    try:
+        with phase("store_write"):
+            session_id = SESSION_STORE.put(
+                body, payload.get("title", ""), payload.get("mode"), payload.get("generation_method", "")
+            )
+        return session_id, None
+    except Exception as e:
+        log_error(f"session store unavailable, writing session.json: {e}", level="WARNING")
+    try:
+        with phase("file_write"):
+            atomic_write(SESSION_FILE, body)
+    except Exception as e:
+        log_error(f"session save failed: {e}", level="ERROR")
+        return None, f"Session save failed: {str(e)}"
+    return None, None
+
+
+# Cache key -> SESSION_STORE id of that payload: a cache hit only marks the
+# stored row as latest instead of compacting and inserting the payload again
+_stored_session_ids: dict[str, str] = {}
+_stored_session_lock = threading.Lock()
+STORED_SESSION_IDS_SIZE = 1024
+
+
+def session_key(content: str, mode: int, difficulty: int, method: str, file_path: str) -> str:
+    """make_session_key plus the fixed file modes 2/4 generate from instead of content."""
+    return make_session_key(content, mode, difficulty, method, file_path, source_stamp=fixed_file_stamp(mode))
+
+
+def remember_session_id(cache_key: str, session_id: str | None):
+    if not session_id:
+        return
+    with _stored_session_lock:
+        if len(_stored_session_ids) >= STORED_SESSION_IDS_SIZE:
+            _stored_session_ids.clear()
+        _stored_session_ids[cache_key] = session_id
+
+
+def save_cached_session(cache_key: str, payload: dict) -> tuple[str | None, str | None]:
+    """save_session for a cache hit: reuse the stored ID while that row still exists."""
+    with _stored_session_lock:
+        session_id = _stored_session_ids.get(cache_key)
+    if session_id:
+        try:
+            with phase("store_write"):
+                if SESSION_STORE.touch(session_id):
+                    return session_id, None
+        except Exception as e:
+            log_error(f"session touch failed: {e}", level="WARNING")
+    session_id, save_error = save_session(payload)
+    remember_session_id(cache_key, session_id)
+    return session_id, save_error
+
+
+def clear_session_cache():
+    SESSION_CACHE.clear()
+    clear_candidate_index()
+    with _stored_session_lock:
+        _stored_session_ids.clear()
+    with _data_path_lock:
+        _data_path_cache.clear()
+
+
+# /data/<name> -> resolved file; a cached entry is dropped when opening it fails
+_data_path_cache: dict[str, Path] = {}
+_data_path_lock = threading.Lock()
+DATA_PATH_CACHE_SIZE = 256
+DATA_CONTENT_TYPE = "text/plain; charset=utf-8"
+# Larger /data/ files are streamed as-is instead of being held gzipped in memory
+DATA_GZIP_MAX_BYTES = 4 * 1024 * 1024
+
+
+def resolve_data_path(file_name: str) -> Path | None:
+    """First existing file for file_name under DATA_DIR, then web_app/data (no escaping either)."""
+    for base in (DATA_DIR, WEB_APP_DIR / "data"):
+        try:
+            root = base.resolve()
+            candidate = (root / file_name).resolve()
+        except (OSError, RuntimeError):
+            continue
+        if candidate != root and root in candidate.parents and candidate.is_file():
+            return candidate
+    return None
+
+
+def open_data_file(file_name: str):
+    """Return (binary file, path) for a /data/ name, or (None, None)."""
+    with _data_path_lock:
+        path = _data_path_cache.get(file_name)
+    if path is not None:
+        try:
+            return open(path, "rb"), path
+        except OSError:
+            with _data_path_lock:
+                _data_path_cache.pop(file_name, None)
+
+    path = resolve_data_path(file_name)
+    if path is None:
+        return None, None
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None, None
+    with _data_path_lock:
+        if len(_data_path_cache) >= DATA_PATH_CACHE_SIZE:
+            _data_path_cache.clear()
+        _data_path_cache[file_name] = path
+    return f, path
+
+
+def parse_byte_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    (start, end) for a single "bytes=a-b" / "bytes=a-" / "bytes=-n" range,
+    (0, size - 1) for forms that are ignored (multi-range, other units),
+    None if the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return 0, size - 1
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return 0, size - 1
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0 or size == 0:
+                return None
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return 0, size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def summarize_session(payload: dict, preset_key: str, mode: int, method: str) -> dict:
+    answer_key = payload.get("answer_key", {})
+    return {
+        "success": True,
+        "challenges": len(answer_key.get("_challenges", [])),
+        "blanks": len([k for k in answer_key.keys() if not k.startswith("_")]),
+        "questions": len(answer_key.get("_questions", [])),
+        "mode": mode,
+        "preset": preset_key,
+        "method": method,
+    }
+
+
+AI_PREFERRED_MODES = (1, 6)
+LOCAL_ONLY_MODES = (3,)
+# Modes whose default (local) sessions can be built ahead of time
+PREWARM_MODES = tuple(mode for mode in MODE_LABELS if mode not in AI_PREFERRED_MODES)
+
+# Blank modes render every difficulty from one candidate extraction
+LOCAL_VARIANT_MODES = (1, 2)
+LOCAL_DIFFICULTIES = (1, 2, 3, 4)
+
+
+def build_local_variants(content: str, mode: int, difficulty: int, file_path: str):
+    """
+    Build all difficulties of a local blank session at once and cache the ones
+    that were not requested. Returns the requested session, or None on failure.
+    """
+    try:
+        sessions = build_local_session_variants(content, mode, LOCAL_DIFFICULTIES)
+    except Exception as e:
+        log_error(f"variant build failed, building single session: {e}", level="WARNING")
+        return None
+
+    for other, session in sessions.items():
+        if other == difficulty or session.answer_key.get("_error"):
+            continue
+        payload = build_session_payload(session, file_path)
+        payload["generation_method"] = "local"
+        SESSION_CACHE.put(session_key(content, mode, other, "local", file_path), payload)
+    log_error(f"local variants cached: mode={mode}, difficulties={list(sessions)}")
+    return sessions.get(difficulty)
+
+
+if not POOL_WORKER:
+    PREWARMER = SessionPrewarmer(
+        SESSION_CACHE,
+        key_fn=lambda content, mode, difficulty, file_path: session_key(
+            content, mode, difficulty, "local", file_path
+        ),
+        difficulties=LOCAL_DIFFICULTIES,
+        max_workers=int(os.getenv("STUDYHELPER_PREWARM_WORKERS", str(min(4, os.cpu_count() or 1)))),
+        runtime_dir=str(PROJECT_DIR),
+        log_path=str(LOG_FILE),
+        log_fn=log_error,
+    )
+
+
+def start_prewarm():
+    """Warm the session cache for every preset x local mode x difficulty in the background."""
+    if os.getenv("STUDYHELPER_PREWARM", "1") == "0":
+        PREWARMER.disable("disabled by STUDYHELPER_PREWARM=0")
+        return
+    tasks = []
+    for preset_key in PRESET_FILES:
+        try:
+            content, file_path = read_preset_content(preset_key)
+        except Exception as e:
+            log_error(f"prewarm skipped {preset_key}: {e}", level="WARNING")
+            continue
+        if not content.strip():
+            continue
+        for mode in PREWARM_MODES:
+            tasks.append((f"{preset_key}/mode{mode}", content, mode, str(file_path)))
+    # Keep the whole prewarmed set in memory on top of the usual working set,
+    # otherwise the LRU evicts most of it to disk before the first request
+    SESSION_CACHE.ensure_capacity(SESSION_CACHE_SIZE + len(tasks) * len(LOCAL_DIFFICULTIES))
+    PREWARMER.start(tasks)
+
+
+# Phase timings of generate_session, served at /api/metrics
+METRICS = PhaseMetrics(window=int(os.getenv("STUDYHELPER_METRICS_WINDOW", "1024")))
+METRIC_METHODS = ("local", "ai")
+
+
 def generate_session(
     preset_key: str,
     mode: int,
@@ -305,14 +652,40 @@ def generate_session(
     custom_content: str | None = None,
     custom_filename: str | None = None,
     difficulty: int = 2,
+    use_cache: bool = True,
+    split_methods: bool = False,
 ) -> dict:
     """
     Build a session using AI or local generator.
     Modes 1 and 6: AI is preferred; if AI fails, fallback to local.
-    Mode 3: always local.
+    Mode 3: always local; split_methods turns each class method into its own challenge.
+    Only local sessions are cached: every AI request asks the model again.
+    use_cache=False skips the cache lookup (the result is still cached).
     """
+    # Labels come from the request; clamp them so clients cannot mint new /api/metrics series
+    with METRICS.track(
+        mode=mode if mode in MODE_LABELS else "unknown",
+        method=method if method in METRIC_METHODS else "unknown",
+    ) as timer:
+        return _generate_session(
+            timer, preset_key, mode, method, custom_content, custom_filename, difficulty, use_cache, split_methods
+        )
+
+
+def _generate_session(
+    timer,
+    preset_key: str,
+    mode: int,
+    method: str,
+    custom_content: str | None,
+    custom_filename: str | None,
+    difficulty: int,
+    use_cache: bool,
+    split_methods: bool = False,
+) -> dict:
     try:
         log_error(f"session build start: preset={preset_key}, mode={mode}, method={method}")
+        checkpoint("content_load")
 
         # Load content
         if preset_key == "custom":
@@ -322,135 +695,565 @@ def generate_session(
             file_path = custom_filename or "custom_input.txt"
         else:
             try:
-                content, file_path = read_preset_content(preset_key)
+                with phase("content_load"):
+                    content, file_path = read_preset_content(preset_key)
             except Exception as e:
-                log_error(str(e))
+                log_error(str(e), level="ERROR")
                 return {"error": str(e)}
 
         if not content.strip():
-            log_error("Empty content")
+            log_error("Empty content", level="WARNING")
             return {"error": "Content is empty."}
 
         # Decide AI or local
-        force_ai = mode in (1, 6)
-        force_local = mode == 3
+        force_ai = mode in AI_PREFERRED_MODES
+        force_local = mode in LOCAL_ONLY_MODES
         requested_ai = method == "ai"
         use_ai = (force_ai or requested_ai) and not force_local
 
+        generation_method = "ai" if use_ai else "local"
+        timer.labels["method"] = generation_method
+        # Only mode 3 splits; other modes share the unsplit cache entries
+        split_methods = split_methods and mode == 3
+        key_method = f"{generation_method}:split" if split_methods else generation_method
+        checkpoint("cache_lookup")
+        with phase("cache_lookup"):
+            cache_key = session_key(content, mode, difficulty, key_method, str(file_path))
+            # "Generate with AI" must give fresh questions, so AI sessions are never served from cache
+            payload = SESSION_CACHE.get(cache_key) if use_cache and not use_ai else None
+        if payload is not None:
+            log_error(f"session cache hit: {cache_key[:12]}", level="DEBUG")
+            session_id, save_error = save_cached_session(cache_key, payload)
+            if save_error:
+                return {"error": save_error}
+            result = summarize_session(payload, preset_key, mode, generation_method)
+            result["session_id"] = session_id
+            result["cached"] = True
+            return result
+
         session = None
         llm_error = None
+        cached = False
 
         if use_ai:
-            api_key = os.getenv("GEMINI_API_KEY") or load_api_key_from_file()
+            api_key = get_api_key()
             if not api_key:
                 llm_error = "API key missing"
             else:
+                checkpoint("llm")
                 try:
                     os.environ["GEMINI_API_KEY"] = api_key
                     client = LLMClient(api_key=api_key)
-                    response_text = client.generate_drill(content, mode, difficulty)
-                    session = parse_response(response_text, mode)
+                    with phase("llm"):
+                        # Streamed so job followers (/api/jobs/<id>/events) see text from the first token
+                        parts = []
+                        started = time.perf_counter()
+                        for text in client.stream_drill(content, mode, difficulty):
+                            if not parts:
+                                timer.add("llm_first_token", time.perf_counter() - started)
+                            parts.append(text)
+                            emit(text)
+                        response_text = "".join(parts)
+                    with phase("llm_parse"):
+                        session = parse_response(response_text, mode)
                     log_error("LLM generation succeeded")
+                except JobCancelled:
+                    raise
                 except Exception as e:
                     llm_error = str(e)
-                    log_error(f"LLM generation failed: {e}")
+                    log_error(f"LLM generation failed: {e}", level="WARNING")
+
+        checkpoint("local_build" if session is None else "build_payload")
+        if session is None and not use_ai and mode in LOCAL_VARIANT_MODES:
+            with phase("local_build"):
+                session = build_local_variants(content, mode, difficulty, str(file_path))
 
         if session is None:
             log_error("Falling back to local generator")
-            session = build_local_session(content, mode, difficulty)
+            with phase("local_build"):
+                session = build_local_session(content, mode, difficulty, split_methods=split_methods)
 
-        payload = build_session_payload(session, str(file_path))
-        payload["generation_method"] = "ai" if use_ai else "local"
+        with phase("build_payload"):
+            payload = build_session_payload(session, str(file_path))
+        payload["generation_method"] = generation_method
         if use_ai:
             payload["title"] = f"[AI] {payload.get('title', 'session')}"
         if llm_error:
             payload["llm_error"] = llm_error
             payload["generator"] = "local_fallback"
-
-        try:
-            with open(SESSION_FILE, "w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=True, indent=2)
-        except Exception as e:
-            log_error(f"session save failed: {e}")
-            return {"error": f"Session save failed: {str(e)}"}
-
-        answer_key = payload.get("answer_key", {})
-        challenges_count = len(answer_key.get("_challenges", []))
-        blanks_count = len([k for k in answer_key.keys() if not k.startswith("_")])
-        questions_count = len(answer_key.get("_questions", []))
-
-        log_error(f"session build ok: challenges={challenges_count}, blanks={blanks_count}, questions={questions_count}")
-        return {
-            "success": True,
-            "challenges": challenges_count,
-            "blanks": blanks_count,
-            "questions": questions_count,
-            "mode": mode,
-            "preset": preset_key,
-            "method": "ai" if use_ai else "local",
-        }
-
+        elif not use_ai and not payload.get("answer_key", {}).get("_error"):
+            SESSION_CACHE.put(cache_key, payload)
+            cached = True
+
+        # A cancelled job keeps its cached payload but must not become the latest session
+        checkpoint("save")
+        session_id, save_error = save_session(payload)
+        if save_error:
+            return {"error": save_error}
+        if cached:
+            remember_session_id(cache_key, session_id)
+
+        result = summarize_session(payload, preset_key, mode, generation_method)
+        result["session_id"] = session_id
+        log_error(
+            f"session build ok: challenges={result['challenges']}, "
+            f"blanks={result['blanks']}, questions={result['questions']}"
+        )
+        return result
+
+    except JobCancelled:
+        raise
     except Exception as e:
         error_msg = f"session build exception: {str(e)}\n{traceback.format_exc()}"
-        log_error(error_msg)
+        log_error(error_msg, level="ERROR")
         return {"error": f"Unexpected error: {str(e)}"}
 
 
+DIFFICULTY_NAMES = {"easy": 1, "normal": 2, "hard": 3, "extreme": 4}
+
+
+class InvalidRequest(ValueError):
+    """A request body field is out of range; answered with 400 and the message."""
+
+
+def _request_int(raw, allowed, field: str) -> int:
+    value = raw
+    if isinstance(raw, str) and raw.strip().lstrip("-").isdigit():
+        value = int(raw)
+    if isinstance(value, bool) or not isinstance(value, int) or value not in allowed:
+        raise InvalidRequest(f"invalid {field}: {raw!r} (expected one of {sorted(allowed)})")
+    return value
+
+
+def parse_generate_request(data: dict) -> dict:
+    """
+    generate_session keyword arguments from an /api/generate or /api/jobs body.
+
+    mode must be a MODE_LABELS key and difficulty a DIFFICULTY_NAMES name or
+    value; anything else raises InvalidRequest.
+    """
+    if not isinstance(data, dict):
+        raise InvalidRequest("request body must be a JSON object")
+    raw_difficulty = data.get("difficulty", 2)
+    if isinstance(raw_difficulty, str) and raw_difficulty.lower() in DIFFICULTY_NAMES:
+        difficulty = DIFFICULTY_NAMES[raw_difficulty.lower()]
+    else:
+        difficulty = _request_int(raw_difficulty, set(DIFFICULTY_NAMES.values()), "difficulty")
+    return {
+        "preset_key": data.get("preset", "oop_vocab"),
+        "mode": _request_int(data.get("mode", 7), set(MODE_LABELS), "mode"),
+        "method": data.get("method", "local"),
+        "custom_content": data.get("content"),
+        "custom_filename": data.get("fileName"),
+        "difficulty": difficulty,
+        "split_methods": bool(data.get("splitMethods", False)),
+    }
+
+
+# Background generation for /api/jobs; Gemini calls mostly wait on the network
+if not POOL_WORKER:
+    JOBS = JobManager(
+        max_workers=int(os.getenv("STUDYHELPER_JOB_WORKERS", "2")),
+        max_pending=int(os.getenv("STUDYHELPER_JOB_QUEUE", "16")),
+        log_fn=log_error,
+    )
+# Upper bound for ?wait= long-polls on /api/jobs/<id>
+JOB_WAIT_MAX = 25.0
+# Idle event streams send a comment line this often so dead clients are noticed
+SSE_HEARTBEAT = 15.0
+
+
+def make_job_key(request: dict) -> str:
+    """Identical generation requests share one job while it is queued or running."""
+    digest = hashlib.sha256()
+    for name in ("preset_key", "mode", "method", "difficulty", "custom_filename", "split_methods"):
+        digest.update(f"{request[name]}\0".encode("utf-8"))
+    digest.update((request["custom_content"] or "").encode("utf-8"))
+    return digest.hexdigest()
+
+
+def submit_generate_job(request: dict) -> tuple[dict, bool]:
+    """Queue generate_session(**request); returns (job status, coalesced)."""
+    label = f"{request['preset_key']}/mode{request['mode']}/d{request['difficulty']}"
+    job, coalesced = JOBS.submit(make_job_key(request), lambda: generate_session(**request), label)
+    return job.to_dict(), coalesced
+
+
 class APIHandler(http.server.SimpleHTTPRequestHandler):
+    # Persistent connections: every response below carries Content-Length
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY the body
+    # waits on the client's delayed ACK once the connection is reused
+    disable_nagle_algorithm = True
+    # Idle keep-alive connections release their thread after this many seconds
+    timeout = KEEP_ALIVE_TIMEOUT
+
+    # Cache-Control for the response being built; None means no-store (API, session.json)
+    _cache_control: str | None = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(WEB_APP_DIR), **kwargs)
 
     def end_headers(self):
-        self.send_header("Cache-Control", "no-cache, no-store, must-revalidate")
-        self.send_header("Pragma", "no-cache")
-        self.send_header("Expires", "0")
+        if self._cache_control:
+            self.send_header("Cache-Control", self._cache_control)
+        else:
+            self.send_header("Cache-Control", "no-cache, no-store, must-revalidate")
+            self.send_header("Pragma", "no-cache")
+            self.send_header("Expires", "0")
+        self._cache_control = None
         super().end_headers()
 
+    def send_head(self):
+        """
+        Files under web_app with validators, gzip negotiation and 304 answers.
+        Static assets carry ETag/Last-Modified; NO_STORE_FILES (session.json)
+        are only compressed. Directory redirects, listings and 404s keep the
+        stock path.
+        """
+        url_path, _, query = self.path.partition("?")
+        path = Path(self.translate_path(url_path))
+        if path.is_dir():
+            if not url_path.endswith("/"):
+                return super().send_head()
+            path = path / "index.html"
+        if not path.is_file():
+            return super().send_head()
+
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return super().send_head()
+        try:
+            stat = os.fstat(f.fileno())
+            info = ASSET_INDEX.lookup(path, stat)
+            content_type = self.guess_type(str(path))
+            body = None
+            if path.name == "index.html" and IMMUTABLE_ASSETS:
+                body = ASSET_INDEX.fingerprint_html(path, Path(self.directory), skip=NO_STORE_FILES)
+                info = dataclasses.replace(info, etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+            compressible = GZIP_ENABLED and is_compressible(content_type)
+            use_gzip = (
+                compressible
+                and (len(body) if body is not None else info.size) >= GZIP_MIN_BYTES
+                and accepts_gzip(self.headers.get("Accept-Encoding"))
+            )
+            etag = info.gzip_etag if use_gzip else info.etag
+            no_store = path.name in NO_STORE_FILES
+            fingerprint = dict(part.partition("=")[::2] for part in query.split("&")).get("v")
+            immutable = IMMUTABLE_ASSETS and fingerprint == info.fingerprint
+            cache_control = None if no_store else IMMUTABLE_CACHE_CONTROL if immutable else "no-cache"
+
+            if not no_store and is_not_modified(
+                etag, info.mtime, self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")
+            ):
+                f.close()
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", info.last_modified)
+                if compressible:
+                    self.send_header("Vary", "Accept-Encoding")
+                self._cache_control = cache_control
+                self.end_headers()
+                return None
+
+            if use_gzip:
+                if body is not None:
+                    raw = body
+                    body = ASSET_INDEX.gzip_cached(f"{path}#html", etag, lambda: raw)
+                else:
+                    body = ASSET_INDEX.gzip_file(path, info, f)
+
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body) if body is not None else info.size))
+            if use_gzip:
+                self.send_header("Content-Encoding", "gzip")
+            if compressible:
+                self.send_header("Vary", "Accept-Encoding")
+            if not no_store:
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", info.last_modified)
+            self._cache_control = cache_control
+            self.end_headers()
+        except Exception:
+            f.close()
+            raise
+        if body is not None:
+            f.close()
+            return io.BytesIO(body)
+        return f
+
     def log_message(self, format, *args):
         # Suppress default console logging
         pass
 
-    def send_json_response(self, data: dict, status: int = 200):
-        try:
+    def send_body(self, body: bytes, content_type: str, status: int = 200):
+        """
+        Send a complete response with Content-Length so the connection can be reused.
+        Compressible bodies of GZIP_MIN_BYTES or more are gzipped when the client accepts it.
+        """
+        compressible = GZIP_ENABLED and is_compressible(content_type)
+        use_gzip = (
+            compressible
+            and len(body) >= GZIP_MIN_BYTES
+            and accepts_gzip(self.headers.get("Accept-Encoding"))
+        )
+        if use_gzip:
+            body = gzip_bytes(body, GZIP_DYNAMIC_LEVEL)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        if compressible:
+            self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def send_data_file(self, file_name: str):
+        """
+        Serve a /data/ file as raw bytes: gzip from the sidecar cache for
+        small text files, otherwise streamed with socket.sendfile (os.sendfile
+        where available). A single "Range: bytes=..." is honoured (206/416).
+        """
+        f, file_path = open_data_file(file_name)
+        if f is None:
+            self.send_error(404, f"File not found: {file_name}")
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            start, end = 0, size - 1
+            status = 200
+            range_header = self.headers.get("Range")
+            if range_header and not self.headers.get("If-Range"):
+                byte_range = parse_byte_range(range_header, size)
+                if byte_range is None:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if byte_range != (0, size - 1):
+                    start, end = byte_range
+                    status = 206
+
+            if status == 200 and GZIP_ENABLED and GZIP_MIN_BYTES <= size <= DATA_GZIP_MAX_BYTES and accepts_gzip(
+                self.headers.get("Accept-Encoding")
+            ):
+                info = ASSET_INDEX.lookup(file_path, os.fstat(f.fileno()))
+                body = ASSET_INDEX.gzip_file(file_path, info, f)
+                self.send_response(200)
+                self.send_header("Content-Type", DATA_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Content-Encoding", "gzip")
+                self.send_header("Vary", "Accept-Encoding")
+                self.send_header("Accept-Ranges", "bytes")
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+                return
+
+            length = end - start + 1 if size else 0
             self.send_response(status)
-            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Type", DATA_CONTENT_TYPE)
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            if status == 206:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
             self.end_headers()
-            body = json.dumps(data, ensure_ascii=True)
-            self.wfile.write(body.encode("utf-8"))
+            if self.command != "HEAD" and length:
+                self.wfile.flush()
+                self.connection.sendfile(f, start, length)
+
+    def send_json_response(self, data: dict, status: int = 200):
+        try:
+            body = json.dumps(data, ensure_ascii=True).encode("utf-8")
+            self.send_body(body, "application/json; charset=utf-8", status)
         except Exception as e:
-            log_error(f"JSON response error: {e}")
+            log_error(f"JSON response error: {e}", level="ERROR")
+
+    def send_job_status(self):
+        """GET /api/jobs/<id>[?wait=seconds]: long-polls until the job finishes or wait runs out."""
+        job_path, _, query = self.path.partition("?")
+        params = dict(part.partition("=")[::2] for part in query.split("&") if part)
+        try:
+            wait = min(max(float(params.get("wait", 0)), 0.0), JOB_WAIT_MAX)
+        except ValueError:
+            wait = 0.0
+        job = JOBS.wait(job_path[len("/api/jobs/"):], wait)
+        if job is None:
+            self.send_json_response({"error": "unknown job"}, 404)
+            return
+        self.send_json_response(job.to_dict())
+
+    def send_job_cancel(self, job_id: str):
+        job = JOBS.cancel(job_id)
+        if job is None:
+            self.send_json_response({"error": "unknown job"}, 404)
+            return
+        self.send_json_response(job.to_dict())
+
+    def send_stored_session(self, session_id: str, body: bytes, cache_control: str):
+        """
+        A SESSION_STORE body with ETag "<id>" (stored sessions never change),
+        gzip from the sidecar cache and 304 on a matching If-None-Match.
+        """
+        use_gzip = GZIP_ENABLED and len(body) >= GZIP_MIN_BYTES and accepts_gzip(self.headers.get("Accept-Encoding"))
+        etag = f'"{session_id}-gz"' if use_gzip else f'"{session_id}"'
+        if is_not_modified(etag, 0, self.headers.get("If-None-Match"), None):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self._cache_control = cache_control
+            self.end_headers()
+            return
+        if use_gzip:
+            body = ASSET_INDEX.gzip_cached(f"session:{session_id}", etag, lambda: body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("ETag", etag)
+        self._cache_control = cache_control
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def start_event_stream(self):
+        """
+        Headers of a text/event-stream response. The body has no length, so the
+        connection closes when the stream ends; events are written unbuffered.
+        """
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Connection", "close")
+        # Reverse proxies (nginx) would otherwise hold events back
+        self.send_header("X-Accel-Buffering", "no")
+        self.end_headers()
+        self.wfile.flush()
+
+    def send_event(self, event: str, data: dict | None = None):
+        if data is None:
+            self.wfile.write(b": ping\n\n")
+        else:
+            payload = json.dumps(data, ensure_ascii=True)
+            self.wfile.write(f"event: {event}\ndata: {payload}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def stream_job_events(self, job_id: str):
+        """
+        GET /api/jobs/<id>/events: the job's stages and LLM text chunks as
+        Server-Sent Events, ending with "done", "failed" or "cancelled"
+        carrying the job status. Disconnecting does not cancel the job.
+        """
+        job = JOBS.get(job_id)
+        if job is None:
+            self.send_json_response({"error": "unknown job"}, 404)
+            return
+        self.start_event_stream()
+        try:
+            for kind, value in follow(job, heartbeat=SSE_HEARTBEAT):
+                if kind == "chunk":
+                    self.send_event("chunk", {"text": value})
+                elif kind == "stage":
+                    self.send_event("stage", {"stage": value})
+                elif kind == "end":
+                    self.send_event(value["state"], value)
+                else:
+                    self.send_event("ping")
+        except (ConnectionResetError, BrokenPipeError):
+            log_error(f"event stream for job {job_id} closed by client", level="DEBUG")
+
+    def stream_gemini_proxy(self, api_key: str, prompt: str, system_instruction: str, chat_history: list):
+        """POST /api/gemini-proxy/stream: "chunk" events as the model writes, then "done" with the full text."""
+        self.start_event_stream()
+        parts = []
+        try:
+            try:
+                for text in stream_gemini_text(api_key, prompt, system_instruction, chat_history):
+                    parts.append(text)
+                    self.send_event("chunk", {"text": text})
+            except (ConnectionResetError, BrokenPipeError):
+                raise
+            except Exception as exc:
+                log_error(f"gemini proxy stream error: {exc}", level="ERROR")
+                self.send_event("error", {"error": str(exc)})
+                return
+            self.send_event("done", {"text": "".join(parts)})
+        except (ConnectionResetError, BrokenPipeError):
+            log_error("gemini proxy stream closed by client", level="DEBUG")
 
     def do_GET(self):
         try:
+            if self.path == "/api/cache":
+                self.send_json_response(SESSION_CACHE.stats())
+                return
+
+            if self.path == "/api/prewarm":
+                self.send_json_response(PREWARMER.status())
+                return
+
+            if self.path == "/api/metrics":
+                body = METRICS.render_prometheus().encode("utf-8")
+                self.send_body(body, "text/plain; version=0.0.4; charset=utf-8")
+                return
+
             if self.path == "/api/info":
-                save_server_info()
-                info_path = WEB_APP_DIR / "server_info.json"
-                with open(info_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                self.send_json_response(data)
+                self.send_body(SERVER_INFO.body(), "application/json; charset=utf-8")
+                return
+
+            if self.path == "/api/jobs":
+                self.send_json_response({"stats": JOBS.stats(), "jobs": JOBS.jobs()})
+                return
+
+            if self.path.startswith("/api/session/"):
+                session_id = self.path.partition("?")[0][len("/api/session/"):]
+                body = SESSION_STORE.get(session_id)
+                if body is None:
+                    self.send_json_response({"error": "unknown session"}, 404)
+                    return
+                self.send_stored_session(session_id, body, SESSION_ID_CACHE_CONTROL)
+                return
+
+            if self.path == "/api/sessions":
+                self.send_json_response({"sessions": SESSION_STORE.list()})
+                return
+
+            if self.path.partition("?")[0] == "/session.json":
+                # Compatibility alias for the latest stored session; the file is the fallback
+                try:
+                    latest = SESSION_STORE.latest()
+                except Exception as e:
+                    log_error(f"session store read failed: {e}", level="WARNING")
+                    latest = None
+                if latest is not None:
+                    self.send_stored_session(*latest, "no-cache")
+                    return
+
+            if self.path.startswith("/api/jobs/") and self.path.partition("?")[0].endswith("/events"):
+                self.stream_job_events(self.path.partition("?")[0][len("/api/jobs/"):-len("/events")])
+                return
+
+            if self.path.startswith("/api/jobs/"):
+                self.send_job_status()
                 return
 
             if self.path.startswith("/data/"):
                 clean_path = self.path.split("?")[0]
-                file_name = unquote(clean_path.replace("/data/", ""))
-                candidate_paths = [
-                    DATA_DIR / file_name,
-                    WEB_APP_DIR / "data" / file_name,
-                ]
-                file_path = next((p for p in candidate_paths if p.exists() and p.is_file()), None)
-                if file_path:
-                    self.send_response(200)
-                    self.send_header("Content-Type", "text/plain; charset=utf-8")
-                    self.end_headers()
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        self.wfile.write(f.read().encode("utf-8"))
-                else:
-                    self.send_error(404, f"File not found: {file_name}")
+                file_name = unquote(clean_path[len("/data/"):])
+                self.send_data_file(file_name)
                 return
 
             super().do_GET()
         except Exception as e:
-            log_error(f"GET error: {self.path} - {e}")
+            log_error(f"GET error: {self.path} - {e}", level="ERROR")
+            self.close_connection = True
             self.send_error(500, str(e))
 
     def do_POST(self):
@@ -462,27 +1265,80 @@ class APIHandler(http.server.SimpleHTTPRequestHandler):
                     return
                 post_data = self.rfile.read(content_length).decode("utf-8")
                 data = json.loads(post_data)
-                preset = data.get("preset", "oop_vocab")
-                mode = int(data.get("mode", 7))
-                method = data.get("method", "local")
-                custom_content = data.get("content")
-                custom_filename = data.get("fileName")
-
-                raw_difficulty = data.get("difficulty", 2)
-                if isinstance(raw_difficulty, str):
-                    difficulty_map = {"easy": 1, "normal": 2, "hard": 3, "extreme": 4}
-                    difficulty = difficulty_map.get(raw_difficulty.lower(), 2)
-                else:
+                try:
+                    request = parse_generate_request(data)
+                except InvalidRequest as e:
+                    self.send_json_response({"error": str(e)}, 400)
+                    return
+                preset, mode, difficulty = request["preset_key"], request["mode"], request["difficulty"]
+
+                profile_kind = normalize_kind(data.get("profile"))
+                if profile_kind and not PROFILING_ENABLED:
+                    self.send_json_response(
+                        {"error": "profiling is disabled; start the server with STUDYHELPER_PROFILING=1"}, 403
+                    )
+                    return
+                if profile_kind:
+                    # Profiled runs skip the cache lookup so the generator itself is measured
                     try:
-                        difficulty = int(raw_difficulty)
-                    except (ValueError, TypeError):
-                        difficulty = 2
+                        result, summary = profile_call(
+                            lambda: generate_session(**request, use_cache=False),
+                            profile_kind,
+                            PROFILE_DIR,
+                            label=f"{preset}_mode{mode}_d{difficulty}",
+                        )
+                    except ProfilerBusy as e:
+                        self.send_json_response({"error": str(e)}, 409)
+                        return
+                    result["profile"] = summary
+                    log_error(f"profiled generation: {summary['files']} ({summary['elapsed_ms']} ms)")
+                    self.send_json_response(result)
+                    return
 
-                result = generate_session(preset, mode, method, custom_content, custom_filename, difficulty)
+                result = generate_session(**request)
                 self.send_json_response(result)
                 return
 
-            if self.path == "/api/gemini-proxy":
+            if self.path == "/api/jobs":
+                content_length = int(self.headers.get("Content-Length", 0))
+                if content_length == 0:
+                    self.send_json_response({"error": "empty request"}, 400)
+                    return
+                data = json.loads(self.rfile.read(content_length).decode("utf-8"))
+                try:
+                    status, coalesced = submit_generate_job(parse_generate_request(data))
+                except InvalidRequest as e:
+                    self.send_json_response({"error": str(e)}, 400)
+                    return
+                except JobQueueFull as e:
+                    self.send_json_response({"error": f"generation queue is full: {e}"}, 503)
+                    return
+                status["coalesced"] = coalesced
+                self.send_json_response(status, 202)
+                return
+
+            if self.path.startswith("/api/jobs/") and self.path.endswith("/cancel"):
+                self.send_job_cancel(self.path[len("/api/jobs/"):-len("/cancel")])
+                return
+
+            if self.path == "/api/blanks":
+                content_length = int(self.headers.get("Content-Length", 0))
+                if content_length == 0:
+                    self.send_json_response({"error": "empty request"}, 400)
+                    return
+                data = json.loads(self.rfile.read(content_length).decode("utf-8"))
+                code = data.get("code") or ""
+                if not code.strip():
+                    self.send_json_response({"error": "code required"}, 400)
+                    return
+                question = make_marked_blank_question(code, data.get("difficulty", "normal"))
+                if question is None:
+                    self.send_json_response({"error": "no structural blanks found"}, 422)
+                    return
+                self.send_json_response(question)
+                return
+
+            if self.path in ("/api/gemini-proxy", "/api/gemini-proxy/stream"):
                 content_length = int(self.headers.get("Content-Length", 0))
                 if content_length == 0:
                     self.send_json_response({"error": "empty request"}, 400)
@@ -498,26 +1354,34 @@ class APIHandler(http.server.SimpleHTTPRequestHandler):
                 chat_history = data.get("chatHistory") or []
 
                 # Load API key
-                api_key = os.getenv("GEMINI_API_KEY") or load_api_key_from_file()
+                api_key = get_api_key()
                 if not api_key:
                     self.send_json_response({"error": "API key not configured on server"}, 400)
                     return
 
+                if self.path.endswith("/stream"):
+                    self.stream_gemini_proxy(api_key, prompt, system_instruction, chat_history)
+                    return
+
                 try:
                     text = proxy_gemini_text(api_key, prompt, system_instruction, chat_history)
                     self.send_json_response({"text": text})
                 except Exception as exc:
-                    log_error(f"gemini proxy error: {exc}")
+                    log_error(f"gemini proxy error: {exc}", level="ERROR")
                     self.send_json_response({"error": str(exc)}, 500)
                 return
 
             if self.path == "/shutdown":
+                self.close_connection = True
                 self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.send_header("Connection", "close")
                 self.end_headers()
-                threading.Thread(target=lambda: os._exit(0), daemon=True).start()
+                threading.Thread(target=_hard_exit, daemon=True).start()
                 return
 
             if self.path == "/api/clear-cache":
+                clear_session_cache()
                 self.send_json_response({"success": True})
                 return
 
@@ -536,7 +1400,21 @@ class APIHandler(http.server.SimpleHTTPRequestHandler):
 
             self.send_error(405)
         except Exception as e:
-            log_error(f"POST error: {e}")
+            log_error(f"POST error: {e}", level="ERROR")
+            # The request body may be partly unread; do not reuse the connection
+            self.close_connection = True
+            self.send_json_response({"error": str(e)}, 500)
+
+
+    def do_DELETE(self):
+        try:
+            if self.path.startswith("/api/jobs/"):
+                self.send_job_cancel(self.path[len("/api/jobs/"):].partition("?")[0])
+                return
+            self.send_error(405)
+        except Exception as e:
+            log_error(f"DELETE error: {e}", level="ERROR")
+            self.close_connection = True
             self.send_json_response({"error": str(e)}, 500)
 
 
@@ -550,36 +1428,49 @@ def find_available_port(start_port, max_retries=10):
                 s.bind(("0.0.0.0", port))
                 return port, attempts
         except OSError:
-            log_error(f"Port {port} unavailable, trying next")
+            log_error(f"Port {port} unavailable, trying next", level="WARNING")
             continue
     raise RuntimeError(f"No available port in range starting at {start_port}")
 
 
+class KeepAliveServer(socketserver.ThreadingTCPServer):
+    # Idle keep-alive threads must not hold up shutdown
+    daemon_threads = True
+    allow_reuse_address = True
+    # listen() backlog; the default of 5 resets connections when a classroom of
+    # phones (or one page load plus its event streams) connects at once
+    request_queue_size = 128
+
+
 def start_server(port: int):
     global current_port
     current_port = port
     os.chdir(str(WEB_APP_DIR))
-    socketserver.ThreadingTCPServer.allow_reuse_address = True
 
     class SafeAPIHandler(APIHandler):
         def handle(self):
             try:
                 super().handle()
+            except (ConnectionResetError, BrokenPipeError) as e:
+                # Phones drop idle keep-alive connections without a FIN
+                log_error(f"Client disconnected: {e}", level="DEBUG")
             except Exception as e:
-                log_error(f"Handler error: {e}")
+                log_error(f"Handler error: {e}", level="ERROR")
 
     try:
-        with socketserver.ThreadingTCPServer(("0.0.0.0", port), SafeAPIHandler) as httpd:
+        with KeepAliveServer(("0.0.0.0", port), SafeAPIHandler) as httpd:
             log_error(f"Server running on http://localhost:{port}")
             httpd.serve_forever()
     except Exception as e:
-        log_error(f"Server error: {e}")
+        log_error(f"Server error: {e}", level="ERROR")
         time.sleep(2)
         start_server(port)
 
 
 def main():
     global current_port, port_attempts
+    import webbrowser  # desktop entry point only; not needed by importers such as mobile_server
+
     log_error("=" * 50)
     log_error("Study Helper server starting...")
     log_error("=" * 50)
@@ -589,17 +1480,22 @@ def main():
         port_attempts = attempts
         log_error(f"Port selection attempts: {attempts} -> chosen {port}")
     except RuntimeError as e:
-        log_error(f"Fatal: {e}")
+        log_error(f"Fatal: {e}", level="ERROR")
         sys.exit(1)
 
     save_server_info(port, attempts)
-    result = generate_session("oop_vocab", 7)
-    if not result.get("success"):
-        try:
-            with open(SESSION_FILE, "w", encoding="utf-8") as f:
-                json.dump(create_fallback_session(), f, ensure_ascii=True, indent=2)
-        except Exception as e:
-            log_error(f"Fallback save failed: {e}")
+
+    def write_default_session():
+        result = generate_session("oop_vocab", 7)
+        if not result.get("success"):
+            try:
+                atomic_write(SESSION_FILE, json_dumps(create_fallback_session()))
+            except Exception as e:
+                log_error(f"Fallback save failed: {e}", level="ERROR")
+        # Warm the rest only after the default session so it never waits on the pool
+        start_prewarm()
+
+    threading.Thread(target=write_default_session, name="default-session", daemon=True).start()
 
     if os.getenv("SKIP_AUTO_BROWSER_OPEN") != "1":
         def open_browser():
@@ -616,21 +1512,28 @@ def main():
             try:
                 webbrowser.open(f"http://localhost:{port}")
             except Exception as exc:
-                log_error(f"Tray open failed: {exc}")
+                log_error(f"Tray open failed: {exc}", level="WARNING")
 
         def _exit_app():
             log_error("Tray requested shutdown.")
-            os._exit(0)
+            _hard_exit()
 
         try:
+            # Windows-only; pystray/Pillow are loaded on demand
+            from ai_drill.tray_icon import TrayController
+
             tray = TrayController("StudyHelper", _open_ui, _exit_app, log_error)
             tray.start()
         except Exception as exc:
-            log_error(f"Tray init failed: {exc}")
+            log_error(f"Tray init failed: {exc}", level="WARNING")
 
     log_error("Server running...")
     start_server(port)
 
 
 if __name__ == "__main__":
+    import multiprocessing
+
+    # Required for ProcessPoolExecutor workers in the PyInstaller onefile build
+    multiprocessing.freeze_support()
     main()
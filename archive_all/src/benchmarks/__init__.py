@@ -0,0 +1 @@
+# Marks benchmarks as a package so scripts can run via `python -m benchmarks.<name>`.
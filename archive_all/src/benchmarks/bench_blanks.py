@@ -0,0 +1,101 @@
+"""
+Benchmark for Python blank extraction (modes 1/2).
+
+Builds synthetic linked-list style sources of 10k/50k lines and times
+make_blanks_with_context on them.
+
+Usage (from the src directory):
+  python -m benchmarks.bench_blanks
+  python -m benchmarks.bench_blanks --lines 10000 50000 --target 80 --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill.local_generator import make_blanks_with_context  # noqa: E402
+
+FUNCTION_TEMPLATE = '''
+def {name}(head, index, data):
+    node = Node(data)
+    current = head
+    pre = None
+    count = 0
+    if head is None:
+        head = node
+        return head
+    while current is not None and count < index:
+        pre = current
+        current = current.link
+        count += 1
+    if pre is None:
+        node.link = head
+        head = node
+    else:
+        node.link = current
+        pre.link = node
+    for item in range(count):
+        total = item * 2
+    return head
+'''
+
+CLASS_TEMPLATE = '''
+class {name}:
+    def __init__(self, data):
+        self.data = data
+        self.link = None
+
+    def get_next(self):
+        if self.link is not None:
+            return self.link
+        return None
+'''
+
+
+def build_python_source(line_count: int) -> str:
+    """Generate a deterministic Python source with roughly line_count lines."""
+    chunks = []
+    total = 0
+    idx = 0
+    while total < line_count:
+        if idx % 5 == 0:
+            chunk = CLASS_TEMPLATE.format(name=f"Node{idx}")
+        else:
+            chunk = FUNCTION_TEMPLATE.format(name=f"insertNode{idx}")
+        chunks.append(chunk)
+        total += chunk.count("\n")
+        idx += 1
+    return "".join(chunks)
+
+
+def time_call(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark blank extraction on synthetic sources.")
+    parser.add_argument("--lines", type=int, nargs="+", default=[10000, 50000], help="Source sizes in lines")
+    parser.add_argument("--target", type=int, default=80, help="Blank target count (default: 80, Extreme)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; best time is reported")
+    args = parser.parse_args()
+
+    for line_count in args.lines:
+        source = build_python_source(line_count)
+        elapsed = time_call(lambda: make_blanks_with_context(source, args.target), args.repeat)
+        print(f"{line_count:>7} lines  target={args.target:<3}  best={elapsed * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
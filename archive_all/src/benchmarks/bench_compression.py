@@ -0,0 +1,121 @@
+"""
+Bytes on the wire and time-to-load with and without gzip on a throttled link.
+
+Copies src/web_app to a temp dir, writes a large session.json there (compact
+schema, mode 2 on a synthetic source) and serves it with web_server's
+KeepAliveServer/APIHandler. One page load (index.html, app.js, style.css, the
+ES modules, session.json, two /data/ files, /api/cache) is fetched over a
+single keep-alive connection twice: without Accept-Encoding and with
+"Accept-Encoding: gzip". The client throttles itself: each request waits one
+--rtt-ms and each body is read no faster than --kbps, which approximates a
+phone on a weak hotspot. Server-side compression time is included because the
+clock runs from request to last byte.
+
+Usage (from the src directory):
+  python -m benchmarks.bench_compression
+  python -m benchmarks.bench_compression --kbps 1000 --rtt-ms 150
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill import web_server  # noqa: E402
+from ai_drill.local_generator import build_local_session  # noqa: E402
+from ai_drill.session_payload import build_session_payload  # noqa: E402
+from ai_drill.session_schema import compact_session_payload  # noqa: E402
+from ai_drill.session_store import SessionStore  # noqa: E402
+from benchmarks.bench_blanks import build_python_source  # noqa: E402
+from benchmarks.bench_http import page_paths  # noqa: E402
+
+CHUNK = 4096
+
+
+def prepare_web_dir(tmp_dir: Path, session_lines: int) -> Path:
+    web_dir = tmp_dir / "web_app"
+    shutil.copytree(SRC_DIR / "web_app", web_dir)
+    source = build_python_source(session_lines)
+    payload = build_session_payload(build_local_session(source, 2, 4), "bench.py")
+    text = json.dumps(compact_session_payload(payload), ensure_ascii=True, indent=2)
+    (web_dir / "session.json").write_text(text, encoding="utf-8")
+    return web_dir
+
+
+def throttled_read(response, bytes_per_sec: float) -> int:
+    received = 0
+    start = time.perf_counter()
+    while True:
+        chunk = response.read(CHUNK)
+        if not chunk:
+            return received
+        received += len(chunk)
+        due = start + received / bytes_per_sec
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def load_page(port: int, paths: list[str], gzip: bool, kbps: float, rtt: float) -> tuple[int, int, float]:
+    headers = {"Accept-Encoding": "gzip"} if gzip else {}
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    wire = raw = 0
+    start = time.perf_counter()
+    for path in paths:
+        time.sleep(rtt)
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        encoded = response.getheader("Content-Encoding") == "gzip"
+        size = throttled_read(response, kbps * 1000 / 8)
+        wire += size
+        raw += size if not encoded else 0
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return wire, raw, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure gzip savings on a throttled link.")
+    parser.add_argument("--kbps", type=float, default=2000, help="Link bandwidth in kilobits per second")
+    parser.add_argument("--rtt-ms", type=float, default=100, help="Round trip added before each request")
+    parser.add_argument("--session-lines", type=int, default=5000, help="Source size behind session.json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        web_dir = prepare_web_dir(Path(tmp), args.session_lines)
+        web_server.WEB_APP_DIR = web_dir
+        # Empty store: /session.json falls back to the file written above
+        web_server.SESSION_STORE = SessionStore(Path(tmp) / "sessions.sqlite3")
+        server = web_server.KeepAliveServer(("127.0.0.1", 0), web_server.APIHandler)
+        threading.Thread(target=server.serve_forever, name="bench-gzip", daemon=True).start()
+        port = server.server_address[1]
+        paths = page_paths(web_dir) + ["/session.json", "/data/input.txt", "/data/1_OOP_Vocabulary.txt"]
+        try:
+            print(f"{len(paths)} requests, {args.kbps:.0f} kbit/s, {args.rtt_ms:.0f} ms RTT")
+            results = {}
+            for label, use_gzip in (("identity", False), ("gzip", True)):
+                load_page(port, paths, use_gzip, 1e9, 0)  # warm the sidecar cache
+                wire, uncompressed, elapsed = load_page(port, paths, use_gzip, args.kbps, args.rtt_ms / 1000)
+                results[label] = (wire, elapsed)
+                print(f"  {label:<9} {wire / 1024:8.1f} KiB on the wire  "
+                      f"({uncompressed / 1024:7.1f} KiB sent uncompressed)  {elapsed:6.2f} s to load")
+            saved = 1 - results["gzip"][0] / results["identity"][0]
+            print(f"  gzip: {saved:.0%} fewer bytes, {results['identity'][1] / results['gzip'][1]:.1f}x faster load")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
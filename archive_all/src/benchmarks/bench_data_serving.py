@@ -0,0 +1,123 @@
+"""
+/data/ serving: read-decode-encode (previous handler) vs sendfile streaming.
+
+Writes a large text file (default 64 MiB) into a temporary data directory and
+fetches it through web_server's APIHandler, once with the previous /data/
+branch (probe candidates, read as str, encode back to UTF-8, write) and once
+with send_data_file (raw bytes via socket.sendfile). Reports throughput and
+the server-side tracemalloc peak, then checks a few Range requests.
+
+Usage (from the src directory):
+  python -m benchmarks.bench_data_serving
+  python -m benchmarks.bench_data_serving --mib 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill import web_server  # noqa: E402
+
+
+class LegacyDataHandler(web_server.APIHandler):
+    """The /data/ branch as it was before send_data_file."""
+
+    def send_data_file(self, file_name: str):
+        candidate_paths = [
+            web_server.DATA_DIR / file_name,
+            web_server.WEB_APP_DIR / "data" / file_name,
+        ]
+        file_path = next((p for p in candidate_paths if p.exists() and p.is_file()), None)
+        if file_path:
+            with open(file_path, "r", encoding="utf-8") as f:
+                body = f.read().encode("utf-8")
+            self.send_body(body, "text/plain; charset=utf-8")
+        else:
+            self.send_error(404, f"File not found: {file_name}")
+
+
+def write_material(path: Path, mib: int):
+    line = "알고리즘 study material line: linked list, stack, queue, tree 0123456789\n".encode("utf-8")
+    block = line * (1024 * 1024 // len(line) + 1)
+    with open(path, "wb") as f:
+        for _ in range(mib):
+            f.write(block[: 1024 * 1024])
+
+
+def fetch(port: int, path: str, headers: dict | None = None) -> tuple[int, bytes]:
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response.status, body
+
+
+def measure(handler, name: str, size: int) -> tuple[float, int]:
+    server = web_server.KeepAliveServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        status, body = fetch(server.server_address[1], f"/data/{name}")
+        elapsed = time.perf_counter() - start
+        # The client's own copy of the body is in the trace too; subtract it
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if status != 200 or len(body) != size:
+            raise SystemExit(f"{handler.__name__}: status {status}, {len(body)} of {size} bytes")
+        del body
+        return elapsed, max(0, peak - size)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare /data/ serving strategies on a large file.")
+    parser.add_argument("--mib", type=int, default=64, help="Size of the generated file in MiB")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        name = "large_material.txt"
+        write_material(data_dir / name, args.mib)
+        size = (data_dir / name).stat().st_size
+        web_server.DATA_DIR = data_dir
+
+        for label, handler in (("read/decode/encode", LegacyDataHandler), ("sendfile", web_server.APIHandler)):
+            elapsed, peak = measure(handler, name, size)
+            print(f"{label:<20} {size / elapsed / 2**20:8.1f} MiB/s  server peak {peak / 2**20:8.1f} MiB")
+
+        server = web_server.KeepAliveServer(("127.0.0.1", 0), web_server.APIHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            raw = (data_dir / name).read_bytes()
+            for header, expected in (
+                ("bytes=0-1023", raw[:1024]),
+                (f"bytes={size - 4096}-", raw[-4096:]),
+                ("bytes=-100", raw[-100:]),
+            ):
+                status, body = fetch(server.server_address[1], f"/data/{name}", {"Range": header})
+                ok = status == 206 and body == expected
+                print(f"Range {header:<22} -> {status} {'ok' if ok else 'MISMATCH'}")
+                if not ok:
+                    raise SystemExit(1)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
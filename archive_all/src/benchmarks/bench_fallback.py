@@ -0,0 +1,123 @@
+"""
+Memory/time benchmark for the non-Python token fallback (_fallback_token_blanks).
+
+Compares the streaming reservoir sampler against the original
+"collect every token dict, shuffle, slice" approach on synthetic C# sources.
+Peak memory is measured with tracemalloc for the sampling step alone and for
+the full call (which also renders the question text).
+
+Usage (from the src directory):
+  python -m benchmarks.bench_fallback
+  python -m benchmarks.bench_fallback --megabytes 1 4 --target 80
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill.local_generator import (  # noqa: E402
+    FALLBACK_EXCLUDED_KEYWORDS,
+    FALLBACK_TOKEN_RE,
+    _fallback_token_blanks,
+    _iter_fallback_tokens,
+    _reservoir_sample,
+)
+
+CSHARP_TEMPLATE = '''
+namespace Exam{idx}
+{{
+    class Account{idx} : IAccount
+    {{
+        private int balance = {idx};
+        public void Deposit(int amount)
+        {{
+            if (amount <= 0) throw new ArgumentException("amount");
+            balance += amount;
+            Console.WriteLine($"Deposit {{amount}} -> {{balance}}");
+        }}
+    }}
+}}
+'''
+
+
+def build_csharp_source(megabytes: float) -> str:
+    target = int(megabytes * 1024 * 1024)
+    chunks = []
+    size = 0
+    idx = 0
+    while size < target:
+        chunk = CSHARP_TEMPLATE.format(idx=idx)
+        chunks.append(chunk)
+        size += len(chunk)
+        idx += 1
+    return "".join(chunks)
+
+
+def legacy_sample(code: str, target_count: int) -> list:
+    """Reference copy of the original candidate collection + shuffle."""
+    lines = code.splitlines()
+    candidates = []
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        for match in FALLBACK_TOKEN_RE.finditer(line):
+            answer = match.group().strip()
+            if answer in FALLBACK_EXCLUDED_KEYWORDS or len(answer) <= 1:
+                continue
+            candidates.append({
+                "line_num": i + 1,
+                "answer": answer,
+                "text": answer,
+                "full_line": line.rstrip("\n"),
+                "col_offset": match.start(),
+            })
+    random.shuffle(candidates)
+    return candidates[:target_count]
+
+
+def streaming_sample(code: str, target_count: int) -> list:
+    return _reservoir_sample(_iter_fallback_tokens(code), target_count, random.Random(0))
+
+
+def measure(fn) -> tuple[float, float]:
+    """Return (seconds, peak MiB) for one call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the token fallback sampler.")
+    parser.add_argument("--megabytes", type=float, nargs="+", default=[1, 4], help="Source sizes in MiB")
+    parser.add_argument("--target", type=int, default=80, help="Blank target count (default: 80)")
+    args = parser.parse_args()
+
+    for megabytes in args.megabytes:
+        code = build_csharp_source(megabytes)
+        rows = [
+            ("legacy sample", lambda: legacy_sample(code, args.target)),
+            ("stream sample", lambda: streaming_sample(code, args.target)),
+            ("full fallback", lambda: _fallback_token_blanks(code, args.target, seed=0)),
+        ]
+        print(f"--- {megabytes:g} MiB source, target={args.target} ---")
+        for label, fn in rows:
+            elapsed, peak = measure(fn)
+            print(f"{label:<14} time={elapsed * 1000:8.1f} ms  peak={peak:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Page-load benchmark for the web server: fresh connection per request vs
+keep-alive, and a repeat load that revalidates with ETags (304s).
+
+Starts web_server's KeepAliveServer/APIHandler on a loopback port, serving
+src/web_app, and fetches what a page load fetches (index.html, app.js,
+style.css, every ES module under js/, sample_session.json, /api/cache) over
+one TCP connection per request (HTTP/1.0-style Connection: close) and over a single
+persistent HTTP/1.1 connection. Loopback has no Wi-Fi round trip, so the
+connection count is the number to watch; each saved connection saves at least
+one RTT on a phone. The repeat load sends the validators a browser would have
+stored, so the bytes column shows what a reload moves.
+
+Usage (from the src directory):
+  python -m benchmarks.bench_http
+  python -m benchmarks.bench_http --rounds 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill import web_server  # noqa: E402
+
+
+def page_paths(web_dir: Path) -> list[str]:
+    paths = ["/", "/app.js", "/style.css", "/manifest.json", "/sample_session.json"]
+    paths += sorted("/" + p.relative_to(web_dir).as_posix() for p in (web_dir / "js").rglob("*.js"))
+    paths.append("/api/cache")
+    return paths
+
+
+def start_server(web_dir: Path):
+    web_server.WEB_APP_DIR = web_dir
+    server = web_server.KeepAliveServer(("127.0.0.1", 0), web_server.APIHandler)
+    threading.Thread(target=server.serve_forever, name="bench-http", daemon=True).start()
+    return server
+
+
+def fetch_closing(port: int, paths: list[str]) -> tuple[int, int]:
+    received = 0
+    for path in paths:
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        conn.request("GET", path, headers={"Connection": "close"})
+        response = conn.getresponse()
+        received += len(response.read())
+        conn.close()
+    return received, len(paths)
+
+
+def fetch_keep_alive(port: int, paths: list[str]) -> tuple[int, int]:
+    received = 0
+    connections = 0
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    sock = None
+    for path in paths:
+        conn.request("GET", path)
+        if conn.sock is not sock:
+            sock = conn.sock
+            connections += 1
+        response = conn.getresponse()
+        body = response.read()
+        if response.getheader("Content-Length") != str(len(body)):
+            raise SystemExit(f"{path}: Content-Length {response.getheader('Content-Length')} != {len(body)}")
+        received += len(body)
+    conn.close()
+    return received, connections
+
+
+def fetch_revalidate(port: int, paths: list[str], validators: dict) -> tuple[int, int]:
+    """Keep-alive load with If-None-Match; fills validators on the first call."""
+    received = 0
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    not_modified = 0
+    for path in paths:
+        headers = {"If-None-Match": validators[path]} if path in validators else {}
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        received += len(response.read())
+        if response.status == 304:
+            not_modified += 1
+        elif response.getheader("ETag"):
+            validators[path] = response.getheader("ETag")
+    conn.close()
+    return received, not_modified
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-request connections with HTTP/1.1 keep-alive.")
+    parser.add_argument("--rounds", type=int, default=10, help="Page loads per variant; best time is reported")
+    args = parser.parse_args()
+
+    web_dir = SRC_DIR / "web_app"
+    paths = page_paths(web_dir)
+    server = start_server(web_dir)
+    port = server.server_address[1]
+    try:
+        results = {}
+        for name, fetch in (("connection per request", fetch_closing), ("keep-alive", fetch_keep_alive)):
+            best = float("inf")
+            for _ in range(max(1, args.rounds)):
+                start = time.perf_counter()
+                received, connections = fetch(port, paths)
+                best = min(best, time.perf_counter() - start)
+            results[name] = best
+            print(f"{name:<24} {len(paths)} requests  {connections:>3} connections  "
+                  f"{received / 1024:8.1f} KiB  {best * 1000:7.2f} ms")
+
+        validators: dict = {}
+        fetch_revalidate(port, paths, validators)
+        best = float("inf")
+        for _ in range(max(1, args.rounds)):
+            start = time.perf_counter()
+            received, not_modified = fetch_revalidate(port, paths, validators)
+            best = min(best, time.perf_counter() - start)
+        results["repeat load"] = best
+        print(f"{'repeat load (ETag)':<24} {len(paths)} requests  {not_modified:>3} x 304        "
+              f"{received / 1024:8.1f} KiB  {best * 1000:7.2f} ms")
+        print(json.dumps({name: round(value * 1000, 2) for name, value in results.items()}))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Caller-side cost of logging: per-call open/append/close vs AsyncLogWriter.
+
+Several threads (standing in for ThreadingTCPServer request threads) each log
+the same number of lines. The per-call variant is the old log_error body; the
+queued variant only enqueues, and its flush() time (writer thread draining to
+disk) is reported separately. Also checks that no line is lost or interleaved.
+
+Usage (from the src directory):
+  python -m benchmarks.bench_logging
+  python -m benchmarks.bench_logging --threads 8 --lines 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill.log_writer import AsyncLogWriter  # noqa: E402
+
+
+def per_call_log(path: Path, message: str):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"[{timestamp}] {message}\n")
+        f.flush()
+
+
+def run_threads(log_fn, threads: int, lines: int) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int):
+        barrier.wait()
+        for n in range(lines):
+            log_fn(f"thread={index} line={n} session cache hit: 0123456789ab")
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def count_lines(path: Path) -> int:
+    total = 0
+    for candidate in [path, *path.parent.glob(path.name + ".*")]:
+        with open(candidate, encoding="utf-8") as f:
+            for line in f:
+                if not line.startswith("[") or "line=" not in line:
+                    raise SystemExit(f"malformed log line in {candidate.name}: {line!r}")
+                total += 1
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-call file logging with the queued writer.")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent logging threads")
+    parser.add_argument("--lines", type=int, default=2000, help="Lines logged per thread")
+    args = parser.parse_args()
+    expected = args.threads * args.lines
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        direct_path = tmp_dir / "direct.log"
+        direct = run_threads(lambda msg: per_call_log(direct_path, msg), args.threads, args.lines)
+
+        queued_path = tmp_dir / "queued.log"
+        writer = AsyncLogWriter(queued_path, max_bytes=256 * 1024, backup_count=50)
+        queued = run_threads(writer.info, args.threads, args.lines)
+        start = time.perf_counter()
+        writer.flush(timeout=30.0)
+        drained = time.perf_counter() - start
+        writer.close()
+
+        for name, path in (("per-call", direct_path), ("queued", queued_path)):
+            written = count_lines(path)
+            if written != expected:
+                raise SystemExit(f"{name}: wrote {written} lines, expected {expected}")
+        rotated = len(list(tmp_dir.glob("queued.log.*")))
+
+    per_line = lambda seconds: seconds / expected * 1e6  # noqa: E731
+    print(f"{args.threads} threads x {args.lines} lines ({expected} total)")
+    print(f"  per-call open: {direct * 1000:8.1f} ms  {per_line(direct):6.2f} us/line")
+    print(f"  queued       : {queued * 1000:8.1f} ms  {per_line(queued):6.2f} us/line  "
+          f"(+{drained * 1000:.1f} ms drain, {rotated} rotated files)")
+    print(f"  caller speedup: {direct / queued:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
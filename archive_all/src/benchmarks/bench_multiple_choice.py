@@ -0,0 +1,77 @@
+"""
+Timing benchmark for make_multiple_choice on large synthetic Python sources.
+
+Compares the original per-question "copy every other answer, then sample"
+distractor pick with the bucketed distractor index, and shows a few sample
+questions so distractor plausibility can be eyeballed.
+
+Usage (from the src directory):
+  python -m benchmarks.bench_multiple_choice
+  python -m benchmarks.bench_multiple_choice --lines 50000 --questions 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill.local_generator import (  # noqa: E402
+    _build_distractor_index,
+    _pick_distractors,
+    make_multiple_choice,
+)
+from benchmarks.bench_blanks import build_python_source, time_call  # noqa: E402
+
+
+def legacy_pick(answers: list[str], questions: int) -> None:
+    """Reference copy of the original distractor selection loop."""
+    all_answers = list(set(answers))
+    for correct in answers[:questions]:
+        wrong_pool = [a for a in all_answers if a != correct]
+        random.sample(wrong_pool, min(3, len(wrong_pool)))
+
+
+def indexed_pick(answers: list[str], questions: int) -> None:
+    index = _build_distractor_index(answers)
+    for correct in answers[:questions]:
+        _pick_distractors(index, correct)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multiple-choice distractor selection.")
+    parser.add_argument("--lines", type=int, nargs="+", default=[10000, 50000], help="Source sizes in lines")
+    parser.add_argument("--questions", type=int, default=500, help="Questions per run (default: 500)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; best time is reported")
+    parser.add_argument("--samples", type=int, default=3, help="Sample questions to print")
+    args = parser.parse_args()
+
+    for line_count in args.lines:
+        source = build_python_source(line_count)
+        # Varied answers so the legacy pool is realistically large
+        answers = [f"{a}_{i}" if i % 3 else a for i, a in enumerate(
+            ("self.data", "len(items)", "count + 1", "node.next", "0", "value > limit") * (line_count // 6)
+        )]
+        print(f"--- {line_count} lines, {len(set(answers))} unique answers, {args.questions} questions ---")
+        rows = [
+            ("legacy pick", lambda: legacy_pick(answers, args.questions)),
+            ("indexed pick", lambda: indexed_pick(answers, args.questions)),
+            ("make_multiple_choice", lambda: make_multiple_choice(source, args.questions)),
+        ]
+        for label, fn in rows:
+            print(f"{label:<21} best={time_call(fn, args.repeat) * 1000:9.1f} ms")
+
+    random.seed(0)
+    _, answer_key = make_multiple_choice(build_python_source(2000), args.samples)
+    for question in answer_key["_questions"]:
+        options = [opt["text"] for opt in question["options"]]
+        print(f"Q{question['num']}: correct={options[question['correct'] - 1]!r} options={options}")
+
+
+if __name__ == "__main__":
+    main()
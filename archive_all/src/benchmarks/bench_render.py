@@ -0,0 +1,96 @@
+"""
+Benchmark and parity check for the inline blank renderer.
+
+Compares the original per-blank string-slicing renderer with the single-pass
+piece-table renderer (outputs must match), and rendering all four difficulty
+variants through make_blank_variants against four make_blanks_with_context
+calls.
+
+Usage (from the src directory):
+  python -m benchmarks.bench_render
+  python -m benchmarks.bench_render --lines 50000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill.local_generator import (  # noqa: E402
+    BLANK_COUNTS_BY_DIFFICULTY,
+    build_inline_blank_code,
+    make_blank_variants,
+    make_blanks_with_context,
+)
+from benchmarks.bench_blanks import build_python_source, time_call  # noqa: E402
+
+
+def legacy_build_inline_blank_code(code: str, blanks: list) -> str:
+    """Reference copy of the original renderer."""
+    lines = code.split("\n")
+    blanks_by_line: dict[int, list[dict]] = {}
+    for blank in blanks:
+        line_num = int(blank.get("line_num", 0))
+        blanks_by_line.setdefault(line_num, []).append(blank)
+
+    result_lines = []
+    for i, line in enumerate(lines):
+        line_blanks = blanks_by_line.get(i + 1)
+        if not line_blanks:
+            result_lines.append(line)
+            continue
+        modified_line = line
+        sorted_blanks = sorted(
+            line_blanks,
+            key=lambda b: -(b.get("col_offset", -1) if b.get("col_offset", -1) != -1 else b.get("blank_num", 0))
+        )
+        for blank in sorted_blanks:
+            answer = str(blank.get("answer", "")).strip()
+            col_offset = blank.get("col_offset", -1)
+            marker = f"__[{blank.get('blank_num')}]__"
+            insert_at = -1
+            if col_offset is not None and col_offset >= 0 and col_offset + len(answer) <= len(modified_line):
+                if modified_line[col_offset:col_offset + len(answer)] == answer:
+                    insert_at = col_offset
+            if insert_at == -1 and answer:
+                insert_at = modified_line.find(answer)
+            if insert_at != -1:
+                modified_line = modified_line[:insert_at] + marker + modified_line[insert_at + len(answer):]
+            else:
+                modified_line = f"{modified_line.rstrip()} {marker}".strip()
+        result_lines.append(modified_line)
+    return "\n".join(result_lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the inline blank renderer.")
+    parser.add_argument("--lines", type=int, nargs="+", default=[10000, 50000], help="Source sizes in lines")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; best time is reported")
+    args = parser.parse_args()
+
+    for line_count in args.lines:
+        source = build_python_source(line_count)
+        _, answer_key = make_blanks_with_context(source, 80)
+        blanks = answer_key["_blanks"]
+        if build_inline_blank_code(source, blanks) != legacy_build_inline_blank_code(source, blanks):
+            raise SystemExit(f"renderer output differs from legacy at {line_count} lines")
+
+        counts = BLANK_COUNTS_BY_DIFFICULTY
+        rows = [
+            ("legacy render", lambda: legacy_build_inline_blank_code(source, blanks)),
+            ("piece render", lambda: build_inline_blank_code(source, blanks)),
+            ("4x make_blanks", lambda: [make_blanks_with_context(source, count) for count in counts.values()]),
+            ("make_blank_variants", lambda: make_blank_variants(source, counts)),
+        ]
+        print(f"--- {line_count} lines, {len(blanks)} blanks (outputs match) ---")
+        for label, fn in rows:
+            print(f"{label:<20} best={time_call(fn, args.repeat) * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
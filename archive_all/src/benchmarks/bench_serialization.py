@@ -0,0 +1,130 @@
+"""
+Session serialization: bytes, serialize time and parse time per JSON format.
+
+Builds a session for every bundled data file (data/*.txt) in every local
+mode (2-7) with the local generator, compacts it the way save_session does,
+and serializes all of them with:
+
+  ascii-indent   json.dumps(ensure_ascii=True, indent=2) (previous format)
+  utf8-compact   json_io with the standard library backend
+  orjson         json_io with orjson (skipped when it is not installed)
+
+Times are the best of --repeat passes over all sessions. A per-file table
+shows how much of the saving comes from Korean text no longer being escaped.
+The last lines compare a plain write with json_io.atomic_write.
+
+Usage (from the src directory):
+  python -m benchmarks.bench_serialization
+  python -m benchmarks.bench_serialization --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill import json_io  # noqa: E402
+from ai_drill.local_generator import build_local_session  # noqa: E402
+from ai_drill.session_payload import build_session_payload  # noqa: E402
+from ai_drill.session_schema import compact_session_payload  # noqa: E402
+from ai_drill.web_server import DATA_DIR  # noqa: E402
+
+MODES = (2, 3, 4, 5, 6, 7)
+
+
+def build_sessions() -> list[tuple[str, dict]]:
+    sessions = []
+    for path in sorted(DATA_DIR.glob("*.txt")):
+        content = path.read_text(encoding="utf-8")
+        for mode in MODES:
+            session = build_local_session(content, mode, 2)
+            if session.answer_key.get("_error"):
+                continue
+            sessions.append((path.name, compact_session_payload(build_session_payload(session, str(path)))))
+    return sessions
+
+
+def formats() -> dict:
+    found = {
+        "ascii-indent": (
+            lambda obj: json.dumps(obj, ensure_ascii=True, indent=2).encode("utf-8"),
+            json.loads,
+        ),
+        "utf8-compact": (json_io._dumps_stdlib, json.loads),
+    }
+    if json_io._orjson is not None:
+        orjson = json_io._orjson
+        found["orjson"] = (lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS), orjson.loads)
+    return found
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare session JSON formats on the bundled data files.")
+    parser.add_argument("--repeat", type=int, default=20, help="Passes per measurement; best is reported")
+    args = parser.parse_args()
+    repeat = max(1, args.repeat)
+
+    sessions = build_sessions()
+    payloads = [payload for _, payload in sessions]
+    print(f"{len(sessions)} sessions from {len({name for name, _ in sessions})} data files")
+
+    results = {}
+    for name, (dump, load) in formats().items():
+        encoded = [dump(payload) for payload in payloads]
+        if [load(data) for data in encoded] != [json.loads(json.dumps(p)) for p in payloads]:
+            raise SystemExit(f"{name}: round trip changed the documents")
+        results[name] = (
+            sum(len(data) for data in encoded),
+            best_of(repeat, lambda: [dump(payload) for payload in payloads]),
+            best_of(repeat, lambda: [load(data) for data in encoded]),
+        )
+    base_bytes, base_dump, base_load = results["ascii-indent"]
+    print(f"{'format':<14} {'KiB':>9} {'ratio':>6} {'dump ms':>9} {'parse ms':>9}")
+    for name, (size, dump_s, load_s) in results.items():
+        print(f"{name:<14} {size / 1024:9.1f} {size / base_bytes:6.2f} {dump_s * 1000:9.2f} {load_s * 1000:9.2f}"
+              f"   (dump {base_dump / dump_s:4.1f}x, parse {base_load / load_s:4.1f}x)")
+
+    print(f"\n{'data file':<36} {'ascii-indent':>13} {'utf8-compact':>13}")
+    per_file: dict[str, list[int]] = {}
+    for name, payload in sessions:
+        sizes = per_file.setdefault(name, [0, 0])
+        sizes[0] += len(json.dumps(payload, ensure_ascii=True, indent=2).encode("utf-8"))
+        sizes[1] += len(json_io._dumps_stdlib(payload))
+    for name, (old, new) in per_file.items():
+        print(f"{name:<36} {old / 1024:11.1f} K {new / 1024:11.1f} K  ({new / old:.0%})")
+
+    largest = max((json_io.dumps(payload) for payload in payloads), key=len)
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "session.json"
+
+        def plain_write():
+            with open(target, "wb") as f:
+                f.write(largest)
+
+        print(f"\nwrite {len(largest) / 1024:.1f} KiB session.json (best of {repeat}):")
+        print(f"  plain open/write            {best_of(repeat, plain_write) * 1000:7.3f} ms")
+        for fsync in (False, True):
+            elapsed = best_of(repeat, lambda: json_io.atomic_write(target, largest, fsync=fsync))
+            print(f"  atomic_write(fsync={fsync!s:<5})   {elapsed * 1000:7.3f} ms")
+    print(f"json_io backend: {json_io.BACKEND}")
+
+
+if __name__ == "__main__":
+    main()
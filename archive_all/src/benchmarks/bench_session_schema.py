@@ -0,0 +1,114 @@
+"""
+Size/parse benchmark for the compact (v2) session.json schema.
+
+Builds sessions for blank and implementation-challenge modes on a synthetic
+Python source, serializes them the way web_server does (v1 vs v2) and
+reports file size plus load time. If node is on PATH, load time is measured
+with the web UI's own expandCompactSession from web_app/app.js (decode +
+JSON.parse + expand); otherwise json.loads + expand_session_payload is timed.
+
+Usage (from the src directory):
+  python -m benchmarks.bench_session_schema
+  python -m benchmarks.bench_session_schema --lines 5000 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill.local_generator import build_local_session  # noqa: E402
+from ai_drill.session_payload import build_session_payload  # noqa: E402
+from ai_drill.session_schema import compact_session_payload, expand_session_payload  # noqa: E402
+from benchmarks.bench_blanks import build_python_source, time_call  # noqa: E402
+
+APP_JS = SRC_DIR / "web_app" / "app.js"
+
+NODE_TIMER = """
+const fs = require("fs");
+const [expander, v1Path, v2Path, repeat] = process.argv.slice(-4);
+eval(fs.readFileSync(expander, "utf8"));
+const decoder = new TextDecoder();
+const best = (fn) => {
+  let t = Infinity;
+  for (let i = 0; i < Number(repeat); i++) {
+    const start = process.hrtime.bigint();
+    fn();
+    t = Math.min(t, Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  return t;
+};
+const v1 = fs.readFileSync(v1Path);
+const v2 = fs.readFileSync(v2Path);
+console.log(JSON.stringify([
+  best(() => JSON.parse(decoder.decode(v1))),
+  best(() => expandCompactSession(JSON.parse(decoder.decode(v2)))),
+]));
+"""
+
+
+def extract_client_expander(tmp_dir: Path) -> Path:
+    """Copy the schema helpers out of app.js so node can run them without a DOM."""
+    source = APP_JS.read_text(encoding="utf-8")
+    start = source.index("const SESSION_SCHEMA_VERSION")
+    end = source.index("function setSession(")
+    path = tmp_dir / "expand.js"
+    path.write_text(source[start:end].replace("const ", "var "), encoding="utf-8")
+    return path
+
+
+def node_load_times(expander: Path, v1_text: str, v2_text: str, repeat: int, tmp_dir: Path) -> tuple[float, float]:
+    v1_path = tmp_dir / "v1.json"
+    v2_path = tmp_dir / "v2.json"
+    v1_path.write_text(v1_text, encoding="utf-8")
+    v2_path.write_text(v2_text, encoding="utf-8")
+    result = subprocess.run(
+        ["node", "-e", NODE_TIMER, str(expander), str(v1_path), str(v2_path), str(repeat)],
+        capture_output=True, text=True, check=True,
+    )
+    v1_ms, v2_ms = json.loads(result.stdout)
+    return v1_ms / 1000, v2_ms / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare v1 and v2 session.json size and load time.")
+    parser.add_argument("--lines", type=int, nargs="+", default=[5000, 20000], help="Source sizes in lines")
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per measurement; best time is reported")
+    args = parser.parse_args()
+
+    use_node = shutil.which("node") is not None
+    print(f"load time measured with {'node + app.js expandCompactSession' if use_node else 'python json.loads'}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        expander = extract_client_expander(tmp_dir) if use_node else None
+        for line_count in args.lines:
+            source = build_python_source(line_count)
+            for mode, difficulty in ((2, 4), (3, 2)):
+                payload = build_session_payload(build_local_session(source, mode, difficulty), "bench.py")
+                compact = compact_session_payload(payload)
+                v1_text = json.dumps(payload, ensure_ascii=True, indent=2)
+                v2_text = json.dumps(compact, ensure_ascii=True, indent=2)
+                if use_node:
+                    v1_time, v2_time = node_load_times(expander, v1_text, v2_text, args.repeat, tmp_dir)
+                else:
+                    v1_time = time_call(lambda: json.loads(v1_text), args.repeat)
+                    v2_time = time_call(lambda: expand_session_payload(json.loads(v2_text)), args.repeat)
+                print(
+                    f"{line_count:>6} lines mode={mode}  "
+                    f"v1={len(v1_text) / 1024:8.1f} KiB {v1_time * 1000:7.2f} ms  "
+                    f"v2={len(v2_text) / 1024:8.1f} KiB {v2_time * 1000:7.2f} ms  "
+                    f"size={len(v2_text) / len(v1_text):5.1%}"
+                )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Time to first model text: blocking endpoints vs Server-Sent Events.
+
+Runs web_server on a loopback port with the offline fake model
+(STUDYHELPER_FAKE_LLM=1), whose first chunk arrives after --first-token
+seconds and each further chunk after --chunk-delay. Measures, for an AI
+session generation (mode 2 on a synthetic source) and for a chat proxy call:
+
+  blocking   POST /api/generate, POST /api/gemini-proxy: nothing until the end
+  streaming  POST /api/jobs + GET /api/jobs/<id>/events, POST /api/gemini-proxy/stream
+
+and reports time to the first text chunk and to the complete result.
+
+Usage (from the src directory):
+  python -m benchmarks.bench_streaming
+  python -m benchmarks.bench_streaming --first-token 2 --chunk-delay 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+os.environ["STUDYHELPER_FAKE_LLM"] = "1"
+
+from ai_drill import fake_genai, web_server  # noqa: E402
+from ai_drill.session_cache import SessionCache  # noqa: E402
+from benchmarks.bench_blanks import build_python_source  # noqa: E402
+
+
+def post(port: int, path: str, body: dict):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("POST", path, body=json.dumps(body), headers={"Content-Type": "application/json"})
+    return conn, conn.getresponse()
+
+
+def read_events(response, start: float) -> tuple[float | None, float, str]:
+    """(seconds to first chunk, seconds to the final event, final event name)."""
+    first = None
+    event = ""
+    for raw in response.fp:
+        line = raw.decode("utf-8").rstrip("\n")
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+            if event == "chunk" and first is None:
+                first = time.perf_counter() - start
+            elif event in ("done", "failed", "cancelled", "error"):
+                return first, time.perf_counter() - start, event
+    return first, time.perf_counter() - start, event or "eof"
+
+
+def blocking(port: int, path: str, body: dict) -> float:
+    start = time.perf_counter()
+    conn, response = post(port, path, body)
+    data = json.loads(response.read())
+    conn.close()
+    if data.get("error"):
+        raise SystemExit(f"{path}: {data['error']}")
+    return time.perf_counter() - start
+
+
+def streamed_session(port: int, body: dict) -> tuple[float | None, float, str]:
+    start = time.perf_counter()
+    conn, response = post(port, "/api/jobs", body)
+    job = json.loads(response.read())
+    conn.request("GET", f"/api/jobs/{job['id']}/events")
+    result = read_events(conn.getresponse(), start)
+    conn.close()
+    return result
+
+
+def streamed_chat(port: int, body: dict) -> tuple[float | None, float, str]:
+    start = time.perf_counter()
+    conn, response = post(port, "/api/gemini-proxy/stream", body)
+    result = read_events(response, start)
+    conn.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare time to first text with and without SSE streaming.")
+    parser.add_argument("--first-token", type=float, default=1.0, help="Fake model delay before the first chunk")
+    parser.add_argument("--chunk-delay", type=float, default=0.03, help="Fake model delay between chunks")
+    parser.add_argument("--lines", type=int, default=300, help="Size of the synthetic source in lines")
+    args = parser.parse_args()
+
+    fake_genai.FIRST_TOKEN_DELAY = args.first_token
+    fake_genai.CHUNK_DELAY = args.chunk_delay
+
+    with tempfile.TemporaryDirectory() as tmp:
+        web_server.WEB_APP_DIR = Path(tmp)
+        web_server.SESSION_FILE = Path(tmp) / "session.json"
+        # Memory-only cache so clearing it between runs leaves the on-disk cache alone
+        web_server.SESSION_CACHE = SessionCache(cache_dir=None)
+        server = web_server.KeepAliveServer(("127.0.0.1", 0), web_server.APIHandler)
+        threading.Thread(target=server.serve_forever, name="bench-sse", daemon=True).start()
+        port = server.server_address[1]
+        source = build_python_source(args.lines)
+        try:
+            for label, body, run_blocking, run_stream in (
+                (
+                    "session (mode 2, ai)",
+                    {"preset": "custom", "content": source, "fileName": "bench.py", "mode": 2, "method": "ai"},
+                    lambda body: blocking(port, "/api/generate", body),
+                    lambda body: streamed_session(port, body),
+                ),
+                (
+                    "chat proxy",
+                    {"prompt": "Explain how a singly linked list deletes its head node. " * 8},
+                    lambda body: blocking(port, "/api/gemini-proxy", body),
+                    lambda body: streamed_chat(port, body),
+                ),
+            ):
+                web_server.clear_session_cache()
+                total = run_blocking(body)
+                web_server.clear_session_cache()
+                first, streamed_total, event = run_stream(body)
+                if event != "done" or first is None:
+                    raise SystemExit(f"{label}: stream ended with {event!r}")
+                print(f"{label:<22} blocking: first text {total:6.2f} s, complete {total:6.2f} s")
+                print(f"{'':<22} streaming: first text {first:6.2f} s, complete {streamed_total:6.2f} s")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
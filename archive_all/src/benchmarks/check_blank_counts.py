@@ -0,0 +1,55 @@
+"""
+Blank count check for modes 1/2: every difficulty reaches its target.
+
+build_local_session(content, mode, difficulty) must produce
+BLANK_COUNTS_BY_DIFFICULTY[difficulty] blanks whenever the source has that
+many blankable tokens, whether the candidates come from the Python AST, the
+brace-language scanner (topped up with plain tokens) or the token fallback.
+Exits with a non-zero status on any shortfall.
+
+Usage (from the src directory):
+  python -m benchmarks.check_blank_counts
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill.local_generator import BLANK_COUNTS_BY_DIFFICULTY, build_local_session  # noqa: E402
+from benchmarks.bench_blanks import build_python_source  # noqa: E402
+
+DATA_DIR = SRC_DIR.parent / "data"
+# C# exercises (brace scanner) and Python code (AST)
+DATA_FILES = ("3_OOP_Code_Blanks.txt", "4_Data_Structure_Code.txt")
+
+
+def main():
+    sources = {name: (DATA_DIR / name).read_text(encoding="utf-8") for name in DATA_FILES}
+    sources["synthetic_python_400"] = build_python_source(400)
+
+    failures = 0
+    for name, content in sources.items():
+        counts = {}
+        for difficulty, target in BLANK_COUNTS_BY_DIFFICULTY.items():
+            blanks = build_local_session(content, 1, difficulty).answer_key.get("_blanks", [])
+            counts[difficulty] = len(blanks)
+            if len(blanks) != target:
+                print(f"FAIL {name} difficulty {difficulty}: {len(blanks)} blanks, expected {target}")
+                failures += 1
+            functions = [str(blank.get("function") or "") for blank in blanks]
+            if any(function and not function.strip("_") for function in functions):
+                print(f"FAIL {name} difficulty {difficulty}: a blank names a _____ placeholder as its function")
+                failures += 1
+        print(f"{name:<28} {counts}")
+    if failures:
+        raise SystemExit(f"{failures} failures")
+    print("OK: every difficulty reaches its blank target")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Pinned output check for mode 3 (implementation challenges).
+
+Mode 3 sessions do not depend on difficulty: every difficulty, Easy included,
+must produce the same unsplit challenges (one per class/function). Per-method
+challenges are only built when split_methods is requested explicitly. This
+script hashes build_local_session(content, 3, difficulty) for the bundled
+code files and a synthetic Python source and compares the digests with the
+pinned values below. Non-Python presets (C#, math notes) go through the
+line-scan fallback of the splitter; their section counts are pinned too.
+Exits with a non-zero status on any mismatch.
+
+A deliberate change to the splitter updates the pins:
+  python -m benchmarks.check_implementation_output --print
+
+Usage (from the src directory):
+  python -m benchmarks.check_implementation_output
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill.local_generator import build_local_session, make_implementation_challenge  # noqa: E402
+from benchmarks.bench_blanks import build_python_source  # noqa: E402
+
+DATA_DIR = SRC_DIR.parent / "data"
+DIFFICULTIES = (1, 2, 3, 4)
+
+# sha256 prefix of the unsplit session for each source (same for every difficulty)
+PINNED = {
+    "3_OOP_Code_Blanks.txt": "a9efeaaf538f5fb7",
+    "4_Data_Structure_Code.txt": "2b15e8a3aa578f51",
+    "synthetic_python_400": "1f934257b3d46da8",
+}
+
+# make_implementation_challenge section counts for presets the tokenizer rejects
+SECTION_COUNTS = {
+    "3_OOP_Code_Blanks.txt": 12,
+    "5_Computational_Math_Theory.txt": 29,
+}
+
+
+def sources() -> dict:
+    found = {name: (DATA_DIR / name).read_text(encoding="utf-8") for name in PINNED if name.endswith(".txt")}
+    found["synthetic_python_400"] = build_python_source(400)
+    return found
+
+
+def session_digest(content: str, difficulty: int, split_methods: bool = False) -> tuple[str, int]:
+    """(sha256 prefix of question text + answer key, challenge count)."""
+    session = build_local_session(content, 3, difficulty, split_methods=split_methods)
+    blob = json.dumps([session.question_text, session.answer_key], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16], len(session.answer_key.get("_challenges", []))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check mode 3 output against pinned digests.")
+    parser.add_argument("--print", action="store_true", help="Print current digests instead of checking")
+    args = parser.parse_args()
+
+    failures = 0
+    for name, content in sources().items():
+        digests = {d: session_digest(content, d) for d in DIFFICULTIES}
+        digest, challenges = digests[1]
+        if args.print:
+            print(f'    "{name}": "{digest}",')
+            continue
+        for difficulty, (other, _) in digests.items():
+            if other != PINNED[name]:
+                print(f"FAIL {name} difficulty {difficulty}: {other} != pinned {PINNED[name]}")
+                failures += 1
+        split_digest, split_challenges = session_digest(content, 1, split_methods=True)
+        print(f"{name:<28} {challenges:3d} challenges (split_methods: {split_challenges})")
+        if split_challenges < challenges:
+            print(f"FAIL {name}: split_methods produced fewer challenges ({split_challenges} < {challenges})")
+            failures += 1
+    if args.print:
+        return
+    for name, expected in SECTION_COUNTS.items():
+        content = (DATA_DIR / name).read_text(encoding="utf-8")
+        sections = len(make_implementation_challenge(content)[1]["_challenges"])
+        print(f"{name:<28} {sections:3d} sections (expected {expected})")
+        if sections != expected:
+            print(f"FAIL {name}: {sections} sections != {expected}")
+            failures += 1
+    if failures:
+        raise SystemExit(f"{failures} mismatches")
+    print("OK: mode 3 output matches the pinned digests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Startup import budget check for the server entry point.
+
+Runs `python -X importtime -c "import ai_drill.web_server"` (the module-level
+work `python -m ai_drill.web_server` does before main()) in a fresh
+interpreter, and fails if:
+  - a GUI/CLI-only module is imported (tkinter, rich, ai_drill.main, tray...)
+  - the best cumulative import time exceeds the budget
+
+Bytecode writing is forced on and one warm-up run is discarded, so the
+numbers reflect a normal start rather than a first compile.
+
+Usage (from the src directory):
+  python -m benchmarks.check_import_budget
+  python -m benchmarks.check_import_budget --budget-ms 150 --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+
+ENTRY_MODULE = "ai_drill.web_server"
+
+# Must stay lazy: missing on headless boxes/Termux, or only needed by the desktop app
+FORBIDDEN_MODULES = (
+    "tkinter",
+    "_tkinter",
+    "rich",
+    "ai_drill.main",
+    "ai_drill.tray_icon",
+    "pystray",
+    "PIL",
+    "google.generativeai",
+    "concurrent.futures.process",
+)
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def run_importtime() -> list[tuple[int, int, int, str]]:
+    """Return (self_us, cumulative_us, depth, module) rows for one fresh import."""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {ENTRY_MODULE}"],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {ENTRY_MODULE} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(self_us), int(cumulative_us), len(indent) // 2, module))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the server's startup import budget.")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Max cumulative import time (default: 150)")
+    parser.add_argument("--runs", type=int, default=3, help="Measured runs; the best one is used")
+    parser.add_argument("--top", type=int, default=10, help="Slowest direct imports to list")
+    args = parser.parse_args()
+
+    run_importtime()  # warm-up: writes .pyc files
+    best_rows = None
+    best_total = None
+    for _ in range(max(1, args.runs)):
+        rows = run_importtime()
+        total = next((cum for _, cum, _, module in rows if module == ENTRY_MODULE), None)
+        if total is None:
+            raise SystemExit(f"{ENTRY_MODULE} missing from -X importtime output")
+        if best_total is None or total < best_total:
+            best_rows, best_total = rows, total
+
+    failures = []
+    imported = {module for *_, module in best_rows}
+    for forbidden in FORBIDDEN_MODULES:
+        hits = sorted(m for m in imported if m == forbidden or m.startswith(forbidden + "."))
+        if hits:
+            failures.append(f"forbidden import at startup: {', '.join(hits[:3])}")
+
+    total_ms = best_total / 1000
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+
+    print(f"{ENTRY_MODULE}: {total_ms:.1f} ms cumulative (budget {args.budget_ms:.1f} ms), {len(imported)} modules")
+    direct = sorted((row for row in best_rows if row[2] == 1), key=lambda row: -row[1])
+    for _, cumulative_us, _, module in direct[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
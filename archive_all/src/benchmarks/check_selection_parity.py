@@ -0,0 +1,175 @@
+"""
+Parity check for the blank selector used by make_blanks_with_context.
+
+Compares _select_blanks against the original list-based selection loops on
+seeded synthetic candidate sets and on the bundled data files. Exits with a
+non-zero status on the first mismatch.
+
+Usage (from the src directory):
+  python -m benchmarks.check_selection_parity
+  python -m benchmarks.check_selection_parity --seeds 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import random
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill.local_generator import (  # noqa: E402
+    DEFAULT_FUNC_WEIGHT,
+    FUNCTION_WEIGHTS,
+    MIN_LINE_DISTANCE,
+    _extract_python_candidates,
+    _select_blanks,
+)
+
+TARGETS = (30, 50, 60, 80)
+DATA_FILES = ("4_Data_Structure_Code.txt",)
+FUNCTION_NAMES = sorted(FUNCTION_WEIGHTS) + ["Node.__init__", "LinkedList.appendNode", "helper", "__global__"]
+
+
+def legacy_select(candidates: list, target_count: int) -> list:
+    """Reference copy of the original quadratic selection loops."""
+    by_function = {}
+    for cand in candidates:
+        by_function.setdefault(cand['function'], []).append(cand)
+    for func in by_function:
+        by_function[func].sort(key=lambda c: -c['score'])
+
+    total_weight = sum(FUNCTION_WEIGHTS.get(f.split('.')[-1], DEFAULT_FUNC_WEIGHT)
+                       for f in by_function.keys())
+    if total_weight == 0:
+        total_weight = len(by_function)
+
+    allocations = {}
+    for func in by_function:
+        weight = FUNCTION_WEIGHTS.get(func.split('.')[-1], DEFAULT_FUNC_WEIGHT)
+        allocations[func] = max(1, round(target_count * weight / total_weight))
+
+    selected = []
+    used_lines = set()
+    used_patterns = set()
+    for func_name in sorted(by_function.keys(),
+                            key=lambda f: -FUNCTION_WEIGHTS.get(f.split('.')[-1], DEFAULT_FUNC_WEIGHT)):
+        func_quota = allocations.get(func_name, 1)
+        func_selected = 0
+        for cand in by_function[func_name]:
+            if func_selected >= func_quota:
+                break
+            line = cand['line_num']
+            if any(abs(line - used) < MIN_LINE_DISTANCE for used in used_lines):
+                continue
+            pattern_key = (func_name, cand['text'][:20])
+            if pattern_key in used_patterns:
+                continue
+            selected.append(cand)
+            used_lines.add(line)
+            used_patterns.add(pattern_key)
+            func_selected += 1
+
+    if target_count - len(selected) > 0:
+        leftover = [c for c in candidates if c not in selected]
+        leftover.sort(key=lambda c: -c['score'])
+        for cand in leftover:
+            if len(selected) >= target_count:
+                break
+            line = cand['line_num']
+            if any(abs(line - used) < MIN_LINE_DISTANCE for used in used_lines):
+                continue
+            selected.append(cand)
+            used_lines.add(line)
+
+    if len(selected) < target_count:
+        leftover = [c for c in candidates if c not in selected]
+        leftover.sort(key=lambda c: (-c['score'], c['line_num']))
+        for cand in leftover:
+            if len(selected) >= target_count:
+                break
+            selected.append(cand)
+
+    return selected[:target_count]
+
+
+def synthetic_candidates(seed: int, count: int) -> list:
+    """Random candidate records with clustered lines and repeated texts."""
+    rng = random.Random(seed)
+    max_line = max(10, count * rng.choice((1, 2, 3)))
+    texts = [f"expr_{i}" for i in range(max(3, count // 4))]
+    candidates = []
+    for i in range(count):
+        candidates.append({
+            'type': rng.choice(('condition', 'for_iter', 'pointer_assign', 'return')),
+            'text': rng.choice(texts),
+            'line_num': rng.randint(1, max_line),
+            'col_offset': rng.randint(0, 40),
+            'score': rng.choice((1, 2, 3)),
+            'function': rng.choice(FUNCTION_NAMES),
+            'full_line': "",
+            'uid': i,  # keeps every record distinct for list membership tests
+        })
+    return candidates
+
+
+def compare(label: str, candidates: list, target: int) -> bool:
+    expected = legacy_select(candidates, target)
+    actual = _select_blanks(candidates, target)
+    if [id(c) for c in expected] != [id(c) for c in actual]:
+        print(f"MISMATCH {label} target={target}: legacy={len(expected)} new={len(actual)}")
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check blank selector parity with the legacy loops.")
+    parser.add_argument("--seeds", type=int, default=100, help="Number of seeded synthetic sets (default: 100)")
+    args = parser.parse_args()
+
+    checks = 0
+    for name in DATA_FILES:
+        path = SRC_DIR / "web_app" / "data" / name
+        if not path.exists():
+            continue
+        code = path.read_text(encoding="utf-8")
+        candidates = _extract_python_candidates(ast.parse(code), code.splitlines())
+        for target in TARGETS:
+            if not compare(name, candidates, target):
+                sys.exit(1)
+            checks += 1
+
+    for seed in range(args.seeds):
+        count = random.Random(seed).choice((5, 40, 150, 600))
+        candidates = synthetic_candidates(seed, count)
+        for target in TARGETS + (1, count, count * 2):
+            if not compare(f"seed={seed}", candidates, target):
+                sys.exit(1)
+            checks += 1
+
+    # Many small functions: every function claims a quota slot, so the legacy
+    # used_lines/selected scans grow with the number of functions.
+    big = synthetic_candidates(12345, 20000)
+    for cand in big:
+        cand['function'] = f"func{cand['line_num'] // 20}"
+    start = time.perf_counter()
+    expected = legacy_select(big, 80)
+    legacy_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    actual = _select_blanks(big, 80)
+    new_ms = (time.perf_counter() - start) * 1000
+    if [id(c) for c in expected] != [id(c) for c in actual]:
+        print("MISMATCH large synthetic set")
+        sys.exit(1)
+
+    print(f"OK: {checks} parity checks passed")
+    print(f"20000 candidates, target=80: legacy={legacy_ms:.1f} ms  new={new_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Round-trip check for the compact (v2) session.json schema.
+
+Generates real sessions (blank modes 1/2 and implementation challenges,
+mode 3) from the bundled code files and a synthetic Python source, plus
+blank sessions from a CRLF copy of it (their full_line differs from the
+source line), then checks that expand_session_payload(compact_session_payload(p))
+equals p field for field, per-blank type/function/score/full_line included,
+and that the blank and challenge sections were actually compacted. If node
+is on PATH the web UI's expandCompactSession (web_app/app.js) must rebuild
+the same payload. Exits with a non-zero status on any difference.
+
+Usage (from the src directory):
+  python -m benchmarks.check_session_schema
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill.local_generator import build_local_session  # noqa: E402
+from ai_drill.session_payload import build_session_payload  # noqa: E402
+from ai_drill.session_schema import compact_session_payload, expand_session_payload  # noqa: E402
+from benchmarks.bench_blanks import build_python_source  # noqa: E402
+from benchmarks.bench_session_schema import extract_client_expander  # noqa: E402
+
+DATA_DIR = SRC_DIR.parent / "data"
+DATA_FILES = ("3_OOP_Code_Blanks.txt", "4_Data_Structure_Code.txt")
+# (mode, difficulty, answer key field that must be compacted)
+BLANK_CASES = ((1, 2, "_blank_spans"), (2, 4, "_blank_spans"))
+CASES = BLANK_CASES + ((3, 2, "_challenge_spans"),)
+
+NODE_EXPAND = """
+const fs = require("fs");
+const [expander, inputPath] = process.argv.slice(-2);
+eval(fs.readFileSync(expander, "utf8"));
+const compacts = JSON.parse(fs.readFileSync(inputPath, "utf8"));
+console.log(JSON.stringify(compacts.map((compact) => expandCompactSession(compact))));
+"""
+
+
+def sources() -> dict:
+    """{name: (content, cases)}"""
+    found = {name: ((DATA_DIR / name).read_text(encoding="utf-8"), CASES) for name in DATA_FILES}
+    python_source = build_python_source(400)
+    found["synthetic_python_400"] = (python_source, CASES)
+    # Mode 3 bodies are split from the LF-normalized text, so CRLF challenges stay v1
+    found["synthetic_python_400_crlf"] = (python_source.replace("\n", "\r\n"), BLANK_CASES)
+    return found
+
+
+def main():
+    failures = 0
+    checked = []  # (label, payload, compact)
+    for name, (content, cases) in sources().items():
+        for mode, difficulty, compacted_field in cases:
+            label = f"{name} mode {mode}"
+            payload = build_session_payload(build_local_session(content, mode, difficulty), name)
+            compact = compact_session_payload(payload)
+            if compacted_field not in compact.get("answer_key", {}):
+                print(f"FAIL {label}: {compacted_field} missing, the session stayed v1")
+                failures += 1
+                continue
+            if expand_session_payload(compact) != payload:
+                print(f"FAIL {label}: expand(compact(payload)) differs from payload")
+                failures += 1
+                continue
+            columns = sorted(compact["answer_key"].get("_blank_columns", {}))
+            v1_size = len(json.dumps(payload, ensure_ascii=False))
+            v2_size = len(json.dumps(compact, ensure_ascii=False))
+            print(f"{label:<36} {v1_size:>8} -> {v2_size:>7} chars  columns={columns}")
+            checked.append((label, payload, compact))
+
+    if shutil.which("node") and checked:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_dir = Path(tmp)
+            expander = extract_client_expander(tmp_dir)
+            input_path = tmp_dir / "compacts.json"
+            input_path.write_text(json.dumps([compact for _, _, compact in checked]), encoding="utf-8")
+            result = subprocess.run(
+                ["node", "-e", NODE_EXPAND, str(expander), str(input_path)],
+                capture_output=True, text=True, encoding="utf-8", check=True,
+            )
+            for (label, payload, _), expanded in zip(checked, json.loads(result.stdout)):
+                if expanded != payload:
+                    print(f"FAIL {label}: app.js expandCompactSession differs from payload")
+                    failures += 1
+        print("app.js expandCompactSession checked with node")
+
+    if failures:
+        raise SystemExit(f"{failures} failures")
+    print("OK: compact sessions expand back to the generated payloads")
+
+
+if __name__ == "__main__":
+    main()
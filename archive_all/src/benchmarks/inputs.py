@@ -0,0 +1,100 @@
+"""
+Deterministic synthetic inputs for the local generator benchmarks.
+
+Every builder is a pure function of its size arguments (seeded RNG, no clock
+or filesystem), so a given size always produces byte-identical text and
+baselines stay comparable between runs.
+"""
+
+from __future__ import annotations
+
+import random
+
+from benchmarks.bench_blanks import build_python_source
+
+__all__ = [
+    "build_python_source",
+    "build_vocab_list",
+    "build_definition_list",
+    "build_exam_bank",
+]
+
+VOCAB_ROOTS = [
+    "inherit", "interface", "abstract", "override", "protect", "static", "virtual",
+    "delegate", "property", "compile", "iterate", "allocate", "dispatch", "serialize",
+]
+VOCAB_SUFFIXES = ["", "ance", "ed", "ing", "ion", "able", "er", "ly"]
+KOREAN_MEANINGS = [
+    "상속", "접점", "추상적인", "재정의하다", "보호하다", "정적인", "가상의",
+    "위임하다", "속성", "컴파일하다", "반복하다", "할당하다", "전달하다", "직렬화하다",
+]
+
+DEFINITION_TERMS = [
+    ("메서드 오버로딩", "Method Overloading"), ("인터페이스", "Interface"),
+    ("다중 상속", "Multiple Inheritance"), ("정적 멤버", "Static Member"),
+    ("구조체", "Structure"), ("속성", "Property"), ("델리게이트", "Delegate"),
+    ("예외 처리", "Exception Handling"), ("쓰레드", "Thread"), ("캡슐화", "Encapsulation"),
+]
+
+CODE_QUESTION = """{num}. 다음 코드를 실행한 결과는?
+
+   values = [{a}, {b}, {c}]
+   print(values[{idx}] * {mul})
+
+   ① {r1}
+   ② {r2}
+   ③ {r3}
+   ④ {r4}
+"""
+
+TEXT_QUESTION = """{num}. 변수 이름으로 사용 가능한 것은?
+   ① ${word}
+   ② {keyword}
+   ③ {word}_{num}
+   ④ {num}{word}
+"""
+
+
+def build_vocab_list(line_count: int, seed: int = 7) -> str:
+    """`word, meaning1, meaning2` lines shaped like 1_OOP_Vocabulary.txt."""
+    rng = random.Random(seed)
+    lines = []
+    for idx in range(line_count):
+        word = rng.choice(VOCAB_ROOTS) + rng.choice(VOCAB_SUFFIXES)
+        if idx % 3 == 0:
+            word = f"{word} {rng.choice(VOCAB_ROOTS)}"
+        meanings = rng.sample(KOREAN_MEANINGS, rng.randint(1, 3))
+        lines.append(", ".join([word] + meanings))
+    return "\n".join(lines) + "\n"
+
+
+def build_definition_list(line_count: int, seed: int = 11) -> str:
+    """`용어 (Term),정의` lines shaped like 2_OOP_Concepts.txt."""
+    rng = random.Random(seed)
+    lines = []
+    for idx in range(line_count):
+        korean, english = rng.choice(DEFINITION_TERMS)
+        words = rng.sample(KOREAN_MEANINGS, 4)
+        lines.append(f"{korean}{idx} ({english} {idx}),{' '.join(words)} 하는 개념")
+    return "\n".join(lines) + "\n"
+
+
+def build_exam_bank(chapters: int, questions_per_chapter: int, seed: int = 5) -> str:
+    """Multi-chapter ①-④ question bank shaped like 5_Computational_Math_Theory.txt."""
+    rng = random.Random(seed)
+    parts = ["IT CookBook - 합성 문제집\n연습문제 정리본 (Chapter별 문제 목록)\n\n"]
+    for chapter in range(1, chapters + 1):
+        parts.append(f"\n[Chapter {chapter:02d}. 합성 단원 {chapter}]\n\n")
+        for num in range(1, questions_per_chapter + 1):
+            if num % 2:
+                a, b, c = rng.randint(1, 9), rng.randint(1, 9), rng.randint(1, 9)
+                parts.append(CODE_QUESTION.format(
+                    num=num, a=a, b=b, c=c, idx=rng.randint(0, 2), mul=rng.randint(2, 5),
+                    r1=a * 2, r2=b * 3, r3=c * 4, r4=a + b + c,
+                ))
+            else:
+                parts.append(TEXT_QUESTION.format(
+                    num=num, word=rng.choice(VOCAB_ROOTS), keyword=rng.choice(["False", "class", "def", "None"]),
+                ))
+            parts.append("\n")
+    return "".join(parts)
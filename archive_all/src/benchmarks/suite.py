@@ -0,0 +1,228 @@
+"""
+Benchmark suite for the local generators, with stored JSON baselines.
+
+Runs every local generator (blanks, implementation challenge, multiple choice,
+definition quiz, vocabulary cards, existing-quiz parsing) on deterministic
+synthetic inputs from benchmarks.inputs and records, per case:
+  seconds      best wall time of --repeat cold runs
+  lines_per_s  input lines / seconds
+  peak_kib     tracemalloc peak of one extra run
+
+Candidate extraction is cached per source hash, so each run starts with an
+empty in-memory index and a throwaway STUDYHELPER_RUNTIME_DIR.
+
+With --save the results become the baseline. Otherwise they are compared
+with the baseline and the exit status is 1 if any case got slower than
+--tolerance or used more memory than --memory-tolerance. Baselines are
+machine-specific and are not committed (benchmarks/baselines/ is ignored).
+
+Usage (from the src directory):
+  python -m benchmarks.suite --save
+  python -m benchmarks.suite
+  python -m benchmarks.suite --only blanks_python mc_python --scale 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ai_drill import local_generator  # noqa: E402
+from ai_drill.local_generator import (  # noqa: E402
+    make_blanks_with_context,
+    make_definition_quiz,
+    make_implementation_challenge,
+    make_multiple_choice,
+    make_vocabulary_cards,
+    parse_existing_quiz,
+)
+from benchmarks.inputs import (  # noqa: E402
+    build_definition_list,
+    build_exam_bank,
+    build_python_source,
+    build_vocab_list,
+)
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "local.json"
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    name: str
+    build_input: Callable[[float], str]
+    run: Callable[[str], object]
+
+
+def _scaled(count: int, scale: float) -> int:
+    return max(1, int(count * scale))
+
+
+CASES = [
+    BenchCase(
+        "blanks_python",
+        lambda scale: build_python_source(_scaled(20000, scale)),
+        lambda source: make_blanks_with_context(source, 80),
+    ),
+    BenchCase(
+        "implementation_python",
+        lambda scale: build_python_source(_scaled(20000, scale)),
+        lambda source: make_implementation_challenge(source, split_methods=True),
+    ),
+    BenchCase(
+        "mc_python",
+        lambda scale: build_python_source(_scaled(20000, scale)),
+        make_multiple_choice,
+    ),
+    BenchCase(
+        "definition_list",
+        lambda scale: build_definition_list(_scaled(20000, scale)),
+        make_definition_quiz,
+    ),
+    BenchCase(
+        "vocab_list",
+        lambda scale: build_vocab_list(_scaled(50000, scale)),
+        make_vocabulary_cards,
+    ),
+    BenchCase(
+        "exam_bank",
+        lambda scale: build_exam_bank(_scaled(20, scale), 50),
+        lambda source: parse_existing_quiz(source, 4),
+    ),
+]
+
+
+def _reset_caches():
+    with local_generator._CANDIDATE_INDEX_LOCK:
+        local_generator._CANDIDATE_INDEX_MEMORY.clear()
+
+
+def measure(case: BenchCase, source: str, repeat: int, runtime_root: Path) -> dict:
+    best = float("inf")
+    for attempt in range(repeat):
+        _reset_caches()
+        os.environ["STUDYHELPER_RUNTIME_DIR"] = str(runtime_root / f"{case.name}-{attempt}")
+        start = time.perf_counter()
+        case.run(source)
+        best = min(best, time.perf_counter() - start)
+
+    _reset_caches()
+    os.environ["STUDYHELPER_RUNTIME_DIR"] = str(runtime_root / f"{case.name}-mem")
+    tracemalloc.start()
+    try:
+        case.run(source)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    lines = source.count("\n") + 1
+    return {
+        "input_lines": lines,
+        "input_kib": round(len(source.encode("utf-8")) / 1024, 1),
+        "seconds": round(best, 6),
+        "lines_per_s": round(lines / best, 1) if best else 0.0,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, memory_tolerance: float) -> list[str]:
+    """Return one message per metric that regressed beyond its tolerance."""
+    failures = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if base.get("input_lines") != current["input_lines"]:
+            failures.append(f"{name}: input changed ({base.get('input_lines')} -> {current['input_lines']} lines)")
+            continue
+        if current["seconds"] > base["seconds"] * (1 + tolerance):
+            failures.append(
+                f"{name}: {current['seconds'] * 1000:.1f} ms vs baseline {base['seconds'] * 1000:.1f} ms "
+                f"(+{current['seconds'] / base['seconds'] - 1:.0%}, tolerance {tolerance:.0%})"
+            )
+        if current["peak_kib"] > base["peak_kib"] * (1 + memory_tolerance):
+            failures.append(
+                f"{name}: peak {current['peak_kib']:.0f} KiB vs baseline {base['peak_kib']:.0f} KiB "
+                f"(+{current['peak_kib'] / base['peak_kib'] - 1:.0%}, tolerance {memory_tolerance:.0%})"
+            )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local generator benchmark suite.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument("--save", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--only", nargs="+", help="Case names to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; best time is kept")
+    parser.add_argument("--scale", type=float, default=1.0, help="Input size multiplier")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.15, help="Allowed peak memory growth")
+    args = parser.parse_args()
+
+    cases = [case for case in CASES if not args.only or case.name in args.only]
+    unknown = set(args.only or ()) - {case.name for case in CASES}
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        previous_runtime = os.environ.get("STUDYHELPER_RUNTIME_DIR")
+        try:
+            for case in cases:
+                source = case.build_input(args.scale)
+                stats = measure(case, source, max(1, args.repeat), Path(tmp))
+                results[case.name] = stats
+                print(
+                    f"{case.name:<22} {stats['input_lines']:>7} lines  {stats['seconds'] * 1000:9.1f} ms  "
+                    f"{stats['lines_per_s']:>11,.0f} lines/s  peak {stats['peak_kib']:>9,.0f} KiB"
+                )
+        finally:
+            if previous_runtime is None:
+                os.environ.pop("STUDYHELPER_RUNTIME_DIR", None)
+            else:
+                os.environ["STUDYHELPER_RUNTIME_DIR"] = previous_runtime
+
+    if args.save:
+        stored = {}
+        if args.baseline.exists():
+            stored = json.loads(args.baseline.read_text(encoding="utf-8")).get("cases", {})
+        stored.update(results)
+        document = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "generator_version": local_generator.GENERATOR_VERSION,
+            "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "cases": stored,
+        }
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline saved: {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --save first")
+        return
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    failures = compare(results, baseline.get("cases", {}), args.tolerance, args.memory_tolerance)
+    if failures:
+        print("REGRESSION")
+        for message in failures:
+            print(f"  {message}")
+        sys.exit(1)
+    print(f"OK (baseline {baseline.get('saved_at', '?')}, python {baseline.get('python', '?')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ import {
   buildVocabMeaningPrompt,
 } from "./js/features/prompt-builders.js";
 import { escapeHtml, formatMarkdown, isAnswerCorrect as compareAnswers } from "./js/core/utils.js";
+import { localBlankHint } from "./js/i18n.js";
 
 // Service Worker (optional)
 const swPreference = localStorage.getItem("enable_sw");
@@ -1170,7 +1171,95 @@ function buildInlineChallengeCode(originalCode, challenges, answerKey) {
 }
 
 
+// Compact session schema (v2): one "source" string plus [line, col, length] spans.
+// Mirrors ai_drill/session_schema.py expand_session_payload(); v1 sessions pass through.
+const SESSION_SCHEMA_VERSION = 2;
+const SOURCE_ANSWER_KEY_TYPES = ["fill_in_blank_inline", "fill_in_blank_cards", "implementation_challenge"];
+
+function renderBlankQuestionFromSpans(source, starts, spans) {
+  // Absolute [start, end, num] ranges, rendered with one join over source slices
+  const ranges = spans.map(([line, col, length], idx) => {
+    const start = starts[line - 1] + col;
+    return [start, start + length, idx + 1];
+  });
+  ranges.sort((a, b) => a[0] - b[0]);
+  const pieces = [];
+  let cursor = 0;
+  for (const [start, end, num] of ranges) {
+    pieces.push(source.slice(cursor, start), `__[${num}]__`);
+    cursor = end;
+  }
+  pieces.push(source.slice(cursor));
+  return pieces.join("").trim();
+}
+
+function expandCompactSession(raw) {
+  if (!raw || raw.schema !== SESSION_SCHEMA_VERSION) return raw;
+  const source = raw.source || "";
+  const starts = [0];
+  for (let pos = source.indexOf("\n"); pos !== -1; pos = source.indexOf("\n", pos + 1)) starts.push(pos + 1);
+  const spanText = ([line, col, length]) => source.slice(starts[line - 1] + col, starts[line - 1] + col + length);
+  const lineText = (line) => source.slice(starts[line - 1], line < starts.length ? starts[line] - 1 : source.length);
+
+  const { schema, source: _source, ...expanded } = raw;
+  const answerKey = { ...(raw.answer_key || {}) };
+
+  const spans = answerKey._blank_spans;
+  if (Array.isArray(spans)) {
+    const columns = answerKey._blank_columns || {};
+    delete answerKey._blank_spans;
+    delete answerKey._blank_columns;
+    const storedLines = columns.full_line || [];
+    answerKey._blanks = spans.map((span, idx) => {
+      const text = spanText(span);
+      if (!(String(idx + 1) in answerKey)) answerKey[String(idx + 1)] = text;
+      const blank = {
+        blank_num: idx + 1,
+        line_num: span[0],
+        col_offset: span[1],
+        text,
+        answer: text,
+        // Not read by the UI today; computed on access to keep loading cheap
+        get full_line() { return storedLines[idx] ?? lineText(span[0]); },
+      };
+      for (const field of ["type", "function", "score"]) {
+        if (Array.isArray(columns[field])) blank[field] = columns[field][idx];
+      }
+      return blank;
+    });
+    if (!("question" in expanded)) expanded.question = renderBlankQuestionFromSpans(source, starts, spans);
+  }
+
+  const entries = answerKey._challenge_spans;
+  if (Array.isArray(entries)) {
+    delete answerKey._challenge_spans;
+    answerKey._challenges = entries.map((entry, idx) => {
+      const [type, lineNum, sig, bodySpan, owner] = entry;
+      const challenge = {
+        signature: typeof sig === "string" ? sig : spanText(sig),
+        body: spanText(bodySpan),
+        line_num: lineNum,
+        type,
+      };
+      if (entry.length > 4) challenge.owner = owner;
+      if (!(String(idx + 1) in answerKey)) answerKey[String(idx + 1)] = challenge.body;
+      return challenge;
+    });
+  }
+
+  if (SOURCE_ANSWER_KEY_TYPES.includes(answerKey._type) && !("_original_code" in answerKey)) {
+    answerKey._original_code = source;
+  }
+  expanded.answer_key = answerKey;
+  if (!("question" in expanded)) expanded.question = "";
+  if (!("question_text" in expanded)) expanded.question_text = expanded.question;
+  if (!("answer" in expanded)) expanded.answer = source.trim();
+  if (!("answer_text" in expanded)) expanded.answer_text = source;
+  return expanded;
+}
+
 function setSession(rawSession) {
+  rawSession = expandCompactSession(rawSession);
   // Extract special fields from rawSession.answer_key first (before normalizeSession)
   const rawAnswerKey = rawSession.answer_key || rawSession.answerKey || {};
   const rawBlanks = rawAnswerKey._blanks;
@@ -4313,6 +4402,46 @@ function initializeFileModeModal() {
   // Current selection status
   let selectedPreset = "oop_vocab";
   let selectedMode = 7;
+  // Server-side generation job in flight (cancelled when the modal is closed)
+  let activeJobId = null;
+
+  // Resolve with the final job status; onText(chars) reports streamed model output
+  async function pollJob(jobId) {
+    let job = { state: "queued" };
+    while (job.state === "queued" || job.state === "running") {
+      const poll = await fetch(`/api/jobs/${jobId}?wait=20`);
+      job = await poll.json();
+    }
+    return job;
+  }
+
+  function followJob(jobId, onText) {
+    if (typeof EventSource === "undefined") return pollJob(jobId);
+    return new Promise((resolve) => {
+      const source = new EventSource(`/api/jobs/${jobId}/events`);
+      let received = 0;
+      const finish = (event) => {
+        source.close();
+        resolve(JSON.parse(event.data));
+      };
+      source.addEventListener("chunk", (event) => {
+        received += JSON.parse(event.data).text.length;
+        onText(received);
+      });
+      ["done", "failed", "cancelled"].forEach((name) => source.addEventListener(name, finish));
+      source.onerror = () => {
+        // Stream dropped (proxy, network); keep waiting by long-polling
+        source.close();
+        pollJob(jobId).then(resolve, () => resolve({ state: "failed", error: "connection lost" }));
+      };
+    });
+  }
+
+  function cancelActiveJob() {
+    if (!activeJobId) return;
+    fetch(`/api/jobs/${activeJobId}`, { method: "DELETE" }).catch(() => {});
+    activeJobId = null;
+  }
 
   const fileNames = {
     "oop_vocab": "1_OOP_Vocabulary.txt",
@@ -4371,6 +4500,7 @@ function initializeFileModeModal() {
   // Close modal
   if (btnCancel) {
     btnCancel.addEventListener("click", () => {
+      cancelActiveJob();
       modal.style.display = "none";
     });
   }
@@ -4600,16 +4730,34 @@ function initializeFileModeModal() {
           }, 300);
 
           try {
-            const response = await fetch("/api/generate", {
+            // Queue a job and long-poll it; the request no longer holds a connection for the whole generation
+            const response = await fetch("/api/jobs", {
               method: "POST",
               headers: { "Content-Type": "application/json" },
               body: JSON.stringify(requestData)
             });
+            let job = await response.json();
+            const jobId = job.id;
+            activeJobId = jobId || null;
+            if (jobId && (job.state === "queued" || job.state === "running")) {
+              // Model output arrives as it is written; its length drives the bar instead of the simulation
+              job = await followJob(jobId, (received) => {
+                clearInterval(progressInterval);
+                fakeProgress = Math.max(fakeProgress, Math.min(95, 10 + received / 400));
+                setProgress(fakeProgress, `AI가 문제를 작성하고 있습니다... (${received}자)`);
+              });
+            }
+            if (activeJobId === jobId) activeJobId = null;
 
             clearInterval(progressInterval);
+            if (job.state === "cancelled") {
+              progressContainer.style.display = 'none';
+              statusEl.textContent = "";
+              return;
+            }
             setProgress(100, "완료!");
 
-            const data = await response.json();
+            const data = job.state === "done" ? job.result : { error: job.error || "unknown error" };
 
 
             if (data.error) {
@@ -4619,7 +4767,7 @@ function initializeFileModeModal() {
             }
 
             // Success
-            await loadSession();
+            await loadSession(data.session_id);
             modal.style.display = "none";
             progressContainer.style.display = 'none'; // Reset logic
 
@@ -4651,18 +4799,9 @@ function initializeFileModeModal() {
           statusEl.className = "fm-status";
 
           // Session reload (without reload)
-          setTimeout(async () => {
-            try {
-              const sessionResponse = await fetch('session.json?t=' + Date.now());
-              if (sessionResponse.ok) {
-                const sessionData = await sessionResponse.json();
-                setSession(sessionData);
-                modal.style.display = 'none';
-              }
-            } catch (e) {
-              console.error('세션 새로고침 실패:', e);
-            }
-          }, 300);
+          if (await loadSession(result.session_id)) {
+            modal.style.display = 'none';
+          }
         } else {
           statusEl.textContent = `❌ 오류: ${result.error}`;
           statusEl.className = "fm-status error";
@@ -4680,38 +4819,43 @@ function initializeFileModeModal() {
   if (modal) {
     modal.addEventListener("click", (e) => {
       if (e.target === modal) {
+        cancelActiveJob();
         modal.style.display = "none";
       }
     });
   }
 }
 
-// Dynamic script load response + session auto load
-async function loadSession() {
+// Sessions are stored server-side by ID; this device remembers the last one it generated
+const LAST_SESSION_KEY = "last_session_id";
+
+// Dynamic script load response + session auto load.
+// With an ID the session is immutable (cached by the browser); without one, session.json
+// is the server's latest session and is revalidated with its ETag.
+async function loadSession(sessionId = null) {
   try {
-    const response = await fetch('session.json?t=' + Date.now());
-    if (!response.ok) throw new Error('session.json not found');
+    const url = sessionId ? `/api/session/${encodeURIComponent(sessionId)}` : 'session.json';
+    const response = await fetch(url, sessionId ? {} : { cache: 'no-cache' });
+    if (!response.ok) throw new Error(`${url} not found`);
     const data = await response.json();
     setSession(data);
+    if (sessionId) localStorage.setItem(LAST_SESSION_KEY, sessionId);
     console.log('Session loaded:', data.title || 'untitled');
+    return true;
   } catch (e) {
     console.warn('loadSession failed:', e.message);
+    return false;
   }
 }
 
 async function initializeApp() {
-  // Load session first (session.json already created by server)
-  try {
-    const response = await fetch('session.json?t=' + Date.now());
-    if (response.ok) {
-      const data = await response.json();
-      setSession(data);
-      console.log('Session loaded:', data.title || 'untitled');
-    } else {
+  // Load session first: this device's last session, else the server's latest (session.json)
+  const lastSessionId = localStorage.getItem(LAST_SESSION_KEY);
+  if (!(lastSessionId && await loadSession(lastSessionId))) {
+    if (lastSessionId) localStorage.removeItem(LAST_SESSION_KEY);
+    if (!(await loadSession())) {
       console.log('No session.json, waiting for modal');
     }
-  } catch (e) {
-    console.log('Session load error:', e.message);
   }
 
   // Modal initialization (after session load)
@@ -5183,7 +5327,8 @@ async function renderMode1OOPBlanks(difficulty = 'normal') {
       const block = codeBlocks[i];
       codeArea.innerHTML = `<div class="definition-loading">🤖 문제 ${i + 1}/${codeBlocks.length} 생성 중...</div>`;
 
-      const generated = await generateMode1BlankWithAI(block.code, block.topic, difficulty);
+      const generated = (await generateMode1BlankLocal(block.code, difficulty))
+        || (await generateMode1BlankWithAI(block.code, block.topic, difficulty));
       if (generated) {
         aiGeneratedQuestions.push({
           ...generated,
@@ -5222,12 +5367,13 @@ async function renderMode1OOPBlanks(difficulty = 'normal') {
         navHtml += `<span class="blank-pill pending" id="nav-${blankId}" data-q="${questionNum}" data-blank="${blankCounter}" onclick="document.getElementById('input-${blankId}').focus()">${globalBlankIdx}</span>`;
 
         // Input field + yellow question mark (hint) + red question mark (what's wrong)
+        const blankHint = (q.blanks || []).find(b => b.num === blankCounter)?.hint;
         const result = `<span class="mode1-blank-wrapper" style="display: inline-flex; align-items: center; gap: 3px;">
           <input type="text" id="input-${blankId}" class="blank-card-input mode1-input" 
             data-q="${questionNum}" data-blank="${blankCounter}" data-global-idx="${globalBlankIdx}" 
             placeholder="[${globalBlankIdx}]" autocomplete="off"
             style="width: 100px; padding: 6px 10px; border-radius: 6px; border: 2px solid #6fb3ff; background: rgba(111, 179, 255, 0.15); color: #e5e9f0; font-family: var(--font-code); font-size: 13px;">
-          <button class="mode1-hint-btn" tabindex="-1" onclick="explainMode1BlankAI(${questionNum}, ${blankCounter})" title="힌트 보기" 
+          <button class="mode1-hint-btn" tabindex="-1" onclick="explainMode1BlankAI(${questionNum}, ${blankCounter})" title="${escapeHtml(blankHint ? `힌트 보기 (${blankHint})` : '힌트 보기')}" 
             style="width: 20px; height: 20px; padding: 0; border-radius: 50%; background: rgba(247, 215, 116, 0.2); border: 1px solid rgba(247, 215, 116, 0.5); color: #f7d774; font-size: 11px; cursor: pointer; display: flex; align-items: center; justify-content: center;">?</button>
           <button class="mode1-why-btn" tabindex="-1" onclick="explainMode1WhyWrong(${questionNum}, ${blankCounter})" title="왜 틀렸어요?" 
             style="width: 20px; height: 20px; padding: 0; border-radius: 50%; background: rgba(255, 107, 107, 0.2); border: 1px solid rgba(255, 107, 107, 0.5); color: #ff6b6b; font-size: 11px; cursor: pointer; display: none; align-items: center; justify-content: center;">?</button>
@@ -5318,6 +5464,37 @@ function extractCSharpCodeBlocks(text) {
   return blocks;
 }
 
+/**
+ * Structural blanks from the local server (/api/blanks); null when unavailable
+ * @param {string} code - source code
+ * @param {string} difficulty - difficulty (easy, normal, hard, extreme)
+ */
+async function generateMode1BlankLocal(code, difficulty = 'normal') {
+  try {
+    const response = await fetch('/api/blanks', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ code, difficulty })
+    });
+    if (!response.ok) return null;
+    const data = await response.json();
+    if (!data || !data.codeWithBlanks || !Array.isArray(data.blanks)) return null;
+    // The server labels blanks with candidate types (e.g. pointer_assign); show user-facing text instead
+    data.blanks = data.blanks.map(blank => ({ ...blank, hint: localBlankHint(blank.hint) }));
+    return data;
+  } catch (err) {
+    return null;
+  }
+}
+
+/**
+ * Known answer for a blank generated locally (null means ask the AI)
+ */
+function getMode1LocalAnswer(question, blankNum) {
+  const blank = (question.blanks || []).find(b => b.num === blankNum);
+  return blank && typeof blank.answer === 'string' ? blank.answer : null;
+}
+
 /**
  * Request AI-generated blanks for Mode 1
  * @param {string} code - source code
@@ -5470,15 +5647,28 @@ async function checkMode1AnswerAI(input) {
   // loading indicator
   input.style.borderColor = 'var(--yellow)';
 
-  const prompt = buildMode1GradePrompt({
-    code: question.originalCode || question.codeWithBlanks,
-    blankNum,
-    userAnswer
-  });
-
   try {
-    const response = await callGeminiAPI(prompt, "Reply with only CORRECT or WRONG.");
-    const isCorrect = response.toUpperCase().includes('CORRECT') && !response.toUpperCase().includes('WRONG');
+    // A locally known answer settles exact matches without a round trip;
+    // anything else (a+b vs b+a, i++ vs i += 1, other quoting) goes to AI grading
+    const localAnswer = getMode1LocalAnswer(question, blankNum);
+    const normalize = (text) => text.replace(/\s+/g, '');
+    let isCorrect = localAnswer !== null && normalize(userAnswer) === normalize(localAnswer);
+    if (!isCorrect) {
+      const prompt = buildMode1GradePrompt({
+        code: question.originalCode || question.codeWithBlanks,
+        blankNum,
+        userAnswer,
+        storedAnswer: localAnswer || ""
+      });
+      try {
+        const response = await callGeminiAPI(prompt, "Reply with only CORRECT or WRONG.");
+        isCorrect = response.toUpperCase().includes('CORRECT') && !response.toUpperCase().includes('WRONG');
+      } catch (err) {
+        // Without AI (offline, no key) the local answer is still authoritative
+        if (localAnswer === null) throw err;
+        console.warn('AI grading unavailable, using exact match:', err);
+      }
+    }
 
     input.classList.remove('correct', 'wrong');
     navPill?.classList.remove('pending', 'correct', 'wrong');
@@ -5519,6 +5709,19 @@ async function revealMode1AnswerAI(input) {
 
   const navPill = document.getElementById(`nav-mode1-${qNum}-${blankNum}`);
 
+  const localAnswer = getMode1LocalAnswer(question, blankNum);
+  if (localAnswer !== null) {
+    input.value = localAnswer;
+    input.disabled = true;
+    input.classList.remove('wrong');
+    input.classList.add('revealed');
+    input.style.borderColor = 'var(--yellow)';
+    navPill?.classList.remove('wrong');
+    navPill?.classList.add('revealed');
+    updateMode1Score();
+    return;
+  }
+
   input.value = "정답 로딩중...";
   input.disabled = true;
 
@@ -73,6 +73,68 @@ export async function callGeminiAPI(prompt, systemInstruction = "", chatHistory
   }
 }
 
+/**
+ * Read a text/event-stream response body, calling onEvent(name, data) per event
+ */
+async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) >= 0) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let name = "message";
+      let data = "";
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event: ")) name = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (data) onEvent(name, JSON.parse(data));
+    }
+  }
+}
+
+/**
+ * Streaming variant of callGeminiAPI: onText(partialText) is called as chunks arrive
+ * @returns {Promise<string>} Full response text
+ */
+export async function streamGeminiAPI(prompt, systemInstruction = "", chatHistory = null, onText = () => {}) {
+  const response = await fetch("/api/gemini-proxy/stream", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      prompt,
+      systemInstruction: systemInstruction || "",
+      chatHistory: Array.isArray(chatHistory) ? chatHistory : [],
+    }),
+  });
+  const contentType = response.headers.get("Content-Type") || "";
+  if (!response.ok || !contentType.startsWith("text/event-stream") || !response.body) {
+    const errorData = await response.json().catch(() => ({}));
+    throw new Error(errorData.error || `API Error: ${response.status}`);
+  }
+
+  let text = "";
+  let error = null;
+  await readEventStream(response, (name, data) => {
+    if (name === "chunk") {
+      text += data.text;
+      onText(text);
+    } else if (name === "done") {
+      text = data.text;
+    } else if (name === "error") {
+      error = data.error;
+    }
+  });
+  if (error) throw new Error(error);
+  return text;
+}
+
 /**
  * Simple grading prompt - returns CORRECT or WRONG
  */
@@ -3,7 +3,7 @@
  */
 
 import { $, formatMarkdown } from "../core/utils.js";
-import { callGeminiAPI, loadSystemPrompt } from "../core/api.js";
+import { loadSystemPrompt, streamGeminiAPI } from "../core/api.js";
 import { openPanel } from "../core/ui.js";
 import { AppState } from "../core/state.js";
 
@@ -57,7 +57,9 @@ async function sendMessage() {
     const fullPrompt = context ? `${context}\n\nUser question: ${message}` : message;
 
     chatHistory.push({ role: "user", parts: [{ text: fullPrompt }] });
-    const response = await callGeminiAPI(fullPrompt, systemPrompt, chatHistory.slice(-10));
+    const response = await streamGeminiAPI(fullPrompt, systemPrompt, chatHistory.slice(-10), (partial) =>
+      replaceMessage(loadingId, partial)
+    );
 
     chatHistory.push({ role: "model", parts: [{ text: response }] });
     replaceMessage(loadingId, response);
@@ -20,6 +20,25 @@ const staticTextTargets = [
   ["#btn-explain-selection", "선택 코드 설명"],
 ];
 
+// Local blank candidate types (ai_drill.local_generator) as shown to users
+const blankHintLabels = {
+  condition: "조건식",
+  for_iter: "반복 대상",
+  pointer_assign: "포인터/링크 대입",
+  return: "반환값",
+  assign: "대입할 값",
+  constructor: "객체 생성",
+  member_access: "멤버 호출",
+  token: "키워드/식별자",
+};
+
+/**
+ * User-facing hint for a local blank; unknown types give "" so internal names never show
+ */
+export function localBlankHint(type) {
+  return blankHintLabels[type] || "";
+}
+
 function setText(selector, text) {
   const elements = document.querySelectorAll(selector);
   elements.forEach((el) => {